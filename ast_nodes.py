@@ -1,12 +1,62 @@
+from hashlib import blake2b
+
+
 class NodoAST:
-    """Clase base para todos los nodos del AST"""
-    pass
+    """Clase base para todos los nodos del AST
+
+    Los nodos declaran sus campos en __slots__, sin __dict__ por instancia:
+    un programa grande tiene millones de nodos. Cada clase concreta lista
+    solo sus campos propios; las posiciones van en las clases base.
+    """
+    # Índice del token que ubica al nodo en el código (operador,
+    # identificador o palabra clave), relativo al primer token de la
+    # sentencia de Programa o de Bloque que contiene al nodo.
+    __slots__ = ('token',)
+
+    def __getattr__(self, nombre):
+        # Solo se llega aquí con un slot sin valor o que la clase no tiene:
+        # las posiciones (y el hash estructural de las expresiones) son
+        # opcionales y valen None si no se registraron
+        if nombre in _OPCIONALES:
+            return None
+        raise AttributeError(f"'{type(self).__name__}' no tiene el atributo '{nombre}'")
+
+    def campos(self):
+        """Pares (nombre, valor) de los campos propios del nodo, sin posiciones"""
+        return [(nombre, getattr(self, nombre)) for nombre in type(self).__slots__]
+
+
+class Sentencia(NodoAST):
+    """Base de los nodos que ocupan una sentencia de Programa o de Bloque"""
+    # Rango [inicio, fin) de tokens. Solo lo registran las sentencias de
+    # Programa o de un Bloque con llaves (relativo al contenedor) y los
+    # bloques con llaves que son cuerpo de una sentencia de control
+    # (relativo a esa sentencia); ver AnalizadorSintactico.
+    __slots__ = ('span',)
+
+
+class SentenciaControl(Sentencia):
+    """Base de las sentencias con condición (if, while, do-while, for)"""
+    # Índice del token que sigue a la condición, relativo como 'token'
+    __slots__ = ('token_condicion',)
+
+
+class Expresion(NodoAST):
+    """Base de las expresiones"""
+    # Hash de la estructura (clase, campos e hijos, sin posiciones); solo
+    # lo tienen las expresiones creadas por una FabricaNodos y sus hijos
+    __slots__ = ('hash_estructural',)
+
+
+_OPCIONALES = frozenset(('token', 'span', 'token_condicion', 'hash_estructural'))
 
 
 # ============== PROGRAMA Y DECLARACIONES ==============
 
 class Programa(NodoAST):
     """Nodo raíz que contiene todo el programa"""
+    __slots__ = ('declaraciones',)
+
     def __init__(self, declaraciones):
         self.declaraciones = declaraciones  # Lista de declaraciones
     
@@ -14,8 +64,10 @@ class Programa(NodoAST):
         return f"Programa({len(self.declaraciones)} declaraciones)"
 
 
-class DeclaracionClase(NodoAST):
+class DeclaracionClase(Sentencia):
     """Declaración de una clase"""
+    __slots__ = ('nombre', 'miembros')
+
     def __init__(self, nombre, miembros):
         self.nombre = nombre
         self.miembros = miembros  # Lista de métodos y atributos
@@ -24,8 +76,10 @@ class DeclaracionClase(NodoAST):
         return f"Clase({self.nombre})"
 
 
-class DeclaracionMetodo(NodoAST):
+class DeclaracionMetodo(Sentencia):
     """Declaración de un método"""
+    __slots__ = ('tipo_retorno', 'nombre', 'parametros', 'cuerpo')
+
     def __init__(self, tipo_retorno, nombre, parametros, cuerpo):
         self.tipo_retorno = tipo_retorno
         self.nombre = nombre
@@ -38,6 +92,8 @@ class DeclaracionMetodo(NodoAST):
 
 class Parametro(NodoAST):
     """Parámetro de un método"""
+    __slots__ = ('tipo', 'nombre')
+
     def __init__(self, tipo, nombre):
         self.tipo = tipo
         self.nombre = nombre
@@ -46,8 +102,10 @@ class Parametro(NodoAST):
         return f"Parametro({self.tipo} {self.nombre})"
 
 
-class DeclaracionVariable(NodoAST):
+class DeclaracionVariable(Sentencia):
     """Declaración de una variable (incluye arreglos)"""
+    __slots__ = ('tipo', 'nombre', 'inicializador')
+
     def __init__(self, tipo, nombre, inicializador=None):
         self.tipo = tipo          # p.ej. 'int', 'int[]'
         self.nombre = nombre
@@ -59,8 +117,10 @@ class DeclaracionVariable(NodoAST):
 
 # ============== SENTENCIAS ==============
 
-class Bloque(NodoAST):
+class Bloque(Sentencia):
     """Bloque de sentencias entre llaves"""
+    __slots__ = ('sentencias',)
+
     def __init__(self, sentencias):
         self.sentencias = sentencias
     
@@ -68,8 +128,10 @@ class Bloque(NodoAST):
         return f"Bloque({len(self.sentencias)} sentencias)"
 
 
-class SentenciaIf(NodoAST):
+class SentenciaIf(SentenciaControl):
     """Sentencia condicional if/else"""
+    __slots__ = ('condicion', 'bloque_if', 'bloque_else')
+
     def __init__(self, condicion, bloque_if, bloque_else=None):
         self.condicion = condicion
         self.bloque_if = bloque_if
@@ -79,8 +141,10 @@ class SentenciaIf(NodoAST):
         return "If"
 
 
-class SentenciaWhile(NodoAST):
+class SentenciaWhile(SentenciaControl):
     """Sentencia de bucle while"""
+    __slots__ = ('condicion', 'cuerpo')
+
     def __init__(self, condicion, cuerpo):
         self.condicion = condicion
         self.cuerpo = cuerpo
@@ -89,8 +153,10 @@ class SentenciaWhile(NodoAST):
         return "While"
 
 
-class SentenciaDoWhile(NodoAST):
+class SentenciaDoWhile(SentenciaControl):
     """Sentencia de bucle do-while"""
+    __slots__ = ('cuerpo', 'condicion')
+
     def __init__(self, cuerpo, condicion):
         self.cuerpo = cuerpo
         self.condicion = condicion
@@ -99,8 +165,10 @@ class SentenciaDoWhile(NodoAST):
         return "DoWhile"
 
 
-class SentenciaFor(NodoAST):
+class SentenciaFor(SentenciaControl):
     """Sentencia de bucle for"""
+    __slots__ = ('inicializacion', 'condicion', 'incremento', 'cuerpo')
+
     def __init__(self, inicializacion, condicion, incremento, cuerpo):
         self.inicializacion = inicializacion
         self.condicion = condicion
@@ -111,8 +179,10 @@ class SentenciaFor(NodoAST):
         return "For"
 
 
-class SentenciaReturn(NodoAST):
+class SentenciaReturn(Sentencia):
     """Sentencia de retorno"""
+    __slots__ = ('expresion',)
+
     def __init__(self, expresion=None):
         self.expresion = expresion
     
@@ -120,8 +190,10 @@ class SentenciaReturn(NodoAST):
         return "Return"
 
 
-class SentenciaExpresion(NodoAST):
+class SentenciaExpresion(Sentencia):
     """Sentencia que contiene una expresión"""
+    __slots__ = ('expresion',)
+
     def __init__(self, expresion):
         self.expresion = expresion
     
@@ -131,8 +203,10 @@ class SentenciaExpresion(NodoAST):
 
 # ============== EXPRESIONES ==============
 
-class Asignacion(NodoAST):
+class Asignacion(Expresion):
     """Expresión de asignación: x = expr"""
+    __slots__ = ('nombre', 'valor')
+
     def __init__(self, nombre, valor):
         self.nombre = nombre
         self.valor = valor
@@ -141,8 +215,10 @@ class Asignacion(NodoAST):
         return f"Asignacion({self.nombre})"
 
 
-class AsignacionIndice(NodoAST):
+class AsignacionIndice(Expresion):
     """Asignación a un elemento de arreglo: arreglo[indice] = valor"""
+    __slots__ = ('arreglo', 'indice', 'valor')
+
     def __init__(self, arreglo, indice, valor):
         self.arreglo = arreglo   # Expresión que representa el arreglo (Identificador o algo más)
         self.indice = indice     # Expresión del índice
@@ -152,8 +228,10 @@ class AsignacionIndice(NodoAST):
         return "AsignacionIndice"
 
 
-class ExpresionBinaria(NodoAST):
+class ExpresionBinaria(Expresion):
     """Expresión binaria (operador con dos operandos)"""
+    __slots__ = ('izquierda', 'operador', 'derecha')
+
     def __init__(self, izquierda, operador, derecha):
         self.izquierda = izquierda
         self.operador = operador
@@ -163,8 +241,10 @@ class ExpresionBinaria(NodoAST):
         return f"ExpBinaria({self.operador})"
 
 
-class ExpresionUnaria(NodoAST):
+class ExpresionUnaria(Expresion):
     """Expresión unaria (operador con un operando)"""
+    __slots__ = ('operador', 'operando')
+
     def __init__(self, operador, operando):
         self.operador = operador
         self.operando = operando
@@ -173,8 +253,10 @@ class ExpresionUnaria(NodoAST):
         return f"ExpUnaria({self.operador})"
 
 
-class ExpresionLlamada(NodoAST):
+class ExpresionLlamada(Expresion):
     """Llamada a función o método"""
+    __slots__ = ('nombre', 'argumentos')
+
     def __init__(self, nombre, argumentos):
         self.nombre = nombre
         self.argumentos = argumentos
@@ -183,8 +265,10 @@ class ExpresionLlamada(NodoAST):
         return f"Llamada({self.nombre})"
 
 
-class ExpresionAcceso(NodoAST):
+class ExpresionAcceso(Expresion):
     """Acceso a miembro (obj.campo)"""
+    __slots__ = ('objeto', 'miembro')
+
     def __init__(self, objeto, miembro):
         self.objeto = objeto
         self.miembro = miembro
@@ -193,8 +277,10 @@ class ExpresionAcceso(NodoAST):
         return f"Acceso({self.miembro})"
 
 
-class ExpresionIndice(NodoAST):
+class ExpresionIndice(Expresion):
     """Acceso a índice de arreglo: arreglo[expr]"""
+    __slots__ = ('arreglo', 'indice')
+
     def __init__(self, arreglo, indice):
         self.arreglo = arreglo
         self.indice = indice
@@ -205,8 +291,10 @@ class ExpresionIndice(NodoAST):
 
 # ============== LITERALES E IDENTIFICADORES ==============
 
-class Literal(NodoAST):
+class Literal(Expresion):
     """Literal (valor constante)"""
+    __slots__ = ('valor', 'tipo')
+
     def __init__(self, valor, tipo):
         self.valor = valor
         self.tipo = tipo  # 'int', 'float', 'string', 'boolean', 'char'
@@ -215,8 +303,10 @@ class Literal(NodoAST):
         return f"Literal({self.tipo}: {self.valor})"
 
 
-class Identificador(NodoAST):
+class Identificador(Expresion):
     """Identificador (nombre de variable)"""
+    __slots__ = ('nombre',)
+
     def __init__(self, nombre):
         self.nombre = nombre
     
@@ -224,8 +314,10 @@ class Identificador(NodoAST):
         return f"Id({self.nombre})"
 
 
-class ExpresionAgrupada(NodoAST):
+class ExpresionAgrupada(Expresion):
     """Expresión entre paréntesis"""
+    __slots__ = ('expresion',)
+
     def __init__(self, expresion):
         self.expresion = expresion
     
@@ -233,97 +325,374 @@ class ExpresionAgrupada(NodoAST):
         return "Agrupada"
 
 
+# ============== EXPRESIONES COMPARTIDAS ==============
+
+# Campos hijos (índices en el orden del constructor) de cada clase de
+# expresión; los demás campos son escalares
+_HIJOS_EXPRESION = {
+    Literal: (),
+    Identificador: (),
+    ExpresionBinaria: (0, 2),
+    ExpresionUnaria: (1,),
+    ExpresionAcceso: (0,),
+    ExpresionIndice: (0, 1),
+    ExpresionAgrupada: (0,),
+    Asignacion: (1,),
+    AsignacionIndice: (0, 1, 2),
+    ExpresionLlamada: (1,),  # Lista de argumentos
+}
+# Expresiones con efectos: cada aparición sigue siendo un nodo propio
+_NO_COMPARTIBLES = frozenset((Asignacion, AsignacionIndice, ExpresionLlamada))
+_UNARIOS_CON_EFECTO = frozenset(('++', '--', '++_post', '--_post'))
+
+
+class FabricaNodos:
+    """
+    Fábrica opcional de expresiones compartidas (hash-consing).
+    Guarda una sola instancia de cada expresión sin efectos distinta
+    (literales, identificadores, operadores, accesos e índices), de modo
+    que dos subárboles iguales son el mismo objeto: 'is' compara su
+    estructura en O(1). Las llamadas, asignaciones, ++ y -- no se
+    comparten. Toda expresión creada por la fábrica, compartida o no,
+    guarda su hash_estructural: un entero de 64 bits que depende solo de
+    la estructura y no cambia entre procesos ni ejecuciones (no usa
+    hash(), que varía con PYTHONHASHSEED), así que sirve de clave en los
+    procesos de analizar_paralelo o en disco. Solo se puede comparar
+    entre expresiones que lo tienen; las construidas sin fábrica no lo
+    tienen, salvo que sean hijos de una creada por ella, que lo calcula
+    y lo guarda en ellos.
+    Una instancia compartida aparece en varios lugares, así que no tiene
+    posición (token es None) y no debe modificarse: las apariciones
+    pierden su token propio y, por ejemplo, los errores semánticos dentro
+    de ellas salen sin línea. Las sentencias conservan su span y las
+    expresiones no compartidas su token.
+    """
+
+    def __init__(self):
+        self._nodos = {}  # Clave estructural -> instancia compartida
+        self._compartidos = set()  # id() de las instancias compartidas
+        self.reutilizados = 0
+
+    def crear(self, clase, *campos, token=None):
+        """
+        Como clase(*campos) en la posición 'token', pero retorna la
+        instancia compartida (sin posición) si la expresión se puede
+        compartir; solo se crea un nodo la primera vez
+        """
+        clave = self._clave(clase, campos)
+        if clave is None:
+            nodo = clase(*campos)
+            nodo.token = token
+            if clase in _HIJOS_EXPRESION:
+                nodo.hash_estructural = _hash_estructural(clase, campos)
+            return nodo
+        nodo = self._nodos.get(clave)
+        if nodo is None:
+            return self._registrar(clave, clase(*campos), campos)
+        self.reutilizados += 1
+        return nodo
+
+    def compartida(self, nodo):
+        """
+        Retorna la instancia compartida equivalente a 'nodo' (que pasa a
+        serlo si es la primera) o el mismo nodo, con su hash_estructural,
+        si no se puede compartir. Sus hijos ya deben haber pasado por aquí.
+        """
+        if id(nodo) in self._compartidos:
+            return nodo
+        clase = type(nodo)
+        if clase not in _HIJOS_EXPRESION:
+            return nodo
+        campos = tuple(getattr(nodo, campo) for campo in clase.__slots__)
+        clave = self._clave(clase, campos)
+        if clave is None:
+            nodo.hash_estructural = _hash_estructural(clase, campos)
+            return nodo
+        compartido = self._nodos.get(clave)
+        if compartido is not None:
+            self.reutilizados += 1
+            return compartido
+        nodo.token = None
+        return self._registrar(clave, nodo, campos)
+
+    def compartir(self, arbol):
+        """
+        Reemplaza, en el lugar, las expresiones de un árbol construido sin
+        la fábrica por sus instancias compartidas y retorna la raíz
+        (compartida si es una expresión)
+        """
+        nodos = []  # Preorden: al recorrerlo al revés, los hijos van antes
+        pendientes = [arbol]
+        while pendientes:
+            nodo = pendientes.pop()
+            if isinstance(nodo, list):
+                pendientes.extend(nodo)
+            elif isinstance(nodo, NodoAST) and id(nodo) not in self._compartidos:
+                nodos.append(nodo)
+                pendientes.extend(valor for _, valor in nodo.campos())
+        compartida = self.compartida
+        for nodo in reversed(nodos):
+            for campo, valor in nodo.campos():
+                if isinstance(valor, list):
+                    for i, elemento in enumerate(valor):
+                        if isinstance(elemento, NodoAST):
+                            valor[i] = compartida(elemento)
+                elif isinstance(valor, NodoAST):
+                    nuevo = compartida(valor)
+                    if nuevo is not valor:
+                        setattr(nodo, campo, nuevo)
+        return compartida(arbol) if isinstance(arbol, NodoAST) else arbol
+
+    def _clave(self, clase, campos):
+        """Clave estructural de la expresión; None si no se puede compartir"""
+        if clase in _NO_COMPARTIBLES or (clase is ExpresionUnaria and campos[0] in _UNARIOS_CON_EFECTO):
+            return None
+        hijos = _HIJOS_EXPRESION.get(clase)
+        if hijos is None:
+            return None
+        clave = list(campos)
+        for i in hijos:
+            # Los hijos compartidos se identifican por id(): son únicos por estructura
+            if id(campos[i]) not in self._compartidos:
+                return None
+            clave[i] = id(campos[i])
+        # El tipo distingue valores que Python considera iguales (1, 1.0, True)
+        return (clase, tuple(clave), tuple(map(type, campos)))
+
+    def _registrar(self, clave, nodo, campos):
+        nodo.token = None
+        nodo.hash_estructural = _hash_estructural(type(nodo), campos)
+        self._nodos[clave] = nodo
+        self._compartidos.add(id(nodo))
+        return nodo
+
+    def __len__(self):
+        return len(self._nodos)
+
+
+def _hash_estructural(clase, campos):
+    """
+    Hash de la clase y los campos, con el hash_estructural de los hijos en
+    su lugar: los primeros 8 bytes del blake2b de su repr, que es el mismo
+    en todos los procesos (y distingue 1, 1.0, True y '1')
+    """
+    hijos = _HIJOS_EXPRESION[clase]
+    clave = repr((clase.__name__,) + tuple(
+        _hash_hijo(campo) if i in hijos else campo for i, campo in enumerate(campos)))
+    return int.from_bytes(blake2b(clave.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _hash_hijo(hijo):
+    if isinstance(hijo, list):
+        return tuple(map(_hash_hijo, hijo))
+    if hijo is None:
+        return None
+    valor = hijo.hash_estructural
+    return valor if valor is not None else _calcular_hash(hijo)
+
+
+def _calcular_hash(raiz):
+    """
+    hash_estructural de una expresión que no viene de una fábrica: se
+    calcula de los hijos hacia arriba, sin recursión, y queda guardado
+    en cada nodo que no lo tenía
+    """
+    nodos = []  # Preorden: al recorrerlo al revés, los hijos van antes
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        if isinstance(nodo, list):
+            pendientes.extend(nodo)
+        elif isinstance(nodo, Expresion) and nodo.hash_estructural is None:
+            nodos.append(nodo)
+            pendientes.extend(valor for _, valor in nodo.campos())
+    for nodo in reversed(nodos):
+        clase = type(nodo)
+        nodo.hash_estructural = _hash_estructural(clase, tuple(getattr(nodo, campo) for campo in clase.__slots__))
+    return raiz.hash_estructural
+
+
+# ============== VISITANTES ==============
+
+class _Despacho(dict):
+    """
+    Caché de despacho de un visitante: clase de nodo -> método ligado.
+    Cada clase se resuelve una sola vez, la primera vez que aparece,
+    buscando en su MRO (como haría isinstance); después la visita cuesta
+    una búsqueda en el diccionario, sin importar cuántas clases haya.
+    """
+    __slots__ = ('visitante', 'metodos', 'otro')
+
+    def __init__(self, visitante, metodos, otro):
+        super().__init__()
+        self.visitante = visitante
+        self.metodos = metodos
+        self.otro = otro
+
+    def __missing__(self, clase):
+        for base in clase.__mro__:
+            nombre = self.metodos.get(base)
+            if nombre is not None:
+                break
+        else:
+            nombre = self.otro
+        metodo = self[clase] = getattr(self.visitante, nombre)
+        return metodo
+
+
+class VisitanteAST:
+    """
+    Base de los recorridos del AST que despachan según la clase del nodo.
+    VISITAS relaciona clases de nodo con el nombre del método que las
+    visita; las clases sin entrada (ni en sus bases) van a visitar_otro.
+    Un recorrido que necesite otras tablas (por ejemplo, una para
+    sentencias y otra para expresiones) las crea con despacho().
+    """
+
+    VISITAS = {}
+
+    def __init__(self):
+        self._visitas = self.despacho(self.VISITAS)
+
+    def despacho(self, metodos, otro='visitar_otro'):
+        """Tabla de despacho de este visitante para metodos (clase -> nombre de método)"""
+        return _Despacho(self, metodos, otro)
+
+    def visitar(self, nodo):
+        """Visita el nodo con el método de su clase"""
+        return self._visitas[type(nodo)](nodo)
+
+    def visitar_otro(self, nodo):
+        """Visita los nodos cuya clase no está en la tabla"""
+        return None
+
+
 # ============== UTILIDADES ==============
 
 def imprimir_ast(nodo, nivel=0, prefijo=""):
     """Imprime el AST de forma jerárquica"""
-    indent = "  " * nivel
-    
-    if nodo is None:
-        return f"{indent}{prefijo}None\n"
-    
-    resultado = f"{indent}{prefijo}{nodo.__class__.__name__}"
-    
-    # Agregar información específica según el tipo de nodo
-    if isinstance(nodo, Literal):
-        resultado += f" ({nodo.tipo}: {nodo.valor})"
-    elif isinstance(nodo, Identificador):
-        resultado += f" ({nodo.nombre})"
-    elif isinstance(nodo, DeclaracionVariable):
-        resultado += f" ({nodo.tipo} {nodo.nombre})"
-    elif isinstance(nodo, ExpresionBinaria):
-        resultado += f" ({nodo.operador})"
-    elif isinstance(nodo, ExpresionUnaria):
-        resultado += f" ({nodo.operador})"
-    elif isinstance(nodo, Asignacion):
-        resultado += f" ({nodo.nombre})"
-    
-    resultado += "\n"
-    
-    # Recursivamente imprimir hijos
-    if isinstance(nodo, Programa):
-        for decl in nodo.declaraciones:
-            resultado += imprimir_ast(decl, nivel + 1, "├─ ")
-    
-    elif isinstance(nodo, DeclaracionVariable):
-        if nodo.inicializador:
-            resultado += imprimir_ast(nodo.inicializador, nivel + 1, "└─ = ")
-    
-    elif isinstance(nodo, Bloque):
-        for sent in nodo.sentencias:
-            resultado += imprimir_ast(sent, nivel + 1, "├─ ")
-    
-    elif isinstance(nodo, SentenciaIf):
-        resultado += imprimir_ast(nodo.condicion, nivel + 1, "├─ Cond: ")
-        resultado += imprimir_ast(nodo.bloque_if, nivel + 1, "├─ Then: ")
+    return "".join(f"{linea}\n" for linea in lineas_ast(nodo, nivel, prefijo))
+
+
+def escribir_ast(nodo, salida, nivel=0, prefijo=""):
+    """Escribe el AST de imprimir_ast en un archivo de texto (io.TextIOBase) a medida que se recorre"""
+    salida.writelines(f"{linea}\n" for linea in lineas_ast(nodo, nivel, prefijo))
+
+
+def lineas_ast(nodo, nivel=0, prefijo=""):
+    """
+    Genera, sin el salto final, las líneas con que imprimir_ast muestra el AST.
+    Recorre el árbol con una pila de iteradores de hijos en vez de recursión:
+    no depende del límite de recursión y la memoria extra crece con la
+    profundidad del árbol, no con su tamaño.
+    """
+    visitas = _IMPRESOR._visitas
+    pila = [iter(((nodo, prefijo),))]
+    while pila:
+        indent = "  " * (nivel + len(pila) - 1)
+        # El for se retoma donde quedó al volver de los hijos de un nodo
+        for nodo, prefijo in pila[-1]:
+            if nodo is None:
+                yield f"{indent}{prefijo}None"
+                continue
+            detalle, hijos = visitas[type(nodo)](nodo)
+            yield f"{indent}{prefijo}{nodo.__class__.__name__}{detalle}"
+            pila.append(iter(hijos))
+            break
+        else:
+            pila.pop()
+
+
+class ImpresorAST(VisitanteAST):
+    """
+    Visitante de lineas_ast: para cada nodo retorna el detalle que se
+    muestra junto a su clase y sus hijos, en orden, con su prefijo
+    """
+
+    VISITAS = {
+        Programa: '_imprimir_programa',
+        DeclaracionVariable: '_imprimir_declaracion_variable',
+        Bloque: '_imprimir_bloque',
+        SentenciaIf: '_imprimir_if',
+        SentenciaWhile: '_imprimir_ciclo',
+        SentenciaDoWhile: '_imprimir_ciclo',
+        SentenciaFor: '_imprimir_for',
+        SentenciaReturn: '_imprimir_return',
+        SentenciaExpresion: '_imprimir_expresion',
+        Literal: '_imprimir_literal',
+        Identificador: '_imprimir_identificador',
+        Asignacion: '_imprimir_asignacion',
+        AsignacionIndice: '_imprimir_asignacion_indice',
+        ExpresionBinaria: '_imprimir_binaria',
+        ExpresionUnaria: '_imprimir_unaria',
+        ExpresionLlamada: '_imprimir_llamada',
+        ExpresionAgrupada: '_imprimir_expresion',
+        ExpresionIndice: '_imprimir_indice',
+    }
+
+    def visitar_otro(self, nodo):
+        return "", ()
+
+    def _imprimir_programa(self, nodo):
+        return "", ((decl, "├─ ") for decl in nodo.declaraciones)
+
+    def _imprimir_declaracion_variable(self, nodo):
+        hijos = ((nodo.inicializador, "└─ = "),) if nodo.inicializador else ()
+        return f" ({nodo.tipo} {nodo.nombre})", hijos
+
+    def _imprimir_bloque(self, nodo):
+        return "", ((sent, "├─ ") for sent in nodo.sentencias)
+
+    def _imprimir_if(self, nodo):
+        hijos = [(nodo.condicion, "├─ Cond: "), (nodo.bloque_if, "├─ Then: ")]
         if nodo.bloque_else:
-            resultado += imprimir_ast(nodo.bloque_else, nivel + 1, "└─ Else: ")
-    
-    elif isinstance(nodo, (SentenciaWhile, SentenciaDoWhile)):
-        resultado += imprimir_ast(nodo.condicion, nivel + 1, "├─ Cond: ")
-        resultado += imprimir_ast(nodo.cuerpo, nivel + 1, "└─ Cuerpo: ")
-    
-    elif isinstance(nodo, SentenciaFor):
+            hijos.append((nodo.bloque_else, "└─ Else: "))
+        return "", hijos
+
+    def _imprimir_ciclo(self, nodo):
+        return "", ((nodo.condicion, "├─ Cond: "), (nodo.cuerpo, "└─ Cuerpo: "))
+
+    def _imprimir_for(self, nodo):
+        hijos = []
         if nodo.inicializacion:
-            resultado += imprimir_ast(nodo.inicializacion, nivel + 1, "├─ Init: ")
+            hijos.append((nodo.inicializacion, "├─ Init: "))
         if nodo.condicion:
-            resultado += imprimir_ast(nodo.condicion, nivel + 1, "├─ Cond: ")
+            hijos.append((nodo.condicion, "├─ Cond: "))
         if nodo.incremento:
-            resultado += imprimir_ast(nodo.incremento, nivel + 1, "├─ Inc: ")
-        resultado += imprimir_ast(nodo.cuerpo, nivel + 1, "└─ Cuerpo: ")
-    
-    elif isinstance(nodo, SentenciaReturn):
-        if nodo.expresion:
-            resultado += imprimir_ast(nodo.expresion, nivel + 1, "└─ ")
-    
-    elif isinstance(nodo, SentenciaExpresion):
-        resultado += imprimir_ast(nodo.expresion, nivel + 1, "└─ ")
-    
-    elif isinstance(nodo, Asignacion):
-        resultado += imprimir_ast(nodo.valor, nivel + 1, "└─ ")
-    
-    elif isinstance(nodo, AsignacionIndice):
-        resultado += imprimir_ast(nodo.arreglo, nivel + 1, "├─ Arr: ")
-        resultado += imprimir_ast(nodo.indice, nivel + 1, "├─ Idx: ")
-        resultado += imprimir_ast(nodo.valor, nivel + 1, "└─ Val: ")
-    
-    elif isinstance(nodo, ExpresionBinaria):
-        resultado += imprimir_ast(nodo.izquierda, nivel + 1, "├─ Izq: ")
-        resultado += imprimir_ast(nodo.derecha, nivel + 1, "└─ Der: ")
-    
-    elif isinstance(nodo, ExpresionUnaria):
-        resultado += imprimir_ast(nodo.operando, nivel + 1, "└─ ")
-    
-    elif isinstance(nodo, ExpresionLlamada):
-        if nodo.argumentos:
-            for arg in nodo.argumentos:
-                resultado += imprimir_ast(arg, nivel + 1, "├─ Arg: ")
-    
-    elif isinstance(nodo, ExpresionAgrupada):
-        resultado += imprimir_ast(nodo.expresion, nivel + 1, "└─ ")
-    
-    elif isinstance(nodo, ExpresionIndice):
-        resultado += imprimir_ast(nodo.arreglo, nivel + 1, "├─ Arr: ")
-        resultado += imprimir_ast(nodo.indice, nivel + 1, "└─ Idx: ")
-    
-    return resultado
\ No newline at end of file
+            hijos.append((nodo.incremento, "├─ Inc: "))
+        hijos.append((nodo.cuerpo, "└─ Cuerpo: "))
+        return "", hijos
+
+    def _imprimir_return(self, nodo):
+        return "", ((nodo.expresion, "└─ "),) if nodo.expresion else ()
+
+    def _imprimir_expresion(self, nodo):
+        return "", ((nodo.expresion, "└─ "),)
+
+    def _imprimir_literal(self, nodo):
+        return f" ({nodo.tipo}: {nodo.valor})", ()
+
+    def _imprimir_identificador(self, nodo):
+        return f" ({nodo.nombre})", ()
+
+    def _imprimir_asignacion(self, nodo):
+        return f" ({nodo.nombre})", ((nodo.valor, "└─ "),)
+
+    def _imprimir_asignacion_indice(self, nodo):
+        return "", ((nodo.arreglo, "├─ Arr: "), (nodo.indice, "├─ Idx: "), (nodo.valor, "└─ Val: "))
+
+    def _imprimir_binaria(self, nodo):
+        return f" ({nodo.operador})", ((nodo.izquierda, "├─ Izq: "), (nodo.derecha, "└─ Der: "))
+
+    def _imprimir_unaria(self, nodo):
+        return f" ({nodo.operador})", ((nodo.operando, "└─ "),)
+
+    def _imprimir_llamada(self, nodo):
+        return "", ((arg, "├─ Arg: ") for arg in nodo.argumentos or ())
+
+    def _imprimir_indice(self, nodo):
+        return "", ((nodo.arreglo, "├─ Arr: "), (nodo.indice, "└─ Idx: "))
+
+
+# Sin estado propio aparte de su caché: lo comparten todas las impresiones
+_IMPRESOR = ImpresorAST()
@@ -0,0 +1,386 @@
+"""
+AST plano
+Representa el árbol de un programa como filas de arreglos paralelos
+(clase, primer hijo, siguiente hermano, valores, posiciones), sin un
+objeto por nodo, para las pasadas que recorren el programa completo
+"""
+
+import math
+from array import array
+
+from ast_nodes import *
+
+
+# Clases de nodo: su índice es el código que guarda la columna 'tipos'
+CLASES = (
+    Programa, DeclaracionClase, DeclaracionMetodo, Parametro, DeclaracionVariable,
+    Bloque, SentenciaIf, SentenciaWhile, SentenciaDoWhile, SentenciaFor,
+    SentenciaReturn, SentenciaExpresion,
+    Asignacion, AsignacionIndice, ExpresionBinaria, ExpresionUnaria,
+    ExpresionLlamada, ExpresionAcceso, ExpresionIndice,
+    Literal, Identificador, ExpresionAgrupada,
+)
+CODIGOS = {clase: codigo for codigo, clase in enumerate(CLASES)}
+
+# Filas que no son nodos: una lista de hijos (p. ej. las sentencias de un
+# Bloque) y un hijo ausente (None); así cada campo hijo ocupa una fila y
+# los hijos se ubican por su orden
+LISTA = len(CLASES)
+NULO = LISTA + 1
+
+# Campos que no son hijos: se guardan juntos como una tupla en 'valores'
+ESCALARES = {
+    DeclaracionClase: ('nombre',),
+    DeclaracionMetodo: ('tipo_retorno', 'nombre'),
+    Parametro: ('tipo', 'nombre'),
+    DeclaracionVariable: ('tipo', 'nombre'),
+    Asignacion: ('nombre',),
+    ExpresionBinaria: ('operador',),
+    ExpresionUnaria: ('operador',),
+    ExpresionLlamada: ('nombre',),
+    ExpresionAcceso: ('miembro',),
+    Literal: ('valor', 'tipo'),
+    Identificador: ('nombre',),
+}
+# Campos hijos de cada clase, en el orden de sus filas
+HIJOS = {clase: tuple(c for c in clase.__slots__ if c not in ESCALARES.get(clase, ()))
+         for clase in CLASES}
+# Por clase: código, escalares, hijos y cuántas posiciones tiene (token;
+# span las sentencias; token_condicion las de control)
+_FORMAS = {clase: (CODIGOS[clase], ESCALARES.get(clase, ()), HIJOS[clase],
+                   3 if issubclass(clase, SentenciaControl) else 2 if issubclass(clase, Sentencia) else 1)
+           for clase in CLASES}
+# Argumentos del constructor (que sigue el orden de __slots__) como índices
+# en escalares + hijos
+_ORDEN = {clase: tuple((ESCALARES.get(clase, ()) + HIJOS[clase]).index(c) for c in clase.__slots__)
+          for clase in CLASES}
+
+_ENTERO_MIN, _ENTERO_MAX = -2**31, 2**31 - 1
+
+
+class ASTPlano:
+    """
+    AST de un programa en arreglos paralelos.
+    La fila i es un nodo (o una LISTA/NULO): tipos[i] es su código de
+    clase, primeros[i] y siguientes[i] enlazan su primer hijo y su
+    siguiente hermano (-1 si no hay), datos[i] indexa la tupla de sus
+    campos escalares en self.valores y tokens/inicios/fines/
+    tokens_condicion guardan sus posiciones (-1 si no las tiene).
+    La fila 0 es el Programa y las filas quedan en preorden al convertir;
+    las pasadas que reescriben nodos pueden dejar filas sin enlazar, por
+    lo que los recorridos siguen los enlaces y no el orden de las filas.
+    """
+
+    def __init__(self):
+        self.tipos = array('B')
+        self.primeros = array('i')
+        self.siguientes = array('i')
+        self.datos = array('i')
+        self.tokens = array('i')
+        self.inicios = array('i')  # span: [inicio, fin) de tokens
+        self.fines = array('i')
+        self.tokens_condicion = array('i')
+        self.valores = []  # Tuplas de campos escalares, sin repetir
+        self._indices_valor = {}
+
+    def indice_valor(self, escalares):
+        """Retorna el índice de la tupla de escalares, registrándola si es nueva"""
+        # El tipo distingue valores que Python considera iguales (1, 1.0, True)
+        clave = (escalares, tuple(map(type, escalares)))
+        indice = self._indices_valor.get(clave)
+        if indice is None:
+            indice = len(self.valores)
+            self.valores.append(escalares)
+            self._indices_valor[clave] = indice
+        return indice
+
+    # ========== CONVERSIÓN ==========
+
+    @classmethod
+    def desde_arbol(cls, programa):
+        """Convierte un Programa (o cualquier nodo) en un AST plano"""
+        plano = cls()
+        indice_valor = plano.indice_valor
+        # Columnas como listas mientras se enlazan; al final pasan a arreglos
+        tipos, primeros, siguientes, datos = [], [], [], []
+        tokens, inicios, fines, tokens_condicion = [], [], [], []
+        ultimos = []  # Último hijo enlazado de cada fila
+        pendientes = [(programa, -1)]
+        while pendientes:
+            objeto, padre = pendientes.pop()
+            fila = len(tipos)
+            if objeto is None or isinstance(objeto, list):
+                tipos.append(NULO if objeto is None else LISTA)
+                datos.append(-1)
+                tokens.append(-1)
+                inicios.append(-1)
+                fines.append(-1)
+                tokens_condicion.append(-1)
+                hijos = objeto or ()
+            else:
+                codigo, escalares, campos_hijos, posiciones = _FORMAS[type(objeto)]
+                tipos.append(codigo)
+                datos.append(indice_valor(tuple([getattr(objeto, c) for c in escalares])) if escalares else -1)
+                token = objeto.token
+                tokens.append(-1 if token is None else token)
+                # Solo se leen las posiciones que la clase puede tener
+                span = objeto.span if posiciones > 1 else None
+                if span is None:
+                    inicios.append(-1)
+                    fines.append(-1)
+                else:
+                    inicios.append(span[0])
+                    fines.append(span[1])
+                token = objeto.token_condicion if posiciones > 2 else None
+                tokens_condicion.append(-1 if token is None else token)
+                hijos = [getattr(objeto, c) for c in campos_hijos]
+            primeros.append(-1)
+            siguientes.append(-1)
+            ultimos.append(-1)
+            if padre >= 0:
+                if ultimos[padre] < 0:
+                    primeros[padre] = fila
+                else:
+                    siguientes[ultimos[padre]] = fila
+                ultimos[padre] = fila
+            for hijo in reversed(hijos):
+                pendientes.append((hijo, fila))
+        plano.tipos = array('B', tipos)
+        plano.primeros = array('i', primeros)
+        plano.siguientes = array('i', siguientes)
+        plano.datos = array('i', datos)
+        plano.tokens = array('i', tokens)
+        plano.inicios = array('i', inicios)
+        plano.fines = array('i', fines)
+        plano.tokens_condicion = array('i', tokens_condicion)
+        return plano
+
+    def a_arbol(self, raiz=0):
+        """Reconstruye el árbol de nodos desde la fila 'raiz'"""
+        tipos, primeros, siguientes = self.tipos, self.primeros, self.siguientes
+        datos, valores = self.datos, self.valores
+        tokens, inicios, fines, tokens_condicion = self.tokens, self.inicios, self.fines, self.tokens_condicion
+        resultados = []
+        # Postorden: la fila se apila de nuevo (~fila) para construirla al
+        # salir, cuando sus hijos ya están al final de 'resultados'
+        pendientes = [raiz]
+        cantidades = []  # Cantidad de hijos de cada fila abierta
+        while pendientes:
+            fila = pendientes.pop()
+            if fila >= 0:
+                pendientes.append(~fila)
+                inicio = len(pendientes)
+                hijo = primeros[fila]
+                while hijo >= 0:
+                    pendientes.append(hijo)
+                    hijo = siguientes[hijo]
+                cantidades.append(len(pendientes) - inicio)
+                pendientes[inicio:] = reversed(pendientes[inicio:])
+                continue
+            fila = ~fila
+            n = cantidades.pop()
+            if n:
+                hijos = resultados[-n:]
+                del resultados[-n:]
+            else:
+                hijos = []
+            tipo = tipos[fila]
+            if tipo == NULO:
+                resultados.append(None)
+                continue
+            if tipo == LISTA:
+                resultados.append(hijos)
+                continue
+            clase = CLASES[tipo]
+            argumentos = (valores[datos[fila]] if datos[fila] >= 0 else ()) + tuple(hijos)
+            nodo = clase(*[argumentos[k] for k in _ORDEN[clase]])
+            if tokens[fila] >= 0:
+                nodo.token = tokens[fila]
+            if inicios[fila] >= 0:
+                nodo.span = (inicios[fila], fines[fila])
+            if tokens_condicion[fila] >= 0:
+                nodo.token_condicion = tokens_condicion[fila]
+            resultados.append(nodo)
+        return resultados[0]
+
+    # ========== RECORRIDOS ==========
+
+    def hijos(self, fila):
+        """Itera las filas hijas de 'fila' en orden"""
+        hijo = self.primeros[fila]
+        siguientes = self.siguientes
+        while hijo >= 0:
+            yield hijo
+            hijo = siguientes[hijo]
+
+    def cantidad_hijos(self, fila):
+        """Cantidad de filas hijas de 'fila'"""
+        n = 0
+        hijo = self.primeros[fila]
+        while hijo >= 0:
+            n += 1
+            hijo = self.siguientes[hijo]
+        return n
+
+    def preorden(self, raiz=0):
+        """Itera las filas del subárbol de 'raiz' en preorden, con una pila explícita"""
+        primeros, siguientes = self.primeros, self.siguientes
+        pendientes = [raiz]
+        while pendientes:
+            fila = pendientes.pop()
+            yield fila
+            # Apila el primer hijo; su hermano se apila al desapilarlo
+            if siguientes[fila] >= 0 and fila != raiz:
+                pendientes.append(siguientes[fila])
+            if primeros[fila] >= 0:
+                pendientes.append(primeros[fila])
+
+    def eventos(self, raiz=0):
+        """
+        Itera pares (fila, salida) del subárbol de 'raiz': cada fila aparece
+        al entrar (salida=False) y, tras todos sus descendientes, al salir
+        """
+        primeros, siguientes = self.primeros, self.siguientes
+        pendientes = [raiz]
+        while pendientes:
+            fila = pendientes.pop()
+            if fila < 0:
+                yield ~fila, True
+                continue
+            yield fila, False
+            pendientes.append(~fila)
+            hijo = primeros[fila]
+            inicio = len(pendientes)
+            while hijo >= 0:
+                pendientes.append(hijo)
+                hijo = siguientes[hijo]
+            pendientes[inicio:] = reversed(pendientes[inicio:])
+
+    def postorden(self, raiz=0):
+        """Itera las filas del subárbol de 'raiz' en postorden (hijos antes que el padre)"""
+        for fila, salida in self.eventos(raiz):
+            if salida:
+                yield fila
+
+    def clase(self, fila):
+        """Retorna la clase de nodo de la fila (None para LISTA y NULO)"""
+        tipo = self.tipos[fila]
+        return CLASES[tipo] if tipo < LISTA else None
+
+    def escalares(self, fila):
+        """Retorna la tupla de campos escalares de la fila (vacía si no tiene)"""
+        return self.valores[self.datos[fila]] if self.datos[fila] >= 0 else ()
+
+    # ========== PLEGADO DE CONSTANTES ==========
+
+    def plegar_constantes(self, raiz=0):
+        """
+        Reemplaza, en el lugar, las expresiones cuyos operandos son literales
+        por el literal resultante, con la semántica de Java para int
+        (32 bits, división truncada) y double. Retorna la cantidad de nodos
+        plegados; sus hijos quedan como filas sin enlazar.
+        """
+        tipos, primeros, siguientes = self.tipos, self.primeros, self.siguientes
+        datos, valores = self.datos, self.valores
+        literal = CODIGOS[Literal]
+        binaria = CODIGOS[ExpresionBinaria]
+        unaria = CODIGOS[ExpresionUnaria]
+        agrupada = CODIGOS[ExpresionAgrupada]
+        plegados = 0
+        for fila in self.postorden(raiz):
+            tipo = tipos[fila]
+            hijo = primeros[fila]
+            if tipo == binaria:
+                derecha = siguientes[hijo]
+                if tipos[hijo] != literal or tipos[derecha] != literal:
+                    continue
+                resultado = _plegar_binaria(valores[datos[fila]][0], valores[datos[hijo]], valores[datos[derecha]])
+            elif tipo == unaria:
+                if tipos[hijo] != literal:
+                    continue
+                resultado = _plegar_unaria(valores[datos[fila]][0], valores[datos[hijo]])
+            elif tipo == agrupada:
+                if tipos[hijo] != literal:
+                    continue
+                resultado = valores[datos[hijo]]
+            else:
+                continue
+            if resultado is None:
+                continue
+            tipos[fila] = literal
+            datos[fila] = self.indice_valor(resultado)
+            primeros[fila] = -1
+            plegados += 1
+        return plegados
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def __repr__(self):
+        return f"ASTPlano({len(self)} filas)"
+
+
+def _numero(literal):
+    """Valor de un literal numérico int (de 32 bits) o float; None si no lo es"""
+    valor, tipo = literal
+    if tipo == 'int' and _ENTERO_MIN <= valor <= _ENTERO_MAX:
+        return valor
+    if tipo == 'float':
+        return valor
+    return None
+
+
+def _literal_numerico(valor):
+    if isinstance(valor, float):
+        # Infinito y NaN no tienen literal: quedan para la ejecución
+        return (valor, 'float') if math.isfinite(valor) else None
+    # Aritmética de int de Java: el resultado se trunca a 32 bits
+    return ((valor - _ENTERO_MIN) % 2**32 + _ENTERO_MIN, 'int')
+
+
+def _plegar_binaria(operador, izquierda, derecha):
+    """Literal (valor, tipo) de 'izquierda operador derecha'; None si no se pliega"""
+    if operador in ('&&', '||'):
+        if izquierda[1] != 'boolean' or derecha[1] != 'boolean':
+            return None
+        a, b = izquierda[0], derecha[0]
+        return (a and b if operador == '&&' else a or b, 'boolean')
+    if operador in ('==', '!=') and izquierda[1] == derecha[1] == 'boolean':
+        return ((izquierda[0] == derecha[0]) == (operador == '=='), 'boolean')
+    a, b = _numero(izquierda), _numero(derecha)
+    if a is None or b is None:
+        return None
+    if isinstance(a, float) or isinstance(b, float):
+        a, b = float(a), float(b)
+    if operador == '+':
+        return _literal_numerico(a + b)
+    if operador == '-':
+        return _literal_numerico(a - b)
+    if operador == '*':
+        return _literal_numerico(a * b)
+    if operador in ('/', '%'):
+        if b == 0:
+            return None  # Se deja la excepción (o el infinito) para la ejecución
+        if isinstance(a, float):
+            return _literal_numerico(a / b if operador == '/' else math.fmod(a, b))
+        cociente = abs(a) // abs(b)
+        if (a < 0) != (b < 0):
+            cociente = -cociente
+        return _literal_numerico(cociente if operador == '/' else a - b * cociente)
+    comparaciones = {
+        '==': a == b, '!=': a != b, '<': a < b,
+        '>': a > b, '<=': a <= b, '>=': a >= b,
+    }
+    if operador in comparaciones:
+        return (comparaciones[operador], 'boolean')
+    return None
+
+
+def _plegar_unaria(operador, operando):
+    """Literal (valor, tipo) de 'operador operando'; None si no se pliega"""
+    if operador == '!':
+        return (not operando[0], 'boolean') if operando[1] == 'boolean' else None
+    if operador == '-':
+        valor = _numero(operando)
+        return None if valor is None else _literal_numerico(-valor)
+    return None  # ++ y -- necesitan una variable
@@ -0,0 +1,44 @@
+"""
+Modo iterativo del analizador sintáctico: tiempo con anidamiento muy
+profundo (donde el modo recursivo agota la pila) y, en código plano,
+comparación con el modo recursivo.
+"""
+from comun import preparar, mejor_de, programa
+
+opciones = preparar(__doc__, profundidad=100000, repeticiones=3)
+
+from lexico import AnalizadorLexico
+from sintactico import AnalizadorSintactico
+
+N = opciones.profundidad
+PROFUNDOS = {
+    'paréntesis': 'x = ' + '(' * N + '1' + ')' * N + ';',
+    'prefijos': 'x = ' + '- ' * N + 'a;',
+    'bloques': '{' * N + 'x = 1;' + '}' * N,
+    'if anidados': 'if (a) ' * N + 'x = 1;',
+    'llamadas': 'x = ' + 'f(' * N + '1' + ')' * N + ';',
+    'índices': 'x = ' + 'a[' * N + '1' + ']' * N + ';',
+    'asignaciones': 'a = ' * N + '1;',
+    'while con bloque': 'while (a) {' * N + '}' * N,
+}
+PLANOS = {
+    'programa generado': programa(20000),
+    'cadena aritmética': 'int x = ' + ' + '.join(f'a{i} * {i} - -b{i} % 3' for i in range(20000)) + ';\n',
+    'lógicas': ''.join(f'x = !a{i} && b < {i} || c >= d + 1;\n' for i in range(5000)),
+    'llamadas e índices': ''.join(f'v[{i}] = f(a, b[{i}], o.m) + g() * -x{i};\n' for i in range(5000)),
+}
+
+for nombre, codigo in PROFUNDOS.items():
+    tokens = AnalizadorLexico().analizar_compacto(codigo)
+    sintactico = AnalizadorSintactico(tokens, 'iterativo')
+    tiempo = mejor_de(1, sintactico.analizar)
+    print(f"profundidad {N} {nombre:18} {len(tokens):7} tokens  iterativo {tiempo * 1000:7.0f} ms  "
+          f"errores={len(sintactico.errores)}")
+    del sintactico
+
+for nombre, codigo in PLANOS.items():
+    tokens = AnalizadorLexico().analizar_compacto(codigo)
+    tiempos = [mejor_de(opciones.repeticiones, lambda: AnalizadorSintactico(tokens, modo).analizar())
+               for modo in AnalizadorSintactico.MODOS]
+    print(f"plano {nombre:20} {len(tokens):7} tokens  "
+          + '  '.join(f"{modo} {tiempo * 1000:6.0f} ms" for modo, tiempo in zip(AnalizadorSintactico.MODOS, tiempos)))
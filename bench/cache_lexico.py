@@ -0,0 +1,32 @@
+"""
+CacheTokens sobre un archivo grande (objetivo: un acierto al menos 10x
+más rápido que analizar_compacto en 10k líneas). El acierto incluye el
+hash del código, la lectura de la entrada y la reconstrucción del
+TokenStream.
+"""
+import tempfile
+
+from comun import preparar, mejor_de, programa
+
+opciones = preparar(__doc__, lineas=10000, repeticiones=5)
+
+from cache_tokens import CacheTokens
+from lexico import AnalizadorLexico
+
+codigo = programa(opciones.lineas)
+with tempfile.TemporaryDirectory() as directorio:
+    cache = CacheTokens(directorio)
+
+    def fallo():
+        cache.limpiar()
+        cache.analizar(codigo)
+
+    compacto = mejor_de(opciones.repeticiones, lambda: AnalizadorLexico().analizar_compacto(codigo))
+    guardado = mejor_de(opciones.repeticiones, fallo)
+    acierto = mejor_de(opciones.repeticiones, lambda: cache.analizar(codigo))
+    tokens = len(cache.analizar(codigo))
+
+print(f"{opciones.lineas} líneas, {tokens} tokens")
+print(f"analizar_compacto      {compacto * 1000:8.1f} ms")
+print(f"fallo (analiza+guarda) {guardado * 1000:8.1f} ms")
+print(f"acierto                {acierto * 1000:8.1f} ms  ({compacto / acierto:.1f}x)")
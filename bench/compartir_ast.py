@@ -0,0 +1,60 @@
+"""
+Expresiones compartidas (FabricaNodos): nodos del árbol y objetos
+distintos, memoria retenida y tiempo de análisis, sin fábrica y con
+ella, en un programa con muchas expresiones repetidas.
+"""
+import gc
+import tracemalloc
+
+from comun import preparar, mejor_de
+
+opciones = preparar(__doc__, sentencias=100000, repeticiones=3)
+
+from lexico import AnalizadorLexico
+from sintactico import AnalizadorSintactico
+from ast_nodes import NodoAST, FabricaNodos
+
+
+def contar(raiz):
+    """Apariciones de nodos en el árbol y objetos distintos entre ellas"""
+    objetos = set()
+    apariciones = 0
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        if isinstance(nodo, list):
+            pendientes.extend(nodo)
+        elif isinstance(nodo, NodoAST):
+            apariciones += 1
+            if id(nodo) not in objetos:
+                objetos.add(id(nodo))
+                pendientes.extend(valor for _, valor in nodo.campos())
+    return apariciones, len(objetos)
+
+
+partes = []
+for k in range(opciones.sentencias // 4):
+    partes.append(f"x = x + {k % 10};\n")
+    partes.append("while (i < n) { i = i + 1; s = s + i * 2; }\n")
+    partes.append("if (x < n && !(y == 0)) y = y - 1; else y = -x;\n")
+    partes.append(f"a[i + 1] = a[i] + b[i + 1] * {k % 7};\n")
+tokens = AnalizadorLexico().analizar(''.join(partes))
+
+for nueva_fabrica in (lambda: None, FabricaNodos):
+    gc.collect()
+    tracemalloc.start()
+    fabrica = nueva_fabrica()  # Su tabla también queda retenida: es parte del costo
+    sintactico = AnalizadorSintactico(tokens, fabrica=fabrica)
+    sintactico.analizar()
+    ast = sintactico.ast
+    del sintactico
+    gc.collect()
+    retenida, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    apariciones, objetos = contar(ast)
+    tiempo = mejor_de(opciones.repeticiones,
+                      lambda: AnalizadorSintactico(tokens, fabrica=nueva_fabrica()).analizar())
+    nombre = 'sin fábrica' if fabrica is None else 'con fábrica'
+    print(f"{nombre}: {apariciones} nodos, {objetos} objetos  retenida {retenida / 1e6:.1f} MB  "
+          f"pico {pico / 1e6:.1f} MB  análisis {tiempo * 1000:.0f} ms")
+    del ast, fabrica
@@ -0,0 +1,55 @@
+"""
+Utilidades compartidas por los benchmarks de bench/.
+
+Cada script mide el árbol de fuentes indicado con --arbol (por defecto,
+el de este repositorio). Para comparar con una versión anterior se
+ejecuta el mismo script sobre un checkout de ese commit:
+
+    git worktree add /tmp/antes <commit>~1
+    python bench/<script>.py --arbol /tmp/antes
+    python bench/<script>.py
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def preparar(descripcion, **argumentos):
+    """
+    Lee los argumentos de la línea de comandos y pone el árbol a medir
+    al principio de sys.path. Cada entrada de 'argumentos' agrega una
+    opción --nombre con ese valor por defecto (y su tipo).
+    """
+    parser = argparse.ArgumentParser(description=descripcion)
+    parser.add_argument('--arbol', default=RAIZ,
+                        help='raíz del árbol de fuentes a medir (por defecto, este repositorio)')
+    for nombre, defecto in argumentos.items():
+        parser.add_argument(f'--{nombre}', type=type(defecto), default=defecto)
+    opciones = parser.parse_args()
+    sys.path.insert(0, os.path.abspath(opciones.arbol))
+    sys.setrecursionlimit(100000)
+    return opciones
+
+
+def mejor_de(repeticiones, funcion):
+    """Menor tiempo (en segundos) de 'repeticiones' llamadas a funcion()"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def programa(sentencias):
+    """Programa generado con declaraciones, comentarios y ciclos"""
+    partes = []
+    for i in range(sentencias // 2):
+        partes.append(f"int v{i} = {i} + 3 * (v{i} - 2); // comentario {i}\n")
+        partes.append(f"while (v{i} < 10) {{ v{i} = v{i} + 1; }}\n")
+    return ''.join(partes)
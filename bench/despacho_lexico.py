@@ -0,0 +1,15 @@
+"""
+Costo por token del modo 'caracter' del analizador léxico (tabla de
+despacho DESPACHO) sobre una entrada con mucha puntuación, donde el
+primer carácter de casi todos los tokens es un operador o delimitador.
+"""
+from comun import preparar, mejor_de
+
+opciones = preparar(__doc__, lineas=4000, repeticiones=3)
+
+from lexico import AnalizadorLexico
+
+codigo = "a[i]=(b+c)*(d-e)/f;if(x<=y&&z!=w||!q){k++;m-=2;}\n" * opciones.lineas
+cantidad = len(AnalizadorLexico('caracter').analizar(codigo))
+tiempo = mejor_de(opciones.repeticiones, lambda: AnalizadorLexico('caracter').analizar(codigo))
+print(f"{cantidad} tokens  {tiempo * 1000:.0f} ms  {tiempo * 1e9 / cantidad:.0f} ns/token")
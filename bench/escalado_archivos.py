@@ -0,0 +1,45 @@
+"""
+tokenizar_archivos() sobre un corpus de muchos archivos con 1, 2, 4...
+procesos (objetivo: escalar con la cantidad de núcleos). Además se
+miden en este proceso el trabajo de los procesos (analizar y serializar
+cada archivo) y la recepción de los resultados, para estimar el tiempo
+con N núcleos en una máquina que tenga menos.
+"""
+import os
+import pickle
+import tempfile
+
+from comun import preparar, mejor_de, programa
+
+opciones = preparar(__doc__, archivos=1000, lineas=200, repeticiones=3, procesos='1,2,4')
+
+from lexico import _tokenizar_archivo, tokenizar_archivos
+
+with tempfile.TemporaryDirectory() as directorio:
+    rutas = []
+    for i in range(opciones.archivos):
+        rutas.append(os.path.join(directorio, f'fuente{i}.java'))
+        with open(rutas[-1], 'w', encoding='utf-8', newline='') as archivo:
+            archivo.write(f"// archivo {i}\n" + programa(opciones.lineas))
+    print(f"{opciones.archivos} archivos de {opciones.lineas} líneas, {os.cpu_count()} núcleos")
+
+    base = None
+    for procesos in map(int, opciones.procesos.split(',')):
+        tiempo = mejor_de(opciones.repeticiones, lambda: tokenizar_archivos(rutas, workers=procesos))
+        base = base or tiempo
+        print(f"tokenizar_archivos({procesos})  {tiempo * 1000:8.0f} ms  {base / tiempo:5.2f}x")
+
+    resultados = []
+
+    def trabajar():
+        resultados[:] = [pickle.dumps(_tokenizar_archivo(ruta)) for ruta in rutas]
+
+    trabajo = mejor_de(opciones.repeticiones, trabajar)
+    recepcion = mejor_de(opciones.repeticiones, lambda: [pickle.loads(datos) for datos in resultados])
+
+print(f"procesos (total)         {trabajo * 1000:8.0f} ms")
+print(f"recepción                {recepcion * 1000:8.0f} ms  "
+      f"{sum(map(len, resultados)) / 1e6:.1f} MB serializados")
+for nucleos in (1, 2, 4, 8):
+    estimado = trabajo / nucleos + recepcion
+    print(f"estimado con {nucleos} núcleos  {estimado * 1000:8.0f} ms  {(trabajo + recepcion) / estimado:5.2f}x")
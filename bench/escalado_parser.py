@@ -0,0 +1,24 @@
+"""
+Tiempo del analizador sintáctico en función del tamaño del programa.
+Sin límite de iteraciones, el costo por token debe mantenerse constante
+(análisis lineal) y los programas grandes deben aceptarse sin errores.
+"""
+import gc
+
+from comun import preparar, mejor_de, programa
+
+opciones = preparar(__doc__, repeticiones=3, sin_gc=0)
+
+from lexico import AnalizadorLexico
+from sintactico import AnalizadorSintactico
+
+if opciones.sin_gc:
+    gc.disable()
+
+for sentencias in (60, 600, 6000, 60000):
+    tokens = AnalizadorLexico().analizar_compacto(programa(sentencias))
+    sintactico = AnalizadorSintactico(tokens)
+    correcto = sintactico.analizar()
+    tiempo = mejor_de(opciones.repeticiones, lambda: AnalizadorSintactico(tokens).analizar())
+    print(f"{len(tokens):>8} tokens  {tiempo * 1000:9.1f} ms  {tiempo / len(tokens) * 1e6:6.2f} us/token  "
+          f"correcto={correcto} errores={len(sintactico.errores)}")
@@ -0,0 +1,21 @@
+"""
+Tiempo del analizador sintáctico en programas dominados por expresiones:
+una cadena aritmética larga, paréntesis anidados y condiciones lógicas.
+"""
+from comun import preparar, mejor_de
+
+opciones = preparar(__doc__, repeticiones=3)
+
+from lexico import AnalizadorLexico
+from sintactico import AnalizadorSintactico
+
+CASOS = {
+    'cadena aritmética': 'int x = ' + ' + '.join(f'a{i} * {i} - -b{i} % 3' for i in range(20000)) + ';\n',
+    'paréntesis anidados': 'int y = ' + '(' * 300 + '1' + ' + 2)' * 300 + ';\n',
+    'lógicas': ''.join(f'x = !a{i} && b < {i} || c >= d + 1;\n' for i in range(5000)),
+}
+
+for nombre, codigo in CASOS.items():
+    tokens = AnalizadorLexico().analizar_compacto(codigo)
+    tiempo = mejor_de(opciones.repeticiones, lambda: AnalizadorSintactico(tokens).analizar())
+    print(f"{nombre:22} {len(tokens):7} tokens  {tiempo * 1000:8.1f} ms")
@@ -0,0 +1,51 @@
+"""
+Impresión del AST con pila explícita: tiempo por nodo y memoria pico
+de escribir_ast (a os.devnull) y de imprimir_ast, en programas anchos
+de tamaño creciente y en cadenas de expresiones de profundidad
+creciente. El tiempo se da por byte de salida, que en las cadenas
+crece con el cuadrado de la profundidad por la sangría.
+"""
+import os
+import tracemalloc
+
+from comun import preparar, mejor_de, programa
+
+opciones = preparar(__doc__, repeticiones=3)
+
+from lexico import AnalizadorLexico
+from sintactico import AnalizadorSintactico
+from ast_nodes import ExpresionAgrupada, Literal, escribir_ast, imprimir_ast, lineas_ast
+
+
+def pico(funcion):
+    """Memoria pico (bytes) asignada durante funcion()"""
+    tracemalloc.start()
+    funcion()
+    maximo = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return maximo
+
+
+def medir(nombre, ast, salida):
+    nodos = 0
+    caracteres = 0
+    for linea in lineas_ast(ast):
+        nodos += 1
+        caracteres += len(linea) + 1
+    tiempo = mejor_de(opciones.repeticiones, lambda: escribir_ast(ast, salida))
+    print(f"{nombre:20} {nodos:7} nodos {caracteres / 1e6:6.1f} MB  "
+          f"escribir_ast {tiempo / caracteres * 1e9:5.2f} ns/byte  "
+          f"pico {pico(lambda: escribir_ast(ast, salida)) / 1e3:9.0f} KB  "
+          f"imprimir_ast pico {pico(lambda: imprimir_ast(ast)) / 1e3:9.0f} KB")
+
+
+with open(os.devnull, 'w', encoding='utf-8') as salida:
+    for sentencias in (1000, 10000, 100000):
+        sintactico = AnalizadorSintactico(AnalizadorLexico().analizar_compacto(programa(sentencias)))
+        sintactico.analizar()
+        medir(f"ancho {sentencias} sent.", sintactico.ast, salida)
+    for profundidad in (1000, 2000, 4000, 8000):
+        ast = Literal(1, 'int')
+        for _ in range(profundidad):
+            ast = ExpresionAgrupada(ast)
+        medir(f"profundo {profundidad}", ast, salida)
@@ -0,0 +1,58 @@
+"""
+Pico de memoria (RSS) y tiempo al analizar un archivo grande: leerlo
+completo a un str y usar analizar() o analizar_compacto(), contra
+analizar_archivo(), que lo mapea en memoria y escanea los bytes. Cada
+forma se mide en un proceso aparte, porque el pico de RSS es del
+proceso entero. Solo Unix (módulo resource).
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from comun import preparar, programa
+
+opciones = preparar(__doc__, lineas=200000, forma='')
+
+from lexico import AnalizadorLexico
+
+
+def pico_mb():
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def leer(ruta):
+    with open(ruta, encoding='utf-8', newline='') as archivo:
+        return archivo.read()
+
+
+FORMAS = {
+    'analizar (str)': lambda ruta: AnalizadorLexico().analizar(leer(ruta)),
+    'analizar_compacto (str)': lambda ruta: AnalizadorLexico().analizar_compacto(leer(ruta)),
+    'analizar_archivo (mmap)': lambda ruta: AnalizadorLexico().analizar_archivo(ruta),
+}
+
+if opciones.forma:
+    # Proceso hijo: una sola forma, sobre el archivo que indica el padre
+    ruta = os.environ['RUTA_ARCHIVO']
+    antes = pico_mb()
+    inicio = time.perf_counter()
+    tokens = FORMAS[opciones.forma](ruta)
+    tiempo = time.perf_counter() - inicio
+    print(f"{opciones.forma:<26} {len(tokens):>9} tokens  {tiempo * 1000:8.0f} ms  "
+          f"pico RSS +{pico_mb() - antes:7.1f} MB")
+    sys.exit()
+
+with tempfile.TemporaryDirectory() as directorio:
+    ruta = os.path.join(directorio, 'fuente.java')
+    with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+        archivo.write(programa(opciones.lineas))
+    print(f"{opciones.lineas} líneas, {os.path.getsize(ruta) / 1e6:.1f} MB")
+    entorno = dict(os.environ, RUTA_ARCHIVO=ruta)
+    for forma in FORMAS:
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--arbol', opciones.arbol,
+                        '--forma', forma], env=entorno, check=True)
@@ -0,0 +1,76 @@
+"""
+Memoria retenida por el AST (tracemalloc) y bytes por nodo en un
+programa generado, junto con el tamaño de una instancia de los nodos
+más frecuentes y el tiempo de análisis en ambos modos.
+"""
+import gc
+import sys
+import tracemalloc
+
+from comun import preparar, mejor_de
+
+opciones = preparar(__doc__, sentencias=100000, repeticiones=3)
+
+from lexico import AnalizadorLexico
+from sintactico import AnalizadorSintactico
+import ast_nodes
+
+
+def hijos(nodo):
+    """Hijos de un nodo, tenga __slots__ o __dict__"""
+    if hasattr(nodo, '__dict__'):
+        valores = vars(nodo).values()
+    else:
+        valores = (getattr(nodo, campo, None) for clase in type(nodo).__mro__
+                   for campo in getattr(clase, '__slots__', ()))
+    for valor in valores:
+        if isinstance(valor, list):
+            yield from (x for x in valor if isinstance(x, ast_nodes.NodoAST))
+        elif isinstance(valor, ast_nodes.NodoAST):
+            yield valor
+
+
+def nodos(raiz):
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        yield nodo
+        pendientes.extend(hijos(nodo))
+
+
+def tamanio(nodo):
+    """Bytes de la instancia, más su __dict__ si lo tiene"""
+    return sys.getsizeof(nodo) + (sys.getsizeof(vars(nodo)) if hasattr(nodo, '__dict__') else 0)
+
+
+partes = []
+for i in range(opciones.sentencias // 4):
+    partes.append(f"int v{i} = {i} + 3 * (v{i} - 2);\n")
+    partes.append(f"while (v{i} < 10) {{ v{i} = v{i} + 1; }}\n")
+    partes.append(f"if (v{i} > 2 && !(v{i} == 7)) v{i} = v{i} * 2; else v{i} = -v{i};\n")
+    partes.append(f"print(v{i}, \"x\");\n")
+tokens = AnalizadorLexico().analizar(''.join(partes))
+
+gc.collect()
+tracemalloc.start()
+sintactico = AnalizadorSintactico(tokens)
+sintactico.analizar()
+ast = sintactico.ast
+del sintactico
+gc.collect()
+retenida = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+
+cantidad = 0
+muestras = {}
+for nodo in nodos(ast):
+    cantidad += 1
+    muestras.setdefault(type(nodo).__name__, nodo)
+print(f"{cantidad} nodos  retenida {retenida / 1e6:.1f} MB  {retenida / cantidad:.0f} B/nodo (con listas y tuplas)")
+for nombre in ('Literal', 'Identificador', 'ExpresionBinaria', 'Asignacion', 'SentenciaExpresion'):
+    if nombre in muestras:
+        print(f"  {nombre:20} {tamanio(muestras[nombre])} B")
+
+for modo in AnalizadorSintactico.MODOS:
+    tiempo = mejor_de(opciones.repeticiones, lambda: AnalizadorSintactico(tokens, modo).analizar())
+    print(f"análisis {modo:10} {tiempo * 1000:.0f} ms")
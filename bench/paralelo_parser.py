@@ -0,0 +1,58 @@
+"""
+analizar_paralelo() contra analizar() sobre un programa grande. Además
+del tiempo total con cada cantidad de procesos se mide cada componente
+en este proceso (cortes, trabajo de los procesos, recepción del AST),
+para estimar el tiempo con N núcleos en una máquina que tenga menos.
+"""
+import gc
+import os
+import pickle
+
+from comun import preparar, mejor_de, programa
+
+opciones = preparar(__doc__, sentencias=12000, repeticiones=3, procesos='2,4')
+
+from lexico import AnalizadorLexico
+from sintactico import AnalizadorSintactico, _analizar_tramo
+
+tokens = AnalizadorLexico().analizar_compacto(programa(opciones.sentencias))
+print(f"{len(tokens)} tokens, {os.cpu_count()} núcleos")
+
+secuencial = mejor_de(opciones.repeticiones, lambda: AnalizadorSintactico(tokens).analizar())
+print(f"analizar()                 {secuencial * 1000:8.0f} ms")
+for procesos in map(int, opciones.procesos.split(',')):
+    tiempo = mejor_de(opciones.repeticiones,
+                      lambda: AnalizadorSintactico(tokens).analizar_paralelo(workers=procesos))
+    print(f"analizar_paralelo({procesos})       {tiempo * 1000:8.0f} ms")
+
+# Componentes, con 4 tramos por proceso como analizar_paralelo
+procesos = max(map(int, opciones.procesos.split(',')))
+enviados, recibidos = [], []
+
+
+def enviar():
+    cortes = AnalizadorSintactico(tokens)._cortes_nivel_superior(procesos * 4)
+    enviados[:] = [pickle.dumps(tokens.tramo(a, b)) for a, b in zip(cortes, cortes[1:])]
+
+
+def trabajar():
+    recibidos[:] = [pickle.dumps(_analizar_tramo(pickle.loads(datos), 'recursivo')) for datos in enviados]
+
+
+def recibir():
+    gc.disable()
+    try:
+        for datos in recibidos:
+            pickle.loads(datos)
+    finally:
+        gc.enable()
+
+
+envio = mejor_de(opciones.repeticiones, enviar)
+trabajo = mejor_de(opciones.repeticiones, trabajar)
+recepcion = mejor_de(opciones.repeticiones, recibir)
+print(f"cortes + tramos + envío    {envio * 1000:8.0f} ms")
+print(f"procesos (total)           {trabajo * 1000:8.0f} ms  en {len(enviados)} tramos")
+print(f"recepción del AST          {recepcion * 1000:8.0f} ms")
+for nucleos in (2, 4, 8):
+    print(f"estimado con {nucleos} núcleos     {(envio + trabajo / nucleos + recepcion) * 1000:8.0f} ms")
@@ -0,0 +1,48 @@
+"""
+Perfil del cursor de tokens del analizador sintáctico: tiempo total y
+fracción del tiempo perfilado que se va en los auxiliares del cursor
+(_es, _actual, _avanzar, _es_tipo, _en_fin) y en las vistas de Token
+que ellos piden al TokenStream, en ambos modos y con ambas entradas.
+"""
+import cProfile
+import pstats
+
+from comun import preparar, mejor_de, programa
+
+opciones = preparar(__doc__, repeticiones=9)
+
+from lexico import AnalizadorLexico
+import sintactico
+from sintactico import AnalizadorSintactico
+
+AUXILIARES = frozenset(('_es', '_actual', '_avanzar', '_es_tipo', '_en_fin'))
+VISTAS = frozenset(('__getitem__', '__len__', '__init__', 'valor'))
+
+
+def fraccion_auxiliares(estadisticas):
+    """Tiempo propio de los auxiliares más la parte de las vistas que ellos llaman"""
+    propio = 0.0
+    for (archivo, _, funcion), (_, _, tiempo, _, llamadores) in estadisticas.stats.items():
+        if archivo == sintactico.__file__ and funcion in AUXILIARES:
+            propio += tiempo
+        elif archivo.endswith('lexico.py') and funcion in VISTAS:
+            total = sum(datos[0] for datos in llamadores.values()) or 1
+            desde = sum(datos[0] for clave, datos in llamadores.items()
+                        if clave[2] in AUXILIARES or clave[2] == '__getitem__')
+            propio += tiempo * desde / total
+    return propio / estadisticas.total_tt
+
+
+codigo = programa(2000) + ''.join(f'v[{i}] = f(a, b[{i}], o.m) + g() * -x{i};\n' for i in range(2000))
+entradas = (('lista', AnalizadorLexico().analizar(codigo)), ('flujo', AnalizadorLexico().analizar_compacto(codigo)))
+
+for modo in AnalizadorSintactico.MODOS:
+    for nombre, tokens in entradas:
+        tiempo = mejor_de(opciones.repeticiones, lambda: AnalizadorSintactico(tokens, modo).analizar())
+        perfil = cProfile.Profile()
+        perfil.enable()
+        AnalizadorSintactico(tokens, modo).analizar()
+        perfil.disable()
+        fraccion = fraccion_auxiliares(pstats.Stats(perfil))
+        print(f"{modo:10} {nombre:6} {len(tokens):6} tokens  {tiempo * 1000:7.1f} ms  "
+              f"auxiliares {fraccion * 100:5.1f}% del tiempo perfilado")
@@ -0,0 +1,57 @@
+"""
+Latencia de re-analizar (léxico y sintáctico) tras editar una línea de
+un archivo grande (objetivo: unos pocos ms para 20k líneas), contra el
+análisis completo del archivo. Cada edición cambia un número de una
+línea al azar y la siguiente la deshace. Se mide aparte cada paso:
+calcular_edicion (un editor ya conoce la edición), el re-análisis
+léxico y el sintáctico.
+"""
+import random
+import statistics
+import time
+
+from comun import preparar, mejor_de, programa
+
+opciones = preparar(__doc__, lineas=20000, ediciones=100, repeticiones=3)
+
+from lexico import AnalizadorLexico, calcular_edicion
+from sintactico import AnalizadorSintactico
+
+original = programa(opciones.lineas)
+completo = mejor_de(opciones.repeticiones,
+                    lambda: AnalizadorSintactico(AnalizadorLexico().analizar_compacto(original)).analizar())
+
+codigo = original
+flujo = AnalizadorLexico().analizar_compacto(codigo)
+anterior = AnalizadorSintactico(flujo)
+anterior.analizar()
+
+azar = random.Random(1)
+lineas = original.splitlines(keepends=True)
+pasos = {'calcular_edicion': [], 'léxico': [], 'sintáctico': []}
+for n in range(opciones.ediciones):
+    if n % 2 == 0:
+        k = azar.randrange(0, len(lineas), 2)  # 'int vK = K + 3 * (vK - 2); ...'
+        editada = lineas[k].replace(' 3 ', f' {azar.randint(4, 99)} ', 1)
+        nuevo = ''.join(lineas[:k]) + editada + ''.join(lineas[k + 1:])
+    else:
+        nuevo = original
+    t0 = time.perf_counter()
+    edicion = calcular_edicion(codigo, nuevo)
+    t1 = time.perf_counter()
+    lexico = AnalizadorLexico()
+    flujo = lexico.reanalizar(flujo, *edicion)
+    t2 = time.perf_counter()
+    sintactico = AnalizadorSintactico(flujo)
+    correcto = sintactico.reanalizar(anterior, lexico.edicion_tokens)
+    t3 = time.perf_counter()
+    for paso, tiempo in zip(pasos.values(), (t1 - t0, t2 - t1, t3 - t2)):
+        paso.append(tiempo)
+    assert correcto, sintactico.errores[:3]
+    codigo, anterior = nuevo, sintactico
+
+print(f"{opciones.lineas} líneas, {len(flujo)} tokens")
+print(f"análisis completo   {completo * 1000:8.1f} ms")
+for nombre, tiempos in pasos.items():
+    print(f"{nombre:<18}  {statistics.median(tiempos) * 1000:8.2f} ms mediana  "
+          f"{max(tiempos) * 1000:8.2f} ms máximo")
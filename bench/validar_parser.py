@@ -0,0 +1,42 @@
+"""
+validar() contra analizar() en ambos modos: tiempo, pico de memoria
+trazada (tracemalloc) durante el análisis y bloques que siguen vivos
+después, y el tiempo de analizar 100 veces cada ejemplo de main.EJEMPLOS.
+"""
+import tracemalloc
+
+from comun import preparar, mejor_de, programa
+
+opciones = preparar(__doc__, sentencias=8000, repeticiones=5)
+
+from lexico import AnalizadorLexico
+from main import EJEMPLOS
+from sintactico import AnalizadorSintactico
+
+tokens = AnalizadorLexico().analizar_compacto(programa(opciones.sentencias))
+print(f"{len(tokens)} tokens")
+
+
+def memoria(metodo, modo):
+    """(pico en MB, bloques vivos) de una llamada, sin contar los tokens"""
+    sintactico = AnalizadorSintactico(tokens, modo)
+    tracemalloc.start()
+    inicio = tracemalloc.take_snapshot()
+    getattr(sintactico, metodo)()
+    _, pico = tracemalloc.get_traced_memory()
+    vivos = sum(d.count_diff for d in tracemalloc.take_snapshot().compare_to(inicio, 'filename'))
+    tracemalloc.stop()
+    return pico / 1e6, vivos
+
+
+for modo in AnalizadorSintactico.MODOS:
+    for metodo in ('analizar', 'validar'):
+        tiempo = mejor_de(opciones.repeticiones, lambda: getattr(AnalizadorSintactico(tokens, modo), metodo)())
+        pico, vivos = memoria(metodo, modo)
+        print(f"{modo:<10} {metodo:<9} {tiempo * 1000:7.0f} ms  pico {pico:6.2f} MB  {vivos:>8} bloques vivos")
+
+ejemplos = [AnalizadorLexico().analizar_compacto(codigo) for codigo in EJEMPLOS.values()]
+for metodo in ('analizar', 'validar'):
+    tiempo = mejor_de(opciones.repeticiones, lambda: [getattr(AnalizadorSintactico(t), metodo)()
+                                                      for t in ejemplos for _ in range(100)])
+    print(f"ejemplos x100  {metodo:<9} {tiempo * 1000:7.0f} ms")
@@ -0,0 +1,28 @@
+"""
+Recorridos del AST despachados por clase de nodo: generación de TAC e
+imprimir_ast sobre un programa grande con todas las clases de sentencia
+y de expresión.
+"""
+from comun import preparar, mejor_de
+
+opciones = preparar(__doc__, sentencias=80000, repeticiones=7)
+
+from lexico import AnalizadorLexico
+from sintactico import AnalizadorSintactico
+from generador_codigo import GeneradorCodigoIntermedio
+from ast_nodes import imprimir_ast, lineas_ast
+
+partes = []
+for k in range(opciones.sentencias // 4):
+    partes.append(f"int v{k} = -({k} + 3) * (w - 2) / f(a, b + 1);\n")
+    partes.append(f"for (int i = 0; i < n; i++) {{ s = s + g(i); i--; }}\n")
+    partes.append(f"do {{ x = (x + 1); }} while (!(x >= {k}) && y != 0);\n")
+    partes.append("if (a == b) { c = h(); } else c = 2;\n")
+sintactico = AnalizadorSintactico(AnalizadorLexico().analizar_compacto(''.join(partes)))
+sintactico.analizar()
+ast = sintactico.ast
+
+nodos = sum(1 for _ in lineas_ast(ast))
+tac = mejor_de(opciones.repeticiones, lambda: GeneradorCodigoIntermedio(ast).generar())
+impresion = mejor_de(opciones.repeticiones, lambda: imprimir_ast(ast))
+print(f"{nodos} nodos  TAC {tac * 1000:.0f} ms  imprimir_ast {impresion * 1000:.0f} ms")
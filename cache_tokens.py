@@ -0,0 +1,199 @@
+"""
+Caché en disco de flujos de tokens
+Guarda cada TokenStream en un formato binario compacto, indexado por un
+hash del código fuente y de la versión del analizador léxico
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from lexico import AnalizadorLexico, TablaIdentificadores, TokenStream
+
+
+class CacheTokens:
+    """Caché de TokenStream en un directorio, con desalojo LRU por tamaño total"""
+
+    MAGICO = b'TKC1'
+    EXTENSION = '.tok'
+    _LONGITUD = struct.Struct('<Q')
+
+    def __init__(self, directorio, tamanio_maximo=64 * 1024 * 1024):
+        self.directorio = directorio
+        self.tamanio_maximo = tamanio_maximo
+        self.aciertos = 0
+        self.fallos = 0
+
+    def clave(self, codigo):
+        """Hash del código fuente junto con la versión del léxico"""
+        h = hashlib.sha256()
+        h.update(f"{AnalizadorLexico.VERSION}:{sys.byteorder}:".encode('ascii'))
+        h.update(codigo.encode('utf-8', 'surrogatepass'))
+        return h.hexdigest()
+
+    def analizar(self, codigo, lexico=None):
+        """
+        Retorna el TokenStream de 'codigo', leyéndolo de la caché si existe
+        o analizándolo y guardándolo si no. Si se da 'lexico', queda con
+        los tokens y errores como tras analizar_compacto.
+        """
+        if lexico is None:
+            lexico = AnalizadorLexico()
+        clave = self.clave(codigo)
+        flujo = self.cargar(clave, codigo)
+        if flujo is None:
+            self.fallos += 1
+            flujo = lexico.analizar_compacto(codigo)
+            self.guardar(clave, flujo)
+        else:
+            self.aciertos += 1
+            lexico.codigo = codigo
+            lexico.tokens = flujo
+            lexico.errores = flujo.mensajes_error()
+            lexico.identificadores = flujo.identificadores
+        return flujo
+
+    def cargar(self, clave, codigo):
+        """Retorna el TokenStream guardado bajo 'clave' o None"""
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as archivo:
+                datos = archivo.read()
+            os.utime(ruta)  # Marcar como usado recientemente
+        except OSError:
+            return None
+        try:
+            return self._deserializar(datos, codigo)
+        except (ValueError, struct.error, UnicodeDecodeError):
+            return None  # Entrada corrupta o de otro formato
+
+    def guardar(self, clave, flujo):
+        """Guarda el TokenStream y desaloja las entradas menos usadas"""
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            descriptor, temporal = tempfile.mkstemp(dir=self.directorio)
+        except OSError:
+            return  # La caché es opcional: un fallo de disco no detiene el análisis
+        try:
+            with os.fdopen(descriptor, 'wb') as archivo:
+                archivo.write(self._serializar(flujo))
+            os.replace(temporal, self._ruta(clave))
+        except OSError:
+            try:
+                os.remove(temporal)  # No dejar la escritura a medias en el directorio
+            except OSError:
+                pass
+            return
+        self._desalojar()
+
+    def limpiar(self):
+        """Elimina todas las entradas de la caché"""
+        for entrada in self._entradas():
+            try:
+                os.remove(entrada.path)
+            except OSError:
+                pass
+
+    # ======= Formato binario =======
+    def _serializar(self, flujo):
+        partes = [self.MAGICO]
+        self._serializar_canal(flujo, partes)
+        self._serializar_canal(flujo.comentarios, partes)
+        self._bloque(partes, flujo.anclas.tobytes())
+        self._bloque(partes, '\n'.join(flujo.identificadores.nombres).encode('utf-8'))
+        return b''.join(partes)
+
+    def _serializar_canal(self, flujo, partes):
+        for arreglo in (flujo.tipos, flujo.inicios, flujo.fines,
+                        flujo.lineas, flujo.columnas, flujo.ids):
+            self._bloque(partes, arreglo.tobytes())
+        self._bloque(partes, array('I', (i for i, _ in flujo.errores)).tobytes())
+        self._bloque(partes, '\n'.join(e for _, e in flujo.errores).encode('utf-8'))
+
+    def _bloque(self, partes, datos):
+        partes.append(self._LONGITUD.pack(len(datos)))
+        partes.append(datos)
+
+    def _deserializar(self, datos, codigo):
+        if datos[:len(self.MAGICO)] != self.MAGICO:
+            raise ValueError("Formato de caché desconocido")
+        lector = _LectorBloques(datos, len(self.MAGICO), self._LONGITUD)
+
+        identificadores = TablaIdentificadores()
+        flujo = TokenStream(codigo, identificadores=identificadores)
+        self._deserializar_canal(lector, flujo)
+        self._deserializar_canal(lector, flujo.comentarios)
+        flujo.anclas = lector.arreglo('I')
+
+        nombres = lector.bloque().decode('utf-8')
+        for nombre in nombres.split('\n') if nombres else []:
+            identificadores.registrar(nombre)
+        return flujo
+
+    def _deserializar_canal(self, lector, flujo):
+        flujo.tipos = lector.arreglo('H')
+        flujo.inicios = lector.arreglo('I')
+        flujo.fines = lector.arreglo('I')
+        flujo.lineas = lector.arreglo('I')
+        flujo.columnas = lector.arreglo('I')
+        flujo.ids = lector.arreglo('i')
+        indices = lector.arreglo('I')
+        textos = lector.bloque().decode('utf-8')
+        flujo.errores = list(zip(indices, textos.split('\n'))) if indices else []
+
+    # ======= Directorio =======
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + self.EXTENSION)
+
+    def _entradas(self):
+        try:
+            return [e for e in os.scandir(self.directorio)
+                    if e.is_file() and e.name.endswith(self.EXTENSION)]
+        except OSError:
+            return []
+
+    def _desalojar(self):
+        """Elimina las entradas usadas hace más tiempo hasta caber en el límite"""
+        entradas = []
+        total = 0
+        for entrada in self._entradas():
+            try:
+                info = entrada.stat()
+            except OSError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, entrada.path))
+            total += info.st_size
+        entradas.sort()
+        for _, tamanio, ruta in entradas:
+            if total <= self.tamanio_maximo:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+            total -= tamanio
+
+
+class _LectorBloques:
+    """Lee bloques con prefijo de longitud de un buffer de bytes"""
+
+    def __init__(self, datos, posicion, longitud):
+        self.datos = datos
+        self.posicion = posicion
+        self.longitud = longitud
+
+    def bloque(self):
+        (n,) = self.longitud.unpack_from(self.datos, self.posicion)
+        inicio = self.posicion + self.longitud.size
+        if inicio + n > len(self.datos):
+            raise ValueError("Entrada de caché truncada")
+        self.posicion = inicio + n
+        return self.datos[inicio:inicio + n]
+
+    def arreglo(self, tipo):
+        resultado = array(tipo)
+        resultado.frombytes(self.bloque())
+        return resultado
@@ -1,10 +1,45 @@
 from ast_nodes import *
+from ast_plano import ASTPlano, CLASES, NULO, LISTA
 
+# Tareas del recorrido del AST plano (además de las cadenas a emitir)
+_SENTENCIA, _EXPRESION = range(2)
+# Clase de nodo por código de fila (None para LISTA y NULO)
+_CLASE_FILA = CLASES + (None, None)
+# Expresiones que se generan al volver de sus hijos (uno o dos)
+_OPERACIONES = frozenset((Asignacion, ExpresionBinaria, ExpresionUnaria, ExpresionAgrupada))
 
-class GeneradorCodigoIntermedio:
+# Tablas de despacho del AST de nodos: clase -> método que la genera
+_SENTENCIAS = {
+    Bloque: '_generar_bloque',
+    SentenciaIf: '_generar_if',
+    SentenciaWhile: '_generar_while',
+    SentenciaDoWhile: '_generar_do_while',
+    SentenciaFor: '_generar_for',
+    SentenciaReturn: '_generar_return',
+    SentenciaExpresion: '_generar_sentencia_expresion',
+}
+# En una declaración también puede ir una variable
+_DECLARACIONES = {DeclaracionVariable: '_generar_declaracion_variable', **_SENTENCIAS}
+_EXPRESIONES = {
+    Literal: '_generar_literal',
+    Identificador: '_generar_identificador',
+    Asignacion: '_generar_asignacion',
+    ExpresionBinaria: '_generar_binaria',
+    ExpresionUnaria: '_generar_unaria',
+    ExpresionLlamada: '_generar_llamada',
+    ExpresionAgrupada: '_generar_agrupada',
+}
+
+
+class GeneradorCodigoIntermedio(VisitanteAST):
     """Genera código intermedio en formato TAC"""
     
+    VISITAS = _DECLARACIONES
+    
     def __init__(self, ast):
+        super().__init__()
+        self._sentencias = self.despacho(_SENTENCIAS)
+        self._expresiones = self.despacho(_EXPRESIONES, '_generar_expresion_otra')
         self.ast = ast
         self.codigo = []
         self.contador_temporal = 0
@@ -12,8 +47,10 @@ class GeneradorCodigoIntermedio:
         self.tabla_variables = {}
     
     def generar(self):
-        """Genera el código intermedio a partir del AST"""
-        if self.ast:
+        """Genera el código intermedio a partir del AST (de nodos o plano)"""
+        if isinstance(self.ast, ASTPlano):
+            self._generar_plano(self.ast)
+        elif self.ast:
             self._generar_programa(self.ast)
         return self.codigo
     
@@ -37,18 +74,9 @@ class GeneradorCodigoIntermedio:
     
     def _generar_programa(self, nodo):
         """Genera código para el programa completo"""
+        visitas = self._visitas
         for declaracion in nodo.declaraciones:
-            self._generar_declaracion(declaracion)
-    
-    def _generar_declaracion(self, nodo):
-        """Genera código para una declaración"""
-        if isinstance(nodo, DeclaracionVariable):
-            self._generar_declaracion_variable(nodo)
-        elif isinstance(nodo, Bloque):
-            self._generar_bloque(nodo)
-        elif isinstance(nodo, (SentenciaIf, SentenciaWhile, SentenciaDoWhile,
-                               SentenciaFor, SentenciaReturn, SentenciaExpresion)):
-            self._generar_sentencia(nodo)
+            visitas[type(declaracion)](declaracion)
     
     def _generar_declaracion_variable(self, nodo):
         """Genera código para declaración de variable"""
@@ -64,25 +92,13 @@ class GeneradorCodigoIntermedio:
     
     def _generar_sentencia(self, nodo):
         """Genera código para una sentencia"""
-        if isinstance(nodo, Bloque):
-            self._generar_bloque(nodo)
-        elif isinstance(nodo, SentenciaIf):
-            self._generar_if(nodo)
-        elif isinstance(nodo, SentenciaWhile):
-            self._generar_while(nodo)
-        elif isinstance(nodo, SentenciaDoWhile):
-            self._generar_do_while(nodo)
-        elif isinstance(nodo, SentenciaFor):
-            self._generar_for(nodo)
-        elif isinstance(nodo, SentenciaReturn):
-            self._generar_return(nodo)
-        elif isinstance(nodo, SentenciaExpresion):
-            self._generar_expresion(nodo.expresion)
+        self._sentencias[type(nodo)](nodo)
     
     def _generar_bloque(self, nodo):
         """Genera código para un bloque"""
+        visitas = self._visitas
         for sentencia in nodo.sentencias:
-            self._generar_declaracion(sentencia)
+            visitas[type(sentencia)](sentencia)
     
     def _generar_if(self, nodo):
         """Genera código para sentencia if"""
@@ -184,69 +200,284 @@ class GeneradorCodigoIntermedio:
         else:
             self._emitir("return")
     
+    def _generar_sentencia_expresion(self, nodo):
+        """Genera código para una expresión usada como sentencia"""
+        self._generar_expresion(nodo.expresion)
+    
     # ========== EXPRESIONES ==========
     
     def _generar_expresion(self, nodo):
         """Genera código para una expresión y retorna el temporal/variable resultado"""
-        if isinstance(nodo, Literal):
-            return str(nodo.valor)
-        
-        elif isinstance(nodo, Identificador):
-            return nodo.nombre
-        
-        elif isinstance(nodo, Asignacion):
-            valor = self._generar_expresion(nodo.valor)
-            self._emitir(f"{nodo.nombre} = {valor}")
-            return nodo.nombre
+        return self._expresiones[type(nodo)](nodo)
+    
+    # Las expresiones despachan a sus hijos directamente en la tabla, sin
+    # pasar por _generar_expresion: una llamada menos por nodo
+    
+    def _generar_literal(self, nodo):
+        return str(nodo.valor)
+    
+    def _generar_identificador(self, nodo):
+        return nodo.nombre
+    
+    def _generar_asignacion(self, nodo):
+        valor = nodo.valor
+        valor = self._expresiones[type(valor)](valor)
+        self._emitir(f"{nodo.nombre} = {valor}")
+        return nodo.nombre
+    
+    def _generar_binaria(self, nodo):
+        expresiones = self._expresiones
+        izq, der = nodo.izquierda, nodo.derecha
+        izq = expresiones[type(izq)](izq)
+        der = expresiones[type(der)](der)
+        temp = self._nuevo_temporal()
+        self._emitir(f"{temp} = {izq} {nodo.operador} {der}")
+        return temp
+    
+    def _generar_unaria(self, nodo):
+        operando = nodo.operando
+        operando = self._expresiones[type(operando)](operando)
+        temp = self._nuevo_temporal()
         
-        elif isinstance(nodo, ExpresionBinaria):
-            izq = self._generar_expresion(nodo.izquierda)
-            der = self._generar_expresion(nodo.derecha)
-            temp = self._nuevo_temporal()
-            self._emitir(f"{temp} = {izq} {nodo.operador} {der}")
+        if nodo.operador == '++':
+            self._emitir(f"{operando} = {operando} + 1")
+            return operando
+        elif nodo.operador == '--':
+            self._emitir(f"{operando} = {operando} - 1")
+            return operando
+        elif nodo.operador == '++_post':
+            self._emitir(f"{temp} = {operando}")
+            self._emitir(f"{operando} = {operando} + 1")
+            return temp
+        elif nodo.operador == '--_post':
+            self._emitir(f"{temp} = {operando}")
+            self._emitir(f"{operando} = {operando} - 1")
+            return temp
+        else:
+            self._emitir(f"{temp} = {nodo.operador}{operando}")
             return temp
+    
+    def _generar_llamada(self, nodo):
+        # Generar código para argumentos
+        expresiones = self._expresiones
+        args = []
+        for arg in nodo.argumentos:
+            args.append(expresiones[type(arg)](arg))
         
-        elif isinstance(nodo, ExpresionUnaria):
-            operando = self._generar_expresion(nodo.operando)
-            temp = self._nuevo_temporal()
-            
-            if nodo.operador == '++':
-                self._emitir(f"{operando} = {operando} + 1")
-                return operando
-            elif nodo.operador == '--':
-                self._emitir(f"{operando} = {operando} - 1")
-                return operando
-            elif nodo.operador == '++_post':
-                self._emitir(f"{temp} = {operando}")
-                self._emitir(f"{operando} = {operando} + 1")
-                return temp
-            elif nodo.operador == '--_post':
-                self._emitir(f"{temp} = {operando}")
-                self._emitir(f"{operando} = {operando} - 1")
-                return temp
-            else:
-                self._emitir(f"{temp} = {nodo.operador}{operando}")
-                return temp
+        # Llamada a función
+        if args:
+            args_str = ", ".join(args)
+            self._emitir(f"param {args_str}")
         
-        elif isinstance(nodo, ExpresionLlamada):
-            # Generar código para argumentos
-            args = []
-            for arg in nodo.argumentos:
-                args.append(self._generar_expresion(arg))
+        temp = self._nuevo_temporal()
+        self._emitir(f"{temp} = call {nodo.nombre}")
+        return temp
+    
+    def _generar_agrupada(self, nodo):
+        expresion = nodo.expresion
+        return self._expresiones[type(expresion)](expresion)
+    
+    def _generar_expresion_otra(self, nodo):
+        """Expresiones sin código propio (índices, accesos)"""
+        return "0"
+    
+    # ========== AST PLANO ==========
+    
+    def _generar_plano(self, plano):
+        """
+        Genera el mismo código que _generar_programa recorriendo las filas
+        de un ASTPlano con una pila de tareas en vez de recursión
+        """
+        tipos, primeros, siguientes = plano.tipos, plano.primeros, plano.siguientes
+        emitir = self._emitir
+        # Tarea: (_SENTENCIA, fila, es_declaracion), (_EXPRESION, fila, formato)
+        # o una cadena a emitir. Una sentencia de control genera lo que va
+        # antes de su cuerpo y apila el cuerpo y lo que le sigue
+        declaraciones = plano.primeros[0]
+        pendientes = [(_SENTENCIA, fila, True) for fila in plano.hijos(declaraciones)]
+        pendientes.reverse()
+        while pendientes:
+            tarea = pendientes.pop()
+            if isinstance(tarea, str):
+                emitir(tarea)
+                continue
+            accion, fila, extra = tarea
+            if accion == _EXPRESION:
+                valor = self._generar_expresion_plana(plano, fila)
+                if extra:
+                    emitir(extra.format(valor))
+                continue
             
-            # Llamada a función
-            if args:
-                args_str = ", ".join(args)
-                self._emitir(f"param {args_str}")
+            clase = _CLASE_FILA[tipos[fila]]
+            hijo = primeros[fila]
+            if clase is DeclaracionVariable:
+                # Como en _generar_sentencia, solo en posición de declaración
+                if extra:
+                    self._generar_declaracion_variable_plana(plano, fila)
             
-            temp = self._nuevo_temporal()
-            self._emitir(f"{temp} = call {nodo.nombre}")
-            return temp
-        
-        elif isinstance(nodo, ExpresionAgrupada):
-            return self._generar_expresion(nodo.expresion)
+            elif clase is Bloque:
+                sentencias = [(_SENTENCIA, sentencia, True) for sentencia in plano.hijos(hijo)]
+                pendientes.extend(reversed(sentencias))
+            
+            elif clase is SentenciaIf:
+                etiq_else = self._nueva_etiqueta()
+                etiq_fin = self._nueva_etiqueta()
+                cond = self._generar_expresion_plana(plano, hijo)
+                bloque_if = siguientes[hijo]
+                bloque_else = siguientes[bloque_if]
+                pendientes.append(f"{etiq_fin}:")
+                if tipos[bloque_else] != NULO:
+                    emitir(f"if_false {cond} goto {etiq_else}")
+                    pendientes.append((_SENTENCIA, bloque_else, False))
+                    pendientes.append(f"{etiq_else}:")
+                    pendientes.append(f"goto {etiq_fin}")
+                else:
+                    emitir(f"if_false {cond} goto {etiq_fin}")
+                pendientes.append((_SENTENCIA, bloque_if, False))
+            
+            elif clase is SentenciaWhile:
+                etiq_inicio = self._nueva_etiqueta()
+                etiq_fin = self._nueva_etiqueta()
+                emitir(f"{etiq_inicio}:")
+                cond = self._generar_expresion_plana(plano, hijo)
+                emitir(f"if_false {cond} goto {etiq_fin}")
+                pendientes.append(f"{etiq_fin}:")
+                pendientes.append(f"goto {etiq_inicio}")
+                pendientes.append((_SENTENCIA, siguientes[hijo], False))
+            
+            elif clase is SentenciaDoWhile:
+                etiq_inicio = self._nueva_etiqueta()
+                emitir(f"{etiq_inicio}:")
+                pendientes.append((_EXPRESION, siguientes[hijo], f"if_true {{}} goto {etiq_inicio}"))
+                pendientes.append((_SENTENCIA, hijo, False))
+            
+            elif clase is SentenciaFor:
+                etiq_inicio = self._nueva_etiqueta()
+                etiq_fin = self._nueva_etiqueta()
+                condicion = siguientes[hijo]
+                incremento = siguientes[condicion]
+                if plano.clase(hijo) is DeclaracionVariable:
+                    self._generar_declaracion_variable_plana(plano, hijo)
+                elif tipos[hijo] != NULO:
+                    self._generar_expresion_plana(plano, hijo)
+                emitir(f"{etiq_inicio}:")
+                if tipos[condicion] != NULO:
+                    cond = self._generar_expresion_plana(plano, condicion)
+                    emitir(f"if_false {cond} goto {etiq_fin}")
+                pendientes.append(f"{etiq_fin}:")
+                pendientes.append(f"goto {etiq_inicio}")
+                if tipos[incremento] != NULO:
+                    pendientes.append((_EXPRESION, incremento, None))
+                pendientes.append((_SENTENCIA, siguientes[incremento], False))
+            
+            elif clase is SentenciaReturn:
+                if tipos[hijo] != NULO:
+                    valor = self._generar_expresion_plana(plano, hijo)
+                    emitir(f"return {valor}")
+                else:
+                    emitir("return")
+            
+            elif clase is SentenciaExpresion:
+                self._generar_expresion_plana(plano, hijo)
+    
+    def _generar_declaracion_variable_plana(self, plano, fila):
+        """Genera código para la declaración de variable de la fila"""
+        tipo, nombre = plano.escalares(fila)
+        self.tabla_variables[nombre] = tipo
+        inicializador = plano.primeros[fila]
+        # Una lista de inicializadores vacía no genera nada; una con
+        # elementos vale "0", como en _generar_expresion
+        if plano.tipos[inicializador] == NULO:
+            return
+        if plano.tipos[inicializador] == LISTA:
+            if plano.primeros[inicializador] < 0:
+                return
+            valor = "0"
+        else:
+            valor = self._generar_expresion_plana(plano, inicializador)
+        self._emitir(f"{nombre} = {valor}")
+    
+    def _generar_expresion_plana(self, plano, raiz):
+        """
+        Genera código para la expresión de la fila 'raiz' en postorden, con
+        una pila de resultados, y retorna el temporal/variable resultado
+        """
+        tipos, primeros, siguientes = plano.tipos, plano.primeros, plano.siguientes
+        datos, valores = plano.datos, plano.valores
+        emitir = self._emitir
+        resultados = []
+        pendientes = [raiz]
+        while pendientes:
+            fila = pendientes.pop()
+            if fila >= 0:
+                clase = _CLASE_FILA[tipos[fila]]
+                if clase is Literal:
+                    resultados.append(str(valores[datos[fila]][0]))
+                elif clase is Identificador:
+                    resultados.append(valores[datos[fila]][0])
+                elif clase in _OPERACIONES:
+                    # Se vuelve a la fila (~fila) tras generar sus hijos
+                    pendientes.append(~fila)
+                    hijo = primeros[fila]
+                    if siguientes[hijo] >= 0:
+                        pendientes.append(siguientes[hijo])
+                    pendientes.append(hijo)
+                elif clase is ExpresionLlamada:
+                    pendientes.append(~fila)
+                    pendientes.extend(reversed(list(plano.hijos(primeros[fila]))))
+                else:
+                    resultados.append("0")
+                continue
+            
+            fila = ~fila
+            clase = CLASES[tipos[fila]]
+            if clase is Asignacion:
+                nombre = valores[datos[fila]][0]
+                emitir(f"{nombre} = {resultados.pop()}")
+                resultados.append(nombre)
+            
+            elif clase is ExpresionBinaria:
+                der = resultados.pop()
+                izq = resultados.pop()
+                temp = self._nuevo_temporal()
+                emitir(f"{temp} = {izq} {valores[datos[fila]][0]} {der}")
+                resultados.append(temp)
+            
+            elif clase is ExpresionUnaria:
+                operando = resultados.pop()
+                temp = self._nuevo_temporal()
+                operador = valores[datos[fila]][0]
+                if operador == '++':
+                    emitir(f"{operando} = {operando} + 1")
+                    resultados.append(operando)
+                elif operador == '--':
+                    emitir(f"{operando} = {operando} - 1")
+                    resultados.append(operando)
+                elif operador == '++_post':
+                    emitir(f"{temp} = {operando}")
+                    emitir(f"{operando} = {operando} + 1")
+                    resultados.append(temp)
+                elif operador == '--_post':
+                    emitir(f"{temp} = {operando}")
+                    emitir(f"{operando} = {operando} - 1")
+                    resultados.append(temp)
+                else:
+                    emitir(f"{temp} = {operador}{operando}")
+                    resultados.append(temp)
+            
+            elif clase is ExpresionLlamada:
+                n = plano.cantidad_hijos(primeros[fila])
+                args = resultados[len(resultados) - n:]
+                del resultados[len(resultados) - n:]
+                if args:
+                    emitir(f"param {', '.join(args)}")
+                temp = self._nuevo_temporal()
+                emitir(f"{temp} = call {valores[datos[fila]][0]}")
+                resultados.append(temp)
+            
+            # ExpresionAgrupada: el resultado del hijo queda como el suyo
         
-        return "0"
+        return resultados[0]
     
     def obtener_codigo(self):
         """Retorna el código intermedio como string formateado"""
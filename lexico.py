@@ -1,4 +1,10 @@
+import mmap
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from bisect import bisect_left, bisect_right
 from enum import Enum, auto
 
 class TipoToken(Enum):
@@ -82,16 +88,254 @@ class TipoToken(Enum):
 
 class Token:
     """Representa un token individual"""
-    def __init__(self, tipo, valor, linea, columna):
+    def __init__(self, tipo, valor, linea, columna, id_simbolo=None):
         self.tipo = tipo
         self.valor = valor
         self.linea = linea
         self.columna = columna
+        self.id_simbolo = id_simbolo  # ID en la TablaIdentificadores (solo identificadores)
     
     def __repr__(self):
         return f"Token({self.tipo.name}, '{self.valor}', L{self.linea}:C{self.columna})"
 
 
+class TablaIdentificadores:
+    """
+    Pool de identificadores de una compilación.
+    Asigna a cada nombre distinto un ID entero pequeño y conserva una
+    única instancia (sys.intern) del nombre, de modo que las búsquedas
+    posteriores en diccionarios comparan por identidad.
+    """
+    def __init__(self):
+        self.ids = {}      # lexema (str o bytes) -> ID
+        self.nombres = []  # ID -> nombre interno
+
+    def registrar(self, lexema):
+        """Retorna el ID del lexema, registrándolo si es nuevo"""
+        id_simbolo = self.ids.get(lexema)
+        if id_simbolo is None:
+            nombre = lexema if isinstance(lexema, str) else lexema.decode('ascii')
+            id_simbolo = self.ids.get(nombre)
+            if id_simbolo is None:
+                id_simbolo = len(self.nombres)
+                nombre = sys.intern(nombre)
+                self.nombres.append(nombre)
+                self.ids[nombre] = id_simbolo
+            self.ids[lexema] = id_simbolo
+        return id_simbolo
+
+    def nombre(self, id_simbolo):
+        """Retorna el nombre asociado a un ID"""
+        return self.nombres[id_simbolo]
+
+    def __len__(self):
+        return len(self.nombres)
+
+
+class TokenStream:
+    """
+    Secuencia compacta de tokens.
+    Guarda tipo, desplazamientos del valor en el código fuente, línea y
+    columna en arreglos paralelos; los objetos Token se crean bajo demanda.
+    Los comentarios van a un canal aparte (self.comentarios) y la secuencia
+    principal solo contiene tokens significativos.
+    """
+    _TIPO_POR_VALOR = {t.value: t for t in TipoToken}
+    _VALOR_POR_TIPO = {t: t.value for t in TipoToken}
+    _COMENTARIO = TipoToken.COMENTARIO
+    _IDENTIFICADOR = TipoToken.IDENTIFICADOR
+
+    def __init__(self, codigo, separar_comentarios=True, identificadores=None):
+        self.codigo = codigo
+        self.tipos = array('H')
+        self.inicios = array('I')
+        self.fines = array('I')
+        self.lineas = array('I')
+        self.columnas = array('I')
+        self.ids = array('i')  # ID del identificador o -1
+        self.identificadores = identificadores if identificadores is not None else TablaIdentificadores()
+        self.errores = []  # Lista de (índice de token, descripción)
+        self._ultimo = (-1, None)  # Última vista creada (índice, Token)
+        self._lista_tipos = None  # Caché de lista_tipos()
+        
+        # Canal de comentarios: anclas[c] es el índice del token significativo
+        # que sigue al comentario c
+        self.comentarios = (TokenStream(codigo, False, self.identificadores)
+                            if separar_comentarios else None)
+        self.anclas = array('I')
+
+    def agregar(self, tipo, inicio, fin, linea, columna, error=None):
+        """Agrega un token; codigo[inicio:fin] es su valor"""
+        if tipo is self._COMENTARIO and self.comentarios is not None:
+            self.anclas.append(len(self.tipos))
+            self.comentarios.agregar(tipo, inicio, fin, linea, columna, error)
+            return
+        if error:
+            self.errores.append((len(self.tipos), error))
+        if tipo is self._IDENTIFICADOR:
+            self.ids.append(self.identificadores.registrar(self.codigo[inicio:fin]))
+        else:
+            self.ids.append(-1)
+        self.tipos.append(self._VALOR_POR_TIPO[tipo])
+        self.inicios.append(inicio)
+        self.fines.append(fin)
+        self.lineas.append(linea)
+        self.columnas.append(columna)
+
+    def mensajes_error(self):
+        """Retorna los errores léxicos con el formato del analizador"""
+        errores = [(self.inicios[i], 1, f"Error léxico en L{self.lineas[i]}:C{self.columnas[i]}: {error}")
+                   for i, error in self.errores]
+        if self.comentarios is not None and self.comentarios.errores:
+            # En caso de empate el comentario va primero (un comentario sin
+            # cerrar y vacío comparte posición con el token que le sigue)
+            c = self.comentarios
+            errores.extend((c.inicios[i], 0, f"Error léxico en L{c.lineas[i]}:C{c.columnas[i]}: {error}")
+                           for i, error in c.errores)
+            errores.sort()
+        return [mensaje for _, _, mensaje in errores]
+
+    def comentarios_antes(self, i):
+        """Retorna los comentarios situados entre el token i-1 y el token i"""
+        desde = bisect_left(self.anclas, i)
+        hasta = bisect_right(self.anclas, i)
+        return self.comentarios[desde:hasta]
+
+    def comentarios_en(self, inicio, fin):
+        """Retorna los comentarios cuyo texto empieza en [inicio, fin)"""
+        c = self.comentarios
+        return c[bisect_left(c.inicios, inicio):bisect_left(c.inicios, fin)]
+
+    def truncar(self, n):
+        """Retorna una copia con los primeros n tokens y sus comentarios previos"""
+        copia = TokenStream(self.codigo, self.comentarios is not None, self.identificadores)
+        copia.tipos = self.tipos[:n]
+        copia.inicios = self.inicios[:n]
+        copia.fines = self.fines[:n]
+        copia.lineas = self.lineas[:n]
+        copia.columnas = self.columnas[:n]
+        copia.ids = self.ids[:n]
+        copia.errores = [e for e in self.errores if e[0] < n]
+        if self.comentarios is not None:
+            m = bisect_right(self.anclas, n)
+            copia.comentarios = self.comentarios.truncar(m)
+            copia.anclas = self.anclas[:m]
+        return copia
+
+    def tramo(self, inicio, fin):
+        """
+        Retorna un TokenStream independiente con los tokens [inicio, fin),
+        sin comentarios y con el código recortado a su extensión, para
+        enviarlo a otro proceso. Conserva líneas, columnas e identificadores.
+        """
+        desde = self.inicios[inicio] if inicio < fin else 0
+        hasta = self.fines[fin - 1] if inicio < fin else 0
+        copia = TokenStream(self.codigo[desde:hasta], False, self.identificadores)
+        copia.tipos = self.tipos[inicio:fin]
+        copia.inicios = array('I', (x - desde for x in self.inicios[inicio:fin]))
+        copia.fines = array('I', (x - desde for x in self.fines[inicio:fin]))
+        copia.lineas = self.lineas[inicio:fin]
+        copia.columnas = self.columnas[inicio:fin]
+        copia.ids = self.ids[inicio:fin]
+        copia.errores = [(i - inicio, e) for i, e in self.errores if inicio <= i < fin]
+        return copia
+
+    def extender_desplazado(self, otro, desde, delta, delta_linea, delta_columna, linea_columna):
+        """
+        Agrega los tokens otro[desde:] desplazando su posición en 'delta' y
+        su línea en 'delta_linea'; los que estaban en la línea 'linea_columna'
+        también desplazan su columna en 'delta_columna'.
+        """
+        base = len(self.tipos)
+        self.tipos.extend(otro.tipos[desde:])
+        self.ids.extend(otro.ids[desde:])
+        if delta:
+            self.inicios.extend(array('I', (x + delta for x in otro.inicios[desde:])))
+            self.fines.extend(array('I', (x + delta for x in otro.fines[desde:])))
+        else:
+            self.inicios.extend(otro.inicios[desde:])
+            self.fines.extend(otro.fines[desde:])
+        if delta_linea:
+            self.lineas.extend(array('I', (x + delta_linea for x in otro.lineas[desde:])))
+        else:
+            self.lineas.extend(otro.lineas[desde:])
+        
+        columnas = otro.columnas[desde:]
+        if delta_columna:
+            i = 0
+            while i < len(columnas) and otro.lineas[desde + i] == linea_columna:
+                columnas[i] += delta_columna
+                i += 1
+        self.columnas.extend(columnas)
+        
+        self.errores.extend((i - desde + base, e) for i, e in otro.errores if i >= desde)
+
+    def posicion_token(self, i):
+        """Retorna el desplazamiento del primer carácter del token i"""
+        salto = '\n' if isinstance(self.codigo, str) else b'\n'
+        inicio_linea = self.codigo.rfind(salto, 0, self.inicios[i]) + 1
+        return inicio_linea + self.columnas[i] - 1
+
+    def tipo(self, i):
+        """Retorna el TipoToken del token i sin crear la vista"""
+        return self._TIPO_POR_VALOR[self.tipos[i]]
+
+    def lista_tipos(self):
+        """
+        Retorna la lista de TipoToken de todos los tokens sin crear vistas.
+        La lista se guarda y se comparte entre llamadas: no debe modificarse.
+        """
+        if self._lista_tipos is None or len(self._lista_tipos) != len(self.tipos):
+            self._lista_tipos = list(map(self._TIPO_POR_VALOR.__getitem__, self.tipos))
+        return self._lista_tipos
+
+    def valor(self, i):
+        """Retorna el lexema del token i (decodificado si el código es bytes)"""
+        if self.ids[i] >= 0:
+            return self.identificadores.nombres[self.ids[i]]
+        lexema = self.codigo[self.inicios[i]:self.fines[i]]
+        return lexema if isinstance(lexema, str) else lexema.decode('ascii')
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if self._ultimo[0] == i:
+            return self._ultimo[1]
+        if not 0 <= i < len(self):
+            raise IndexError("índice de token fuera de rango")
+        id_simbolo = self.ids[i]
+        tok = Token(self._TIPO_POR_VALOR[self.tipos[i]], self.valor(i),
+                    self.lineas[i], self.columnas[i], id_simbolo if id_simbolo >= 0 else None)
+        self._ultimo = (i, tok)
+        return tok
+
+    def __iter__(self):
+        tipos = self._TIPO_POR_VALOR
+        valor = self.valor
+        for i in range(len(self.tipos)):
+            id_simbolo = self.ids[i]
+            yield Token(tipos[self.tipos[i]], valor(i), self.lineas[i], self.columnas[i],
+                        id_simbolo if id_simbolo >= 0 else None)
+
+    def __getstate__(self):
+        # Al serializar (p. ej. entre procesos) un mmap se copia a bytes
+        # y no se envía la vista en caché
+        estado = self.__dict__.copy()
+        if isinstance(self.codigo, mmap.mmap):
+            estado['codigo'] = self.codigo[:]
+        estado['_ultimo'] = (-1, None)
+        estado['_lista_tipos'] = None
+        return estado
+
+    def __repr__(self):
+        return f"TokenStream({len(self)} tokens)"
+
+
 class AnalizadorLexico:
     """Analizador Léxico (Scanner/Lexer)"""
     
@@ -119,13 +363,92 @@ class AnalizadorLexico:
         'null': TipoToken.NULL
     }
     
-    def __init__(self):
+    # Operadores de dos caracteres: primer carácter -> {segundo carácter: tipo}
+    OPERADORES_DOBLES = {
+        '+': {'+': TipoToken.INCREMENTO, '=': TipoToken.MAS_IGUAL},
+        '-': {'-': TipoToken.DECREMENTO, '=': TipoToken.MENOS_IGUAL},
+        '=': {'=': TipoToken.IGUAL_IGUAL},
+        '!': {'=': TipoToken.DIFERENTE},
+        '<': {'=': TipoToken.MENOR_IGUAL},
+        '>': {'=': TipoToken.MAYOR_IGUAL},
+        '&': {'&': TipoToken.AND},
+        '|': {'|': TipoToken.OR}
+    }
+    
+    OPERADORES_SIMPLES = {
+        '+': TipoToken.MAS,
+        '-': TipoToken.MENOS,
+        '*': TipoToken.MULTIPLICACION,
+        '/': TipoToken.DIVISION,
+        '%': TipoToken.MODULO,
+        '=': TipoToken.ASIGNACION,
+        '<': TipoToken.MENOR,
+        '>': TipoToken.MAYOR,
+        '!': TipoToken.NOT
+    }
+    
+    DELIMITADORES = {
+        '(': TipoToken.PARENTESIS_IZQ,
+        ')': TipoToken.PARENTESIS_DER,
+        '{': TipoToken.LLAVE_IZQ,
+        '}': TipoToken.LLAVE_DER,
+        '[': TipoToken.CORCHETE_IZQ,
+        ']': TipoToken.CORCHETE_DER,
+        ';': TipoToken.PUNTO_COMA,
+        ',': TipoToken.COMA,
+        '.': TipoToken.PUNTO
+    }
+    
+    # Operadores y delimitadores reconocidos por el patrón maestro
+    SIMBOLOS = {primero + segundo: tipo
+                for primero, siguientes in OPERADORES_DOBLES.items()
+                for segundo, tipo in siguientes.items()}
+    SIMBOLOS.update(OPERADORES_SIMPLES)
+    SIMBOLOS.update(DELIMITADORES)
+
+    # Patrón maestro: una sola alternancia con un grupo por categoría.
+    # El orden de los grupos reproduce el orden de los _reconocer_*.
+    PATRON = re.compile(r'''
+          (?P<espacio>[ \t\n\r]+)
+        | (?P<comentario_linea>//[^\n]*)
+        | (?P<comentario_bloque>/\*.*?\*/)
+        | (?P<comentario_abierto>/\*)
+        | (?P<numero>[0-9]+(?:\.[0-9]+)?)
+        | (?P<cadena>"[^"\\]*(?:\\.[^"\\]*)*")
+        | (?P<cadena_abierta>"[^"\\]*(?:\\.[^"\\]*)*\\?\Z)
+        | (?P<caracter>'[^']?')
+        | (?P<caracter_abierto>'[^']?)
+        | (?P<identificador>[A-Za-z_][A-Za-z0-9_]*)
+        | (?P<simbolo>\+\+|--|\+=|-=|==|!=|<=|>=|&&|\|\||[-+*/%=<>!(){}\[\];,.])
+        | (?P<otro>.)
+    ''', re.VERBOSE | re.DOTALL)
+
+    # Caracteres que pueden continuar un número o identificador no ASCII
+    _CONTINUACION = re.compile(r'[\w.]*')
+
+    # Versiones en bytes para analizar_archivo (entrada ASCII)
+    PATRON_BYTES = re.compile(PATRON.pattern.encode('ascii'), re.VERBOSE | re.DOTALL)
+    PALABRAS_BYTES = {k.encode('ascii'): v for k, v in PALABRAS_RESERVADAS.items()}
+    SIMBOLOS_BYTES = {k.encode('ascii'): v for k, v in SIMBOLOS.items()}
+    _NO_ASCII = re.compile(rb'[\x80-\xff]')
+
+    MODOS = ('regex', 'caracter')
+    VERSION = 1  # Incrementar si cambia el resultado del análisis (invalida CacheTokens)
+    _GRUPOS_MULTILINEA = frozenset(('comentario_bloque', 'comentario_abierto',
+                                    'cadena', 'cadena_abierta', 'caracter', 'caracter_abierto'))
+
+    def __init__(self, modo='regex'):
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de análisis léxico desconocido: '{modo}'")
+        self.modo = modo
         self.codigo = ""
         self.posicion = 0
         self.linea = 1
         self.columna = 1
         self.tokens = []
         self.errores = []
+        self.identificadores = TablaIdentificadores()
+        self.edicion_tokens = None  # (primero, fin_anterior, fin_nuevo) del último reanalizar
     
     def analizar(self, codigo):
         """Analiza el código fuente y retorna lista de tokens"""
@@ -135,36 +458,413 @@ class AnalizadorLexico:
         self.columna = 1
         self.tokens = []
         self.errores = []
+        self.identificadores = TablaIdentificadores()
+        
+        if self.modo == 'caracter':
+            return self._analizar_por_caracter()
         
+        self.tokens = list(self._tokens_escaneados(self._escanear(codigo)))
+        return self.tokens
+    
+    def _tokens_escaneados(self, escaner):
+        """Convierte las tuplas del escáner en Tokens, registrando errores e identificadores"""
+        identificador = TipoToken.IDENTIFICADOR
+        registrar = self.identificadores.registrar
+        nombres = self.identificadores.nombres
+        for tipo, buf, inicio, fin, linea, columna, error in escaner:
+            if error:
+                self.errores.append(f"Error léxico en L{linea}:C{columna}: {error}")
+            if tipo is identificador:
+                id_simbolo = registrar(buf[inicio:fin])
+                yield Token(tipo, nombres[id_simbolo], linea, columna, id_simbolo)
+            else:
+                yield Token(tipo, buf[inicio:fin], linea, columna)
+    
+    def analizar_compacto(self, codigo):
+        """
+        Analiza el código fuente y retorna un TokenStream.
+        Usa siempre el escáner por patrón maestro.
+        """
+        self.codigo = codigo
+        self.posicion = 0
+        self.linea = 1
+        self.columna = 1
+        self.tokens = []
+        self.errores = []
+        
+        flujo = TokenStream(codigo)
+        agregar = flujo.agregar
+        for tipo, _, inicio, fin, linea, columna, error in self._escanear(codigo):
+            agregar(tipo, inicio, fin, linea, columna, error)
+        self.tokens = flujo
+        self.errores = flujo.mensajes_error()
+        self.identificadores = flujo.identificadores
+        return flujo
+    
+    def analizar_archivo(self, ruta, codificacion='utf-8'):
+        """
+        Analiza un archivo y retorna un TokenStream.
+        El archivo se mapea en memoria y, si es ASCII puro, se escanea como
+        bytes sin copiarlo: el flujo conserva el mapa y los lexemas se
+        decodifican solo al pedir su valor. Si contiene otros bytes se
+        decodifica completo y se usa analizar_compacto.
+        """
+        with open(ruta, 'rb') as archivo:
+            try:
+                datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                datos = b''  # Un archivo vacío no se puede mapear
+        
+        if self._NO_ASCII.search(datos):
+            codigo = str(datos, codificacion)
+            datos.close()
+            return self.analizar_compacto(codigo)
+        
+        self.codigo = datos
+        self.posicion = 0
+        self.linea = 1
+        self.columna = 1
+        self.errores = []
+        
+        flujo = TokenStream(datos)
+        agregar = flujo.agregar
+        for tipo, _, inicio, fin, linea, columna, error in self._escanear_bytes(datos):
+            agregar(tipo, inicio, fin, linea, columna, error)
+        self.tokens = flujo
+        self.errores = flujo.mensajes_error()
+        self.identificadores = flujo.identificadores
+        return flujo
+    
+    def reanalizar(self, flujo, inicio, borrados, insertado):
+        """
+        Re-analiza un TokenStream (con canal de comentarios) tras una
+        edición del código fuente.
+        La edición reemplaza 'borrados' caracteres desde 'inicio' por
+        'insertado'. Solo se re-escanea desde el último token no afectado
+        hasta que los tokens vuelven a coincidir con el flujo anterior; los
+        siguientes se copian desplazando posición, línea y columna.
+        Retorna un nuevo TokenStream; 'flujo' no se modifica. En
+        edicion_tokens queda (primero, fin_anterior, fin_nuevo): los tokens
+        [primero, fin_anterior) de 'flujo' son [primero, fin_nuevo) en el
+        nuevo y los demás coinciden (desplazados).
+        """
+        anterior = flujo.codigo
+        if not isinstance(anterior, str):
+            anterior = anterior[:].decode('ascii')  # Flujo de analizar_archivo
+        codigo = anterior[:inicio] + insertado + anterior[inicio + borrados:]
+        delta = len(insertado) - borrados
+        fin_edicion = inicio + len(insertado)  # En el código nuevo
+        
+        # Un token depende de hasta dos caracteres posteriores a su fin,
+        # así que se conservan solo los que terminan antes de inicio - 2.
+        # Se re-escanea desde el inicio del último de ellos.
+        conservados = max(bisect_right(flujo.fines, inicio - 3) - 1, 0)
+        if conservados:
+            desde = flujo.posicion_token(conservados)
+            linea = flujo.lineas[conservados]
+        else:
+            desde, linea = 0, 1
+        
+        if conservados:
+            nuevo = flujo.truncar(conservados)
+            nuevo.codigo = codigo
+            nuevo.comentarios.codigo = codigo
+        else:
+            nuevo = TokenStream(codigo, identificadores=flujo.identificadores)
+        
+        errores_previos = dict(flujo.errores)
+        tipos_previos = flujo.tipos
+        inicios_previos = flujo.inicios
+        total_previos = len(flujo)
+        j = conservados  # Candidato a coincidir en el flujo anterior
+        sincronizado = None
+        
+        for tipo, _, ini, fin, linea, columna, error in self._escanear(codigo, pos=desde, linea=linea):
+            nuevo.agregar(tipo, ini, fin, linea, columna, error)
+            if ini < fin_edicion or tipo is TipoToken.EOF or tipo is TipoToken.COMENTARIO:
+                continue
+            while j < total_previos and inicios_previos[j] + delta < ini:
+                j += 1
+            if (j < total_previos and inicios_previos[j] + delta == ini and
+                    flujo.fines[j] + delta == fin and tipos_previos[j] == tipo.value and
+                    errores_previos.get(j) == error):
+                sincronizado = j
+                break
+        
+        if sincronizado is not None:
+            self.edicion_tokens = (conservados, sincronizado, len(nuevo) - 1)
+            self._copiar_desplazado(flujo, nuevo, sincronizado, delta, conservados)
+        else:
+            self.edicion_tokens = (conservados, total_previos, len(nuevo))
+        
+        self.codigo = codigo
+        self.tokens = nuevo
+        self.errores = nuevo.mensajes_error()
+        self.identificadores = nuevo.identificadores
+        return nuevo
+    
+    @staticmethod
+    def _copiar_desplazado(flujo, nuevo, j, delta, conservados):
+        """
+        Copia los tokens y comentarios de 'flujo' posteriores a j (ya
+        sincronizado); los primeros 'conservados' de 'nuevo' son los de 'flujo'
+        """
+        k = len(nuevo) - 1  # Índice de j en el flujo nuevo
+        delta_linea = nuevo.lineas[k] - flujo.lineas[j]
+        delta_columna = nuevo.columnas[k] - flujo.columnas[j]
+        linea_sinc = flujo.lineas[j]
+        
+        nuevo.extender_desplazado(flujo, j + 1, delta, delta_linea, delta_columna, linea_sinc)
+        
+        desde = bisect_right(flujo.anclas, j)
+        nuevo.comentarios.extender_desplazado(flujo.comentarios, desde, delta,
+                                              delta_linea, delta_columna, linea_sinc)
+        nuevo.anclas.extend(array('I', (a - j + k for a in flujo.anclas[desde:])))
+        
+        # Si el flujo anterior ya tenía su lista de tipos, se empalma
+        previos = flujo._lista_tipos
+        if previos is not None and len(previos) == len(flujo.tipos):
+            nuevo._lista_tipos = (previos[:conservados] +
+                                  list(map(nuevo._TIPO_POR_VALOR.__getitem__, nuevo.tipos[conservados:k])) +
+                                  previos[j:])
+    
+    def _analizar_por_caracter(self):
+        """Recorre el código carácter a carácter con los _reconocer_*"""
         while self.posicion < len(self.codigo):
             self._saltar_espacios()
             
             if self.posicion >= len(self.codigo):
                 break
             
-            # Intentar reconocer comentarios
-            if self._reconocer_comentario():
-                continue
-            
-            # Intentar reconocer tokens
-            if not (self._reconocer_numero() or
-                    self._reconocer_cadena() or
-                    self._reconocer_caracter() or
-                    self._reconocer_identificador_o_palabra_reservada() or
-                    self._reconocer_operador() or
-                    self._reconocer_delimitador()):
-                
-                # Token no reconocido - error léxico
-                caracter = self.codigo[self.posicion]
-                self.errores.append(f"Error léxico en L{self.linea}:C{self.columna}: "
-                                  f"Carácter no reconocido '{caracter}'")
-                self.tokens.append(Token(TipoToken.ERROR, caracter, self.linea, self.columna))
-                self._avanzar()
+            self._reconocer_token()
         
         # Agregar token EOF
         self.tokens.append(Token(TipoToken.EOF, '', self.linea, self.columna))
         return self.tokens
     
+    def _reconocer_token(self):
+        """Reconoce un único token (o comentario) en la posición actual"""
+        caracter = self.codigo[self.posicion]
+        codigo_caracter = ord(caracter)
+        
+        if codigo_caracter < 256:
+            # Despacho directo por el primer carácter
+            entrada = self.DESPACHO[codigo_caracter]
+            if entrada.__class__ is TipoToken:
+                self.tokens.append(Token(entrada, caracter, self.linea, self.columna))
+                self._avanzar()
+                return
+            if entrada is not None and entrada(self):
+                return
+        elif (self._reconocer_numero() or
+                self._reconocer_identificador_o_palabra_reservada()):
+            # Fuera de Latin-1 solo puede empezar un número o identificador
+            return
+        
+        # Token no reconocido - error léxico
+        self.errores.append(f"Error léxico en L{self.linea}:C{self.columna}: "
+                          f"Carácter no reconocido '{caracter}'")
+        self.tokens.append(Token(TipoToken.ERROR, caracter, self.linea, self.columna))
+        self._avanzar()
+    
+    def iter_tokens(self, fuente, tamanio_fragmento=65536):
+        """
+        Genera los tokens a medida que se reconocen.
+        'fuente' puede ser un str o un archivo de texto abierto; en ese caso
+        se lee por fragmentos y solo se retiene la parte aún no consumida.
+        Los errores se acumulan en self.errores; self.tokens no se llena.
+        """
+        self.codigo = ""
+        self.posicion = 0
+        self.linea = 1
+        self.columna = 1
+        self.tokens = []
+        self.errores = []
+        self.identificadores = TablaIdentificadores()
+        
+        if isinstance(fuente, str):
+            escaner = self._escanear(fuente)
+        else:
+            escaner = self._escanear('', iter(lambda: fuente.read(tamanio_fragmento), ''))
+        yield from self._tokens_escaneados(escaner)
+    
+    def _escanear(self, codigo, fragmentos=None, pos=0, linea=1):
+        """
+        Escáner basado en el patrón maestro.
+        Genera tuplas (tipo, buf, inicio, fin, linea, columna, error) donde
+        buf[inicio:fin] es el valor del token y error la descripción del
+        error léxico (o None); termina con EOF.
+        Si se da un iterador de 'fragmentos', buf es un búfer que se recorta
+        y se rellena con ellos; si no, buf es siempre 'codigo'.
+        'pos' y 'linea' permiten reanudar desde el inicio de un token.
+        """
+        coincidir = self.PATRON.match
+        continuacion = self._CONTINUACION.match
+        palabras = self.PALABRAS_RESERVADAS
+        simbolos = self.SIMBOLOS
+        buf = codigo
+        n = len(buf)
+        fin_entrada = fragmentos is None
+        base = 0          # Desplazamiento de buf dentro de la entrada completa
+        inicio_linea = buf.rfind('\n', 0, pos) + 1  # Primer carácter de la línea actual
+        
+        while True:
+            if pos >= n:
+                if fin_entrada:
+                    break
+                m = None
+            else:
+                m = coincidir(buf, pos)
+                grupo = m.lastgroup
+                fin = m.end()
+                # Los caracteres no ASCII (letras, dígitos Unicode) se delegan
+                # al reconocedor carácter a carácter para conservar su semántica
+                delegar = ((grupo == 'otro' and buf[pos] >= '\x80') or
+                           (grupo in ('numero', 'identificador') and not buf[fin:fin + 2].isascii()))
+            
+            # Un token que toca el final del búfer podría continuar en el
+            # siguiente fragmento: leer más antes de decidir
+            if not fin_entrada and (
+                    m is None or fin == n or grupo == 'comentario_abierto' or
+                    (grupo in ('numero', 'identificador') and fin + 2 > n) or
+                    (delegar and continuacion(buf, pos).end() >= n)):
+                trozo = next(fragmentos, None)
+                if trozo is None:
+                    fin_entrada = True
+                else:
+                    buf = buf[pos:] + trozo
+                    base += pos
+                    pos = 0
+                    n = len(buf)
+                continue
+            
+            if grupo == 'espacio':
+                saltos = buf.count('\n', pos, fin)
+                if saltos:
+                    linea += saltos
+                    inicio_linea = base + buf.rfind('\n', pos, fin) + 1
+                pos = fin
+                continue
+            
+            columna = base + pos - inicio_linea + 1
+            
+            if delegar:
+                # El reconocedor agrega a self.tokens y self.errores, que
+                # pueden ser de otro análisis (p. ej. un TokenStream): se
+                # usan listas propias mientras reconoce
+                tokens, errores = self.tokens, self.errores
+                self.tokens, self.errores = [], []
+                self.codigo = buf
+                self.posicion, self.linea, self.columna = pos, linea, columna
+                try:
+                    self._reconocer_token()
+                    tok = self.tokens[0]
+                    error = self.errores[0].split(': ', 1)[1] if self.errores else None
+                finally:
+                    self.tokens, self.errores = tokens, errores
+                fin = self.posicion
+                yield tok.tipo, buf, pos, fin, linea, columna, error
+                pos = fin
+                continue
+            
+            if grupo == 'identificador':
+                yield palabras.get(buf[pos:fin], TipoToken.IDENTIFICADOR), buf, pos, fin, linea, columna, None
+            elif grupo == 'simbolo':
+                yield simbolos[buf[pos:fin]], buf, pos, fin, linea, columna, None
+            elif grupo == 'numero':
+                tipo = TipoToken.NUMERO_FLOTANTE if '.' in buf[pos:fin] else TipoToken.NUMERO_ENTERO
+                yield tipo, buf, pos, fin, linea, columna, None
+            elif grupo == 'comentario_linea':
+                yield TipoToken.COMENTARIO, buf, pos, fin, linea, columna, None
+            elif grupo == 'comentario_bloque':
+                yield TipoToken.COMENTARIO, buf, pos + 2, fin, linea, columna, None
+            elif grupo == 'comentario_abierto':
+                # Igual que el reconocedor original: el último carácter no se consume
+                fin = max(fin, n - 1)
+                yield TipoToken.COMENTARIO, buf, pos + 2, fin, linea, columna, 'Comentario de bloque sin cerrar'
+            elif grupo == 'cadena':
+                yield TipoToken.CADENA, buf, pos + 1, fin - 1, linea, columna, None
+            elif grupo == 'cadena_abierta':
+                yield TipoToken.ERROR, buf, pos + 1, fin, linea, columna, 'Cadena sin cerrar'
+            elif grupo == 'caracter':
+                yield TipoToken.CARACTER, buf, pos + 1, fin - 1, linea, columna, None
+            elif grupo == 'caracter_abierto':
+                yield TipoToken.ERROR, buf, pos + 1, fin, linea, columna, 'Carácter sin cerrar'
+            else:
+                yield TipoToken.ERROR, buf, pos, fin, linea, columna, f"Carácter no reconocido '{buf[pos]}'"
+            
+            # Comentarios de bloque y cadenas pueden abarcar varias líneas
+            if grupo in self._GRUPOS_MULTILINEA:
+                saltos = buf.count('\n', pos, fin)
+                if saltos:
+                    linea += saltos
+                    inicio_linea = base + buf.rfind('\n', pos, fin) + 1
+            pos = fin
+        
+        yield TipoToken.EOF, buf, n, n, linea, base + n - inicio_linea + 1, None
+    
+    def _escanear_bytes(self, datos):
+        """
+        Variante de _escanear sobre bytes ASCII (p. ej. un mmap).
+        Genera las mismas tuplas; no necesita delegar caracteres no ASCII.
+        """
+        coincidir = self.PATRON_BYTES.match
+        palabras = self.PALABRAS_BYTES
+        simbolos = self.SIMBOLOS_BYTES
+        n = len(datos)
+        pos = 0
+        linea = 1
+        inicio_linea = 0
+        
+        while pos < n:
+            m = coincidir(datos, pos)
+            grupo = m.lastgroup
+            fin = m.end()
+            
+            if grupo == 'espacio':
+                saltos = datos[pos:fin].count(b'\n')
+                if saltos:
+                    linea += saltos
+                    inicio_linea = datos.rfind(b'\n', pos, fin) + 1
+                pos = fin
+                continue
+            
+            columna = pos - inicio_linea + 1
+            
+            if grupo == 'identificador':
+                yield palabras.get(datos[pos:fin], TipoToken.IDENTIFICADOR), datos, pos, fin, linea, columna, None
+            elif grupo == 'simbolo':
+                yield simbolos[datos[pos:fin]], datos, pos, fin, linea, columna, None
+            elif grupo == 'numero':
+                tipo = TipoToken.NUMERO_FLOTANTE if datos.find(b'.', pos, fin) >= 0 else TipoToken.NUMERO_ENTERO
+                yield tipo, datos, pos, fin, linea, columna, None
+            elif grupo == 'comentario_linea':
+                yield TipoToken.COMENTARIO, datos, pos, fin, linea, columna, None
+            elif grupo == 'comentario_bloque':
+                yield TipoToken.COMENTARIO, datos, pos + 2, fin, linea, columna, None
+            elif grupo == 'comentario_abierto':
+                fin = max(fin, n - 1)
+                yield TipoToken.COMENTARIO, datos, pos + 2, fin, linea, columna, 'Comentario de bloque sin cerrar'
+            elif grupo == 'cadena':
+                yield TipoToken.CADENA, datos, pos + 1, fin - 1, linea, columna, None
+            elif grupo == 'cadena_abierta':
+                yield TipoToken.ERROR, datos, pos + 1, fin, linea, columna, 'Cadena sin cerrar'
+            elif grupo == 'caracter':
+                yield TipoToken.CARACTER, datos, pos + 1, fin - 1, linea, columna, None
+            elif grupo == 'caracter_abierto':
+                yield TipoToken.ERROR, datos, pos + 1, fin, linea, columna, 'Carácter sin cerrar'
+            else:
+                yield TipoToken.ERROR, datos, pos, fin, linea, columna, f"Carácter no reconocido '{chr(datos[pos])}'"
+            
+            if grupo in self._GRUPOS_MULTILINEA:
+                saltos = datos[pos:fin].count(b'\n')
+                if saltos:
+                    linea += saltos
+                    inicio_linea = datos.rfind(b'\n', pos, fin) + 1
+            pos = fin
+        
+        yield TipoToken.EOF, datos, n, n, linea, n - inicio_linea + 1, None
+    
     def _caracter_actual(self):
         """Retorna el carácter actual sin avanzar"""
         if self.posicion < len(self.codigo):
@@ -332,112 +1032,60 @@ class AnalizadorLexico:
         
         # Verificar si es palabra reservada
         tipo = self.PALABRAS_RESERVADAS.get(identificador, TipoToken.IDENTIFICADOR)
-        self.tokens.append(Token(tipo, identificador, linea_inicio, col_inicio))
+        if tipo == TipoToken.IDENTIFICADOR:
+            id_simbolo = self.identificadores.registrar(identificador)
+            self.tokens.append(Token(tipo, self.identificadores.nombre(id_simbolo),
+                                     linea_inicio, col_inicio, id_simbolo))
+        else:
+            self.tokens.append(Token(tipo, identificador, linea_inicio, col_inicio))
         return True
     
     def _reconocer_operador(self):
-        """Reconoce operadores"""
-        linea_inicio = self.linea
-        col_inicio = self.columna
+        """Reconoce operadores (el de dos caracteres tiene prioridad)"""
         c = self._caracter_actual()
-        sig = self._siguiente_caracter()
         
-        # Operadores de dos caracteres
-        if c == '+' and sig == '+':
-            self.tokens.append(Token(TipoToken.INCREMENTO, '++', linea_inicio, col_inicio))
-            self._avanzar()
-            self._avanzar()
-            return True
-        elif c == '-' and sig == '-':
-            self.tokens.append(Token(TipoToken.DECREMENTO, '--', linea_inicio, col_inicio))
-            self._avanzar()
-            self._avanzar()
-            return True
-        elif c == '+' and sig == '=':
-            self.tokens.append(Token(TipoToken.MAS_IGUAL, '+=', linea_inicio, col_inicio))
-            self._avanzar()
-            self._avanzar()
-            return True
-        elif c == '-' and sig == '=':
-            self.tokens.append(Token(TipoToken.MENOS_IGUAL, '-=', linea_inicio, col_inicio))
-            self._avanzar()
-            self._avanzar()
-            return True
-        elif c == '=' and sig == '=':
-            self.tokens.append(Token(TipoToken.IGUAL_IGUAL, '==', linea_inicio, col_inicio))
-            self._avanzar()
-            self._avanzar()
-            return True
-        elif c == '!' and sig == '=':
-            self.tokens.append(Token(TipoToken.DIFERENTE, '!=', linea_inicio, col_inicio))
-            self._avanzar()
-            self._avanzar()
-            return True
-        elif c == '<' and sig == '=':
-            self.tokens.append(Token(TipoToken.MENOR_IGUAL, '<=', linea_inicio, col_inicio))
-            self._avanzar()
-            self._avanzar()
-            return True
-        elif c == '>' and sig == '=':
-            self.tokens.append(Token(TipoToken.MAYOR_IGUAL, '>=', linea_inicio, col_inicio))
-            self._avanzar()
-            self._avanzar()
-            return True
-        elif c == '&' and sig == '&':
-            self.tokens.append(Token(TipoToken.AND, '&&', linea_inicio, col_inicio))
-            self._avanzar()
-            self._avanzar()
-            return True
-        elif c == '|' and sig == '|':
-            self.tokens.append(Token(TipoToken.OR, '||', linea_inicio, col_inicio))
-            self._avanzar()
-            self._avanzar()
-            return True
+        siguientes = self.OPERADORES_DOBLES.get(c)
+        if siguientes:
+            sig = self._siguiente_caracter()
+            tipo = siguientes.get(sig)
+            if tipo:
+                self.tokens.append(Token(tipo, c + sig, self.linea, self.columna))
+                self._avanzar()
+                self._avanzar()
+                return True
         
-        # Operadores de un carácter
-        operadores_simples = {
-            '+': TipoToken.MAS,
-            '-': TipoToken.MENOS,
-            '*': TipoToken.MULTIPLICACION,
-            '/': TipoToken.DIVISION,
-            '%': TipoToken.MODULO,
-            '=': TipoToken.ASIGNACION,
-            '<': TipoToken.MENOR,
-            '>': TipoToken.MAYOR,
-            '!': TipoToken.NOT
-        }
-        
-        if c in operadores_simples:
-            self.tokens.append(Token(operadores_simples[c], c, linea_inicio, col_inicio))
+        tipo = self.OPERADORES_SIMPLES.get(c)
+        if tipo:
+            self.tokens.append(Token(tipo, c, self.linea, self.columna))
             self._avanzar()
             return True
         
         return False
     
-    def _reconocer_delimitador(self):
-        """Reconoce delimitadores"""
-        linea_inicio = self.linea
-        col_inicio = self.columna
-        c = self._caracter_actual()
-        
-        delimitadores = {
-            '(': TipoToken.PARENTESIS_IZQ,
-            ')': TipoToken.PARENTESIS_DER,
-            '{': TipoToken.LLAVE_IZQ,
-            '}': TipoToken.LLAVE_DER,
-            '[': TipoToken.CORCHETE_IZQ,
-            ']': TipoToken.CORCHETE_DER,
-            ';': TipoToken.PUNTO_COMA,
-            ',': TipoToken.COMA,
-            '.': TipoToken.PUNTO
-        }
-        
-        if c in delimitadores:
-            self.tokens.append(Token(delimitadores[c], c, linea_inicio, col_inicio))
-            self._avanzar()
-            return True
-        
-        return False
+    def _reconocer_barra(self):
+        """'/' puede iniciar un comentario o ser el operador división"""
+        return self._reconocer_comentario() or self._reconocer_operador()
+    
+    # Tabla de despacho del modo 'caracter': para cada carácter Latin-1,
+    # el reconocedor que le corresponde o, si es delimitador, su tipo
+    DESPACHO = [None] * 256
+    for _i in range(256):
+        _c = chr(_i)
+        if _c == '/':
+            DESPACHO[_i] = _reconocer_barra
+        elif _c.isdigit():
+            DESPACHO[_i] = _reconocer_numero
+        elif _c == '"':
+            DESPACHO[_i] = _reconocer_cadena
+        elif _c == "'":
+            DESPACHO[_i] = _reconocer_caracter
+        elif _c.isalpha() or _c == '_':
+            DESPACHO[_i] = _reconocer_identificador_o_palabra_reservada
+        elif _c in OPERADORES_DOBLES or _c in OPERADORES_SIMPLES:
+            DESPACHO[_i] = _reconocer_operador
+        elif _c in DELIMITADORES:
+            DESPACHO[_i] = DELIMITADORES[_c]
+    del _i, _c
     
     def obtener_tabla_tokens(self):
         """Genera la tabla de tokens reconocidos"""
@@ -455,4 +1103,73 @@ class AnalizadorLexico:
         resultado += '='*70 + '\n'
         
         # NO agregues errores aquí - solo la tabla de tokens
-        return resultado
\ No newline at end of file
+        return resultado
+
+
+def calcular_edicion(anterior, nuevo):
+    """
+    Retorna (inicio, borrados, insertado): la edición mínima por prefijo y
+    sufijo comunes que transforma 'anterior' en 'nuevo'.
+    """
+    limite = min(len(anterior), len(nuevo))
+    
+    # Prefijo común (búsqueda binaria sobre comparaciones de porciones)
+    bajo, alto = 0, limite
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if anterior[:medio] == nuevo[:medio]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    inicio = bajo
+    
+    # Sufijo común, sin solaparse con el prefijo
+    bajo, alto = 0, limite - inicio
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if anterior[len(anterior) - medio:] == nuevo[len(nuevo) - medio:]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    sufijo = bajo
+    
+    return inicio, len(anterior) - inicio - sufijo, nuevo[inicio:len(nuevo) - sufijo]
+
+
+def _tokenizar_archivo(ruta, cache=None):
+    """Tarea de tokenizar_archivos: analiza un archivo en un proceso trabajador"""
+    lexico = AnalizadorLexico()
+    try:
+        if cache is None:
+            flujo = lexico.analizar_archivo(ruta)
+        else:
+            # Sin traducir los fines de línea, como analizar_archivo
+            with open(ruta, encoding='utf-8', newline='') as archivo:
+                flujo = cache.analizar(archivo.read(), lexico)
+    except (OSError, UnicodeDecodeError) as e:
+        return None, [f"Error al leer el archivo: {e}"]
+    return flujo, lexico.errores
+
+
+def tokenizar_archivos(rutas, workers=None, cache=None):
+    """
+    Analiza varios archivos en paralelo con un pool de procesos.
+    Retorna una lista de (ruta, flujo, errores) en el orden de 'rutas';
+    flujo es un TokenStream (None si el archivo no se pudo leer) y errores
+    la lista de errores léxicos de ese archivo. Con 'cache' (CacheTokens)
+    los archivos sin cambios no se vuelven a analizar.
+    """
+    rutas = list(rutas)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    if workers <= 1 or len(rutas) <= 1:
+        resultados = [_tokenizar_archivo(ruta, cache) for ruta in rutas]
+    else:
+        # Lotes de varios archivos por tarea para amortizar la comunicación
+        lote = max(1, len(rutas) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resultados = list(pool.map(_tokenizar_archivo, rutas, [cache] * len(rutas),
+                                          chunksize=lote))
+    
+    return [(ruta, flujo, errores) for ruta, (flujo, errores) in zip(rutas, resultados)]
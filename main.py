@@ -1,17 +1,186 @@
+import os
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 
-from lexico import AnalizadorLexico
+from cache_tokens import CacheTokens
+from lexico import AnalizadorLexico, calcular_edicion
 from sintactico import AnalizadorSintactico
 from semantico import AnalizadorSemantico
 
+# Ejemplos del diálogo 'Ejemplos': título → código
+EJEMPLOS = {
+    '✅ FOR con IF anidado - Correcto': '''int x = 0;
+int cout = 0;
+for( x = 0; x < 5; x++ ){
+    if(x == 1){
+        cout = x;
+    }
+}''',
+    '❌ FOR - Sin punto y coma en el cuerpo': '''int x = 0;
+int cout = 0;
+for( x = 0; x < 5; x++ ){
+    if(x == 1){
+        cout = x
+    }
+}''',
+    '❌ FOR - Falta llave de cierre en FOR': '''int x = 0;
+for( x = 0; x < 5; x++ ){
+    if(x == 1){
+        int cout = x;
+    }''',
+    '❌ FOR - Sin llaves en IF': '''int x = 0;
+for( x = 0; x < 5; x++ ){
+    if(x == 1)
+        int cout = x;
+}''',
+    '✅ WHILE con IF anidado - Correcto': '''int a = 0;
+while( a < 5 ){
+    if( a == 2 ){
+        a = a + 1;
+    }
+    a = a + 1;
+}''',
+    '❌ WHILE - Sin punto y coma en el cuerpo': '''int a = 0;
+while( a < 5 ){
+    a = a + 1
+}''',
+    '❌ Semántico - Variable no declarada': '''for( i = 0; i < 10; i++ ){
+    int x = i;
+}''',
+    '✅ DO-WHILE - Correcto': '''int x = 0;
+do {
+    x = x + 1;
+} while (x < 5);''',
+    '❌ DO-WHILE - Sin punto y coma final': '''int x = 0;
+do {
+    x = x + 1;
+} while (x < 5)''',
+    '✅ Arreglo tamaño fijo + while': '''int arreglo[10];
+int x = 0;
+
+while(x < 10){
+    arreglo[x] = x * 2;
+    x = x + 1;
+}''',
+    '✅ BubbleSort con for anidado': '''int n = 5;
+int numeros[5];
+int i = 0;
+int j = 0;
+int temp = 0;
+
+numeros[0] = 5;
+numeros[1] = 1;
+numeros[2] = 4;
+numeros[3] = 2;
+numeros[4] = 3;
+
+for(i = 0; i < n - 1; i++){
+    for(j = 0; j < n - 1 - i; j++){
+        if(numeros[j] > numeros[j + 1]){
+            temp = numeros[j];
+            numeros[j] = numeros[j + 1];
+            numeros[j + 1] = temp;
+        }
+    }
+}''',
+    '✅ String con comillas dobles - Correcto': '''String nombre = "Hola Mundo";
+String saludo = "Bienvenido";''',
+    '❌ Tipo incompatible - int = String': '''int numero = 10;
+numero = "texto";''',
+    '❌ Tipo incompatible - String = int': '''String texto = "hola";
+texto = 123;''',
+    '❌ Tipo incompatible - boolean = int': '''boolean flag = true;
+flag = 5;''',
+    '❌ Tipo incompatible - int = boolean': '''int x = 0;
+x = true;''',
+    '✅ Concatenación de String - Correcto': '''String a = "Hola";
+String b = "Mundo";
+String c = a;''',
+    '❌ Operación aritmética con String': '''String texto = "hola";
+int x = 5;
+int resultado = x - texto;''',
+    '❌ Comparación inválida String < int': '''String texto = "hola";
+int x = 5;
+boolean r = texto < x;''',
+    '✅ FOR anidado doble': '''int i = 0;
+int j = 0;
+
+for(i = 0; i < 5; i++){
+    for(j = 0; j < 3; j++){
+        int x = i + j;
+    }
+}''',
+    '✅ WHILE anidado doble': '''int a = 0;
+int b = 0;
+
+while(a < 5){
+    while(b < 3){
+        b = b + 1;
+    }
+    a = a + 1;
+    b = 0;
+}''',
+    '✅ FOR dentro de WHILE': '''int i = 0;
+int j = 0;
+
+while(i < 5){
+    for(j = 0; j < 3; j++){
+        int x = i * j;
+    }
+    i = i + 1;
+}''',
+    '✅ WHILE dentro de FOR': '''int i = 0;
+int j = 0;
+
+for(i = 0; i < 5; i++){
+    j = 0;
+    while(j < 3){
+        int x = i + j;
+        j = j + 1;
+    }
+}''',
+    '✅ Triple anidamiento FOR': '''int i = 0;
+int j = 0;
+int k = 0;
+
+for(i = 0; i < 3; i++){
+    for(j = 0; j < 3; j++){
+        for(k = 0; k < 3; k++){
+            int suma = i + j + k;
+        }
+    }
+}''',
+    '✅ DO-WHILE dentro de FOR': '''int i = 0;
+int j = 0;
+
+for(i = 0; i < 5; i++){
+    j = 0;
+    do {
+        j = j + 1;
+    } while(j < 3);
+}''',
+    '✅ Matriz con FOR anidado': '''int matriz[3];
+int i = 0;
+int j = 0;
+
+for(i = 0; i < 3; i++){
+    for(j = 0; j < 3; j++){
+        matriz[i] = i * 3 + j;
+    }
+}'''
+}
+
+
 class CompiladorGUI:
-    def __init__(self, root):
+    def __init__(self, root, cache_tokens=None):
         self.root = root
         self.root.title('Compilador Java - Analizador')
         self.root.geometry('1080x820')
         self.root.configure(bg='#1e1e1e')
         self.archivo_actual = None  # ruta del archivo abierto/guardado
+        self._flujo_tokens = None  # TokenStream de la última compilación
+        self._sintactico = None  # AnalizadorSintactico de la última compilación
+        self._cache_tokens = cache_tokens  # CacheTokens opcional para la primera compilación
         self.configurar_estilo()
         self.crear_widgets()
 
@@ -120,6 +289,8 @@ class CompiladorGUI:
             self.txt_codigo.delete('1.0', 'end')
             self.txt_codigo.insert('1.0', contenido)
             self.archivo_actual = ruta
+            self._flujo_tokens = None  # Archivo nuevo: usar la caché en vez de re-analizar
+            self._sintactico = None
             self.root.title(f'Compilador Java - Analizador ({ruta})')
             self._actualizar_numeros_linea()
         except Exception as e:
@@ -216,7 +387,15 @@ class CompiladorGUI:
             # ========== LÉXICO ==========
             try:
                 lexico = AnalizadorLexico()
-                tokens = lexico.analizar(codigo)
+                if self._flujo_tokens is not None:
+                    # Re-analizar solo la región editada desde la última compilación
+                    edicion = calcular_edicion(self._flujo_tokens.codigo, codigo)
+                    tokens = lexico.reanalizar(self._flujo_tokens, *edicion)
+                elif self._cache_tokens is not None:
+                    tokens = self._cache_tokens.analizar(codigo, lexico)
+                else:
+                    tokens = lexico.analizar_compacto(codigo)
+                self._flujo_tokens = tokens
                 reporte.append('='*70 + '\n📋 ANÁLISIS LÉXICO\n' + '='*70)
 
                 if tokens:
@@ -238,9 +417,17 @@ class CompiladorGUI:
 
             # ========== SINTÁCTICO ==========
             ok_sint = False
+            ast = None
             try:
                 parser = AnalizadorSintactico(tokens)
-                ok_sint = parser.analizar() if hasattr(parser, 'analizar') else True
+                anterior, self._sintactico = self._sintactico, None
+                if anterior is not None and lexico.edicion_tokens is not None:
+                    # Re-analizar solo la sentencia editada y reutilizar el resto del AST
+                    ok_sint = parser.reanalizar(anterior, lexico.edicion_tokens)
+                else:
+                    ok_sint = parser.analizar()
+                self._sintactico = parser
+                ast = parser.ast
                 if hasattr(parser, 'obtener_reporte'):
                     rep_sint = parser.obtener_reporte()
                 else:
@@ -254,7 +441,8 @@ class CompiladorGUI:
             # ========== SEMÁNTICO ==========
             ok_sem = False
             try:
-                sem = AnalizadorSemantico(tokens)
+                # Recorre el AST del sintáctico: los tokens se analizan una sola vez
+                sem = AnalizadorSemantico(tokens, ast)
                 ok_sem = sem.analizar() if hasattr(sem, 'analizar') else True
                 if hasattr(sem, 'obtener_reporte'):
                     rep_sem = sem.obtener_reporte()
@@ -294,169 +482,6 @@ class CompiladorGUI:
         win.geometry('900x600')
         win.configure(bg='#1e1e1e')
 
-        # Diccionario de ejemplos con título → código
-        ejemplos = {
-            '✅ FOR con IF anidado - Correcto': '''int x = 0;
-int cout = 0;
-for( x = 0; x < 5; x++ ){
-    if(x == 1){
-        cout = x;
-    }
-}''',
-            '❌ FOR - Sin punto y coma en el cuerpo': '''int x = 0;
-int cout = 0;
-for( x = 0; x < 5; x++ ){
-    if(x == 1){
-        cout = x
-    }
-}''',
-            '❌ FOR - Falta llave de cierre en FOR': '''int x = 0;
-for( x = 0; x < 5; x++ ){
-    if(x == 1){
-        int cout = x;
-    }''',
-            '❌ FOR - Sin llaves en IF': '''int x = 0;
-for( x = 0; x < 5; x++ ){
-    if(x == 1)
-        int cout = x;
-}''',
-            '✅ WHILE con IF anidado - Correcto': '''int a = 0;
-while( a < 5 ){
-    if( a == 2 ){
-        a = a + 1;
-    }
-    a = a + 1;
-}''',
-            '❌ WHILE - Sin punto y coma en el cuerpo': '''int a = 0;
-while( a < 5 ){
-    a = a + 1
-}''',
-            '❌ Semántico - Variable no declarada': '''for( i = 0; i < 10; i++ ){
-    int x = i;
-}''',
-            '✅ DO-WHILE - Correcto': '''int x = 0;
-do {
-    x = x + 1;
-} while (x < 5);''',
-            '❌ DO-WHILE - Sin punto y coma final': '''int x = 0;
-do {
-    x = x + 1;
-} while (x < 5)''',
-            '✅ Arreglo tamaño fijo + while': '''int arreglo[10];
-int x = 0;
-
-while(x < 10){
-    arreglo[x] = x * 2;
-    x = x + 1;
-}''',
-            '✅ BubbleSort con for anidado': '''int n = 5;
-int numeros[5];
-int i = 0;
-int j = 0;
-int temp = 0;
-
-numeros[0] = 5;
-numeros[1] = 1;
-numeros[2] = 4;
-numeros[3] = 2;
-numeros[4] = 3;
-
-for(i = 0; i < n - 1; i++){
-    for(j = 0; j < n - 1 - i; j++){
-        if(numeros[j] > numeros[j + 1]){
-            temp = numeros[j];
-            numeros[j] = numeros[j + 1];
-            numeros[j + 1] = temp;
-        }
-    }
-}''',
-            '✅ String con comillas dobles - Correcto': '''String nombre = "Hola Mundo";
-String saludo = "Bienvenido";''',
-            '❌ Tipo incompatible - int = String': '''int numero = 10;
-numero = "texto";''',
-            '❌ Tipo incompatible - String = int': '''String texto = "hola";
-texto = 123;''',
-            '❌ Tipo incompatible - boolean = int': '''boolean flag = true;
-flag = 5;''',
-            '❌ Tipo incompatible - int = boolean': '''int x = 0;
-x = true;''',
-            '✅ Concatenación de String - Correcto': '''String a = "Hola";
-String b = "Mundo";
-String c = a;''',
-            '❌ Operación aritmética con String': '''String texto = "hola";
-int x = 5;
-int resultado = x - texto;''',
-            '❌ Comparación inválida String < int': '''String texto = "hola";
-int x = 5;
-boolean r = texto < x;''',
-            '✅ FOR anidado doble': '''int i = 0;
-int j = 0;
-
-for(i = 0; i < 5; i++){
-    for(j = 0; j < 3; j++){
-        int x = i + j;
-    }
-}''',
-            '✅ WHILE anidado doble': '''int a = 0;
-int b = 0;
-
-while(a < 5){
-    while(b < 3){
-        b = b + 1;
-    }
-    a = a + 1;
-    b = 0;
-}''',
-            '✅ FOR dentro de WHILE': '''int i = 0;
-int j = 0;
-
-while(i < 5){
-    for(j = 0; j < 3; j++){
-        int x = i * j;
-    }
-    i = i + 1;
-}''',
-            '✅ WHILE dentro de FOR': '''int i = 0;
-int j = 0;
-
-for(i = 0; i < 5; i++){
-    j = 0;
-    while(j < 3){
-        int x = i + j;
-        j = j + 1;
-    }
-}''',
-            '✅ Triple anidamiento FOR': '''int i = 0;
-int j = 0;
-int k = 0;
-
-for(i = 0; i < 3; i++){
-    for(j = 0; j < 3; j++){
-        for(k = 0; k < 3; k++){
-            int suma = i + j + k;
-        }
-    }
-}''',
-            '✅ DO-WHILE dentro de FOR': '''int i = 0;
-int j = 0;
-
-for(i = 0; i < 5; i++){
-    j = 0;
-    do {
-        j = j + 1;
-    } while(j < 3);
-}''',
-            '✅ Matriz con FOR anidado': '''int matriz[3];
-int i = 0;
-int j = 0;
-
-for(i = 0; i < 3; i++){
-    for(j = 0; j < 3; j++){
-        matriz[i] = i * 3 + j;
-    }
-}'''
-        }
-
         # Marco principal
         frame = ttk.Frame(win)
         frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -507,7 +532,7 @@ for(i = 0; i < 3; i++){
             win.destroy()
 
         # Crear un botón por ejemplo con colores
-        for nombre, codigo in ejemplos.items():
+        for nombre, codigo in EJEMPLOS.items():
             # Determinar si es correcto o incorrecto
             es_correcto = nombre.startswith('✅')
             
@@ -548,8 +573,8 @@ for(i = 0; i < 3; i++){
             btn.pack(fill='x', pady=2, padx=2)
 
         # Cargar el primero por defecto
-        if ejemplos:
-            primer_codigo = next(iter(ejemplos.values()))
+        if EJEMPLOS:
+            primer_codigo = next(iter(EJEMPLOS.values()))
             cargar_en_preview(primer_codigo)
 
         # Botón para enviar el ejemplo al editor principal
@@ -580,8 +605,10 @@ for(i = 0; i < 3; i++){
 
 
 def main():
+    # La caché de tokens en disco se activa indicando su directorio
+    directorio = os.environ.get('COMPILADOR_CACHE_TOKENS')
     root = tk.Tk()
-    CompiladorGUI(root)
+    CompiladorGUI(root, CacheTokens(directorio) if directorio else None)
     root.mainloop()
 
 
@@ -3,184 +3,132 @@ Analizador Semántico
 Verifica tipos, alcances y reglas semánticas del lenguaje
 """
 
-from lexico import TipoToken
+from ast_nodes import *
+from lexico import TokenStream
 from tabla_simbolos import TablaSimbolos
 
 
 class AnalizadorSemantico:
-    """Analizador semántico que recorre tokens"""
-    MAX_ITERACIONES = 10000
-
-    def __init__(self, tokens):
+    """
+    Analizador semántico que recorre el AST del analizador sintáctico.
+    Si no recibe el AST, analiza los tokens una vez para obtenerlo. Las
+    líneas de los errores salen de los índices de token de cada nodo
+    (relativos a su sentencia), así que el análisis no vuelve a leer los
+    tokens.
+    """
+
+    def __init__(self, tokens, ast=None):
         self.tokens = tokens
-        self.posicion = 0
+        self.ast = ast
         self.tabla_simbolos = TablaSimbolos()
-        self.tipo_actual = None
         self.en_bucle = 0  # Nivel de anidamiento de bucles
-        self.en_funcion = False
-        self._iteraciones = 0
         # Información sobre ciclos anidados
         self.ciclos_anidados = []  # Lista de (tipo_externo, tipo_interno, linea, nivel)
         self.pila_ciclos = []  # Pila para rastrear ciclos actuales (tipo, linea)
-
-    def _verificar_limite(self):
-        self._iteraciones += 1
-        if self._iteraciones > self.MAX_ITERACIONES:
-            raise Exception("Límite de iteraciones excedido en análisis semántico")
-
-    def _token_actual(self):
-        if self.posicion < len(self.tokens):
-            return self.tokens[self.posicion]
-        return self.tokens[-1] if self.tokens else None
-
-    def _avanzar(self):
-        if self.posicion < len(self.tokens) - 1:
-            self.posicion += 1
-
-    def _verificar(self, tipo):
-        tok = self._token_actual()
-        return tok and tok.tipo == tipo
-
-    def _peek(self, k=1):
-        idx = self.posicion + k
-        if 0 <= idx < len(self.tokens):
-            return self.tokens[idx]
-        return self.tokens[-1] if self.tokens else None
+        self._lineas = None
+        self._inicio = 0  # Índice del primer token de la sentencia en curso
 
     def analizar(self):
         try:
-            self._analizar_programa()
+            if self.ast is None:
+                from sintactico import AnalizadorSintactico
+                parser = AnalizadorSintactico(self.tokens)
+                parser.analizar()
+                self.ast = parser.ast
+            if self.ast is None:
+                return len(self.tabla_simbolos.errores) == 0
+            if isinstance(self.tokens, TokenStream):
+                self._lineas = self.tokens.lineas
+            else:
+                self._lineas = [t.linea for t in self.tokens]
+            self._analizar_sentencias(self.ast.declaraciones, 0)
             return len(self.tabla_simbolos.errores) == 0
         except Exception as e:
             self.tabla_simbolos.errores.append(f"Error crítico: {str(e)}")
             return False
 
-    def _analizar_programa(self):
-        last_pos = -1
-        while not self._verificar(TipoToken.EOF):
-            self._verificar_limite()
-            if self.posicion == last_pos:
-                self._avanzar()
-                continue
-            last_pos = self.posicion
-            self._analizar_declaracion()
-
-    def _analizar_declaracion(self):
-        self._verificar_limite()
-        t = self._token_actual()
-        if not t:
+    def _linea(self, token):
+        """Línea del token 'token' de la sentencia en curso, o '?'"""
+        if token is None or not self._lineas:
+            return '?'
+        return self._lineas[min(self._inicio + token, len(self._lineas) - 1)]
+
+    # ========== SENTENCIAS ==========
+
+    def _analizar_sentencias(self, sentencias, base):
+        """Sentencias de Programa o de un Bloque con llaves; sus spans son relativos a 'base'"""
+        exterior = self._inicio
+        for sentencia in sentencias:
+            if sentencia.span is not None:
+                self._inicio = base + sentencia.span[0]
+            self._analizar_sentencia(sentencia)
+        self._inicio = exterior
+
+    def _analizar_sentencia(self, nodo):
+        if nodo is None:
             return
-        if t.tipo in (TipoToken.INT, TipoToken.FLOAT, TipoToken.BOOLEAN, TipoToken.STRING, TipoToken.CHAR):
-            self._analizar_declaracion_variable()
-        else:
-            self._analizar_sentencia()
-
-    def _analizar_declaracion_variable(self):
-        self._verificar_limite()
-        token_tipo = self._token_actual()
-        if not token_tipo or token_tipo.tipo not in (TipoToken.INT, TipoToken.FLOAT, TipoToken.BOOLEAN, TipoToken.STRING, TipoToken.CHAR):
+        if isinstance(nodo, DeclaracionVariable):
+            self._analizar_declaracion_variable(nodo)
+        elif isinstance(nodo, Bloque):
+            self._analizar_bloque(nodo, self._inicio)
+        elif isinstance(nodo, SentenciaIf):
+            self._analizar_if(nodo)
+        elif isinstance(nodo, SentenciaWhile):
+            self._analizar_while(nodo)
+        elif isinstance(nodo, SentenciaDoWhile):
+            self._analizar_do_while(nodo)
+        elif isinstance(nodo, SentenciaFor):
+            self._analizar_for(nodo)
+        elif isinstance(nodo, SentenciaReturn):
+            if nodo.expresion is not None:
+                self._analizar_expresion(nodo.expresion)
+        elif isinstance(nodo, SentenciaExpresion):
+            self._analizar_expresion(nodo.expresion)
+
+    def _analizar_cuerpo(self, cuerpo):
+        """Cuerpo de una sentencia de control: con llaves abre un alcance; sin llaves no"""
+        if cuerpo is None:
             return
-        tipo_base = token_tipo.valor
-        self._avanzar()
-
-        es_arreglo = False
-        tam_arreglo = 0
-
-        # Formato Java: tipo[] nombre
-        if self._verificar(TipoToken.CORCHETE_IZQ):
-            peek = self._peek()
-            if peek and peek.tipo == TipoToken.CORCHETE_DER:
-                es_arreglo = True
-                self._avanzar()
-                self._avanzar()
-
-        if not self._verificar(TipoToken.IDENTIFICADOR):
-            return
-        nombre = self._token_actual().valor
-        linea_decl = self._token_actual().linea
-        self._avanzar()
-
-        # Formato C: nombre[NUM]
-        if self._verificar(TipoToken.CORCHETE_IZQ):
-            es_arreglo = True
-            self._avanzar()
-            if self._verificar(TipoToken.NUMERO_ENTERO):
-                tam_arreglo = int(self._token_actual().valor)
-                self._avanzar()
-            if self._verificar(TipoToken.CORCHETE_DER):
-                self._avanzar()
-
-        if es_arreglo:
-            self.tabla_simbolos.declarar_arreglo(nombre, tipo_base, tam_arreglo, linea_decl)
+        if isinstance(cuerpo, Bloque) and cuerpo.span is None:
+            for sentencia in cuerpo.sentencias:
+                self._analizar_sentencia(sentencia)
+        elif isinstance(cuerpo, Bloque):
+            # Los spans de un cuerpo con llaves son relativos a su sentencia
+            self._analizar_bloque(cuerpo, self._inicio + cuerpo.span[0])
         else:
-            self.tabla_simbolos.declarar_variable(nombre, tipo_base, linea_decl)
-
-        if self._verificar(TipoToken.ASIGNACION):
-            self._avanzar()
-            if self._verificar(TipoToken.CORCHETE_IZQ):
-                self._saltar_literal_arreglo()
-                self.tabla_simbolos.marcar_inicializada(nombre)
-            else:
-                self._analizar_expresion()
-                self.tabla_simbolos.marcar_inicializada(nombre)
+            self._analizar_sentencia(cuerpo)
 
-        if self._verificar(TipoToken.PUNTO_COMA):
-            self._avanzar()
+    def _analizar_bloque(self, nodo, base):
+        self.tabla_simbolos.entrar_alcance("bloque")
+        self._analizar_sentencias(nodo.sentencias, base)
+        self.tabla_simbolos.salir_alcance()
 
-    def _analizar_sentencia(self):
-        self._verificar_limite()
-        t = self._token_actual()
-        if not t:
+    def _analizar_declaracion_variable(self, nodo):
+        linea = self._linea(nodo.token)
+        inicializador = nodo.inicializador
+        if nodo.tipo.endswith('[]'):
+            # 'int a[10]' guarda el tamaño como inicializador literal
+            tam = inicializador.valor if isinstance(inicializador, Literal) else 0
+            self.tabla_simbolos.declarar_arreglo(nodo.nombre, nodo.tipo[:-2], tam, linea)
+            if isinstance(inicializador, list):
+                self.tabla_simbolos.marcar_inicializada(nodo.nombre)
             return
-        if t.tipo == TipoToken.LLAVE_IZQ:
-            self._analizar_bloque()
-        elif t.tipo == TipoToken.IF:
-            self._analizar_if()
-        elif t.tipo == TipoToken.WHILE:
-            self._analizar_while()
-        elif t.tipo == TipoToken.DO:
-            self._analizar_do_while()
-        elif t.tipo == TipoToken.FOR:
-            self._analizar_for()
-        elif t.tipo == TipoToken.RETURN:
-            self._analizar_return()
-        else:
-            self._analizar_sentencia_expresion()
+        self.tabla_simbolos.declarar_variable(nodo.nombre, nodo.tipo, linea)
+        if inicializador is not None:
+            self._analizar_expresion(inicializador)
+            self.tabla_simbolos.marcar_inicializada(nodo.nombre)
 
-    def _analizar_bloque(self):
-        self._verificar_limite()
-        if not self._verificar(TipoToken.LLAVE_IZQ):
-            return
-        self._avanzar()
-        self.tabla_simbolos.entrar_alcance("bloque")
-        last_pos = -1
-        while not self._verificar(TipoToken.LLAVE_DER) and not self._verificar(TipoToken.EOF):
-            self._verificar_limite()
-            if self.posicion == last_pos:
-                self._avanzar()
-                continue
-            last_pos = self.posicion
-            self._analizar_declaracion()
-        self.tabla_simbolos.salir_alcance()
-        if self._verificar(TipoToken.LLAVE_DER):
-            self._avanzar()
-
-    def _analizar_if(self):
-        self._verificar_limite()
-        self._avanzar()
-        if self._verificar(TipoToken.PARENTESIS_IZQ):
-            self._avanzar()
-        tipo_cond = self._analizar_expresion()
+    def _verificar_condicion(self, nodo, sentencia):
+        tipo_cond = self._analizar_expresion(nodo.condicion)
         if tipo_cond and tipo_cond != 'boolean':
-            tok = self._token_actual()
-            linea = tok.linea if tok else '?'
-            self.tabla_simbolos.errores.append(f"Error semántico en línea {linea}: La condición del if debe ser boolean")
-        if self._verificar(TipoToken.PARENTESIS_DER):
-            self._avanzar()
-        self._analizar_sentencia()
-        if self._verificar(TipoToken.ELSE):
-            self._avanzar()
-            self._analizar_sentencia()
+            self.tabla_simbolos.errores.append(
+                f"Error semántico en línea {self._linea(nodo.token_condicion)}: "
+                f"La condición del {sentencia} debe ser boolean")
+
+    def _analizar_if(self, nodo):
+        self._verificar_condicion(nodo, 'if')
+        self._analizar_cuerpo(nodo.bloque_if)
+        self._analizar_cuerpo(nodo.bloque_else)
 
     def _registrar_ciclo_anidado(self, tipo_ciclo, linea):
         """Registra un ciclo y detecta anidamiento"""
@@ -203,393 +151,126 @@ class AnalizadorSemantico:
         if self.pila_ciclos:
             self.pila_ciclos.pop()
 
-    def _analizar_while(self):
-        self._verificar_limite()
-        token_while = self._token_actual()
-        linea = token_while.linea if token_while else 0
-        self._avanzar()
-        
-        if self._verificar(TipoToken.PARENTESIS_IZQ):
-            self._avanzar()
-        tipo_cond = self._analizar_expresion()
-        if tipo_cond and tipo_cond != 'boolean':
-            tok = self._token_actual()
-            ln = tok.linea if tok else '?'
-            self.tabla_simbolos.errores.append(f"Error semántico en línea {ln}: La condición del while debe ser boolean")
-        if self._verificar(TipoToken.PARENTESIS_DER):
-            self._avanzar()
-        
-        # Registrar ciclo anidado
-        self._registrar_ciclo_anidado('while', linea)
+    def _analizar_ciclo(self, tipo_ciclo, nodo):
+        self._registrar_ciclo_anidado(tipo_ciclo, self._linea(nodo.token))
         self.en_bucle += 1
-        self._analizar_sentencia()
+        self._analizar_cuerpo(nodo.cuerpo)
         self.en_bucle -= 1
         self._salir_ciclo()
 
-    def _analizar_do_while(self):
-        self._verificar_limite()
-        token_do = self._token_actual()
-        linea = token_do.linea if token_do else 0
-        self._avanzar()
-        
-        # Registrar ciclo anidado
-        self._registrar_ciclo_anidado('do-while', linea)
-        self.en_bucle += 1
-        self._analizar_sentencia()
-        self.en_bucle -= 1
-        self._salir_ciclo()
-        
-        if self._verificar(TipoToken.WHILE):
-            self._avanzar()
-        if self._verificar(TipoToken.PARENTESIS_IZQ):
-            self._avanzar()
-        tipo_cond = self._analizar_expresion()
-        if tipo_cond and tipo_cond != 'boolean':
-            tok = self._token_actual()
-            ln = tok.linea if tok else '?'
-            self.tabla_simbolos.errores.append(f"Error semántico en línea {ln}: La condición del do-while debe ser boolean")
-        if self._verificar(TipoToken.PARENTESIS_DER):
-            self._avanzar()
-        if self._verificar(TipoToken.PUNTO_COMA):
-            self._avanzar()
-
-    def _analizar_for(self):
-        self._verificar_limite()
-        token_for = self._token_actual()
-        linea = token_for.linea if token_for else 0
-        self._avanzar()
-        
-        if self._verificar(TipoToken.PARENTESIS_IZQ):
-            self._avanzar()
+    def _analizar_while(self, nodo):
+        self._verificar_condicion(nodo, 'while')
+        self._analizar_ciclo('while', nodo)
 
-        self.tabla_simbolos.entrar_alcance("for")
+    def _analizar_do_while(self, nodo):
+        self._analizar_ciclo('do-while', nodo)
+        self._verificar_condicion(nodo, 'do-while')
 
-        # Inicialización
-        if not self._verificar(TipoToken.PUNTO_COMA):
-            tok = self._token_actual()
-            if tok and tok.tipo in (TipoToken.INT, TipoToken.FLOAT, TipoToken.BOOLEAN, TipoToken.STRING, TipoToken.CHAR):
-                self._analizar_declaracion_variable()
-            else:
-                self._analizar_expresion()
-                if self._verificar(TipoToken.PUNTO_COMA):
-                    self._avanzar()
-        else:
-            self._avanzar()
-
-        # Condición
-        if not self._verificar(TipoToken.PUNTO_COMA):
-            tipo_cond = self._analizar_expresion()
-            if tipo_cond and tipo_cond != 'boolean':
-                tok = self._token_actual()
-                ln = tok.linea if tok else '?'
-                self.tabla_simbolos.errores.append(f"Error semántico en línea {ln}: La condición del for debe ser boolean")
-        if self._verificar(TipoToken.PUNTO_COMA):
-            self._avanzar()
-
-        # Incremento
-        if not self._verificar(TipoToken.PARENTESIS_DER):
-            self._analizar_expresion()
-        if self._verificar(TipoToken.PARENTESIS_DER):
-            self._avanzar()
-
-        # Registrar ciclo anidado
-        self._registrar_ciclo_anidado('for', linea)
-        self.en_bucle += 1
-        self._analizar_sentencia()
-        self.en_bucle -= 1
-        self._salir_ciclo()
+    def _analizar_for(self, nodo):
+        self.tabla_simbolos.entrar_alcance("for")
+        if isinstance(nodo.inicializacion, DeclaracionVariable):
+            self._analizar_declaracion_variable(nodo.inicializacion)
+        elif nodo.inicializacion is not None:
+            self._analizar_expresion(nodo.inicializacion)
+        if nodo.condicion is not None:
+            self._verificar_condicion(nodo, 'for')
+        if nodo.incremento is not None:
+            self._analizar_expresion(nodo.incremento)
+        self._analizar_ciclo('for', nodo)
         self.tabla_simbolos.salir_alcance()
 
-    def _analizar_return(self):
-        self._verificar_limite()
-        self._avanzar()
-        if not self._verificar(TipoToken.PUNTO_COMA):
-            self._analizar_expresion()
-        if self._verificar(TipoToken.PUNTO_COMA):
-            self._avanzar()
-
-    def _analizar_sentencia_expresion(self):
-        self._verificar_limite()
-        self._analizar_expresion()
-        if self._verificar(TipoToken.PUNTO_COMA):
-            self._avanzar()
-
-    def _analizar_expresion(self):
-        self._verificar_limite()
-        return self._analizar_asignacion()
-
-    def _analizar_asignacion(self):
-        self._verificar_limite()
-        pos_inicial = self.posicion
-
-        # Caso: identificador = valor
-        if self._verificar(TipoToken.IDENTIFICADOR):
-            token_id = self._token_actual()
-            nombre = token_id.valor
-            linea = token_id.linea
-            self._avanzar()
-
-            # Caso: arreglo[indice] = valor
-            if self._verificar(TipoToken.CORCHETE_IZQ):
-                self._avanzar()
-                tipo_idx = self._analizar_expresion()
-                if tipo_idx and tipo_idx != 'int':
-                    self.tabla_simbolos.errores.append(f"Error semántico en línea {linea}: índice de arreglo debe ser int")
-                if self._verificar(TipoToken.CORCHETE_DER):
-                    self._avanzar()
-                
-                if self._verificar(TipoToken.ASIGNACION):
-                    self._avanzar()
-                    tipo_valor = self._analizar_asignacion()
-                    # Obtener tipo base del arreglo
-                    tipo_elemento = self.tabla_simbolos.obtener_tipo_elemento_arreglo(nombre, linea)
-                    if tipo_elemento and tipo_valor:
-                        self.tabla_simbolos.verificar_compatibilidad_tipos(tipo_elemento, tipo_valor, linea)
-                    return tipo_elemento
-                else:
-                    # Solo acceso, no asignación
-                    self.posicion = pos_inicial
-                    return self._analizar_or()
-
-            # Caso: variable = valor
-            if self._verificar(TipoToken.ASIGNACION):
-                self._avanzar()
-                if self._verificar(TipoToken.CORCHETE_IZQ):
-                    self._saltar_literal_arreglo()
-                    simbolo = self.tabla_simbolos.buscar_variable(nombre, linea)
-                    if simbolo:
-                        self.tabla_simbolos.marcar_inicializada(nombre)
-                        return simbolo.tipo
-                    return None
-                simbolo = self.tabla_simbolos.buscar_variable(nombre, linea)
-                tipo_valor = self._analizar_asignacion()
-                if simbolo and tipo_valor:
-                    self.tabla_simbolos.verificar_compatibilidad_tipos(simbolo.tipo, tipo_valor, linea)
-                    self.tabla_simbolos.marcar_inicializada(nombre)
-                    return simbolo.tipo
-                elif simbolo:
-                    self.tabla_simbolos.marcar_inicializada(nombre)
-                    return simbolo.tipo
-                return tipo_valor
-
-        self.posicion = pos_inicial
-        return self._analizar_or()
-
-    def _analizar_or(self):
-        self._verificar_limite()
-        tipo_izq = self._analizar_and()
-        while self._verificar(TipoToken.OR):
-            token = self._token_actual()
-            self._avanzar()
-            tipo_der = self._analizar_and()
-            tipo_izq = self.tabla_simbolos.obtener_tipo_expresion_binaria(tipo_izq, '||', tipo_der, token.linea)
-        return tipo_izq
-
-    def _analizar_and(self):
-        self._verificar_limite()
-        tipo_izq = self._analizar_igualdad()
-        while self._verificar(TipoToken.AND):
-            token = self._token_actual()
-            self._avanzar()
-            tipo_der = self._analizar_igualdad()
-            tipo_izq = self.tabla_simbolos.obtener_tipo_expresion_binaria(tipo_izq, '&&', tipo_der, token.linea)
-        return tipo_izq
-
-    def _analizar_igualdad(self):
-        self._verificar_limite()
-        tipo_izq = self._analizar_comparacion()
-        while self._verificar(TipoToken.IGUAL_IGUAL) or self._verificar(TipoToken.DIFERENTE):
-            token = self._token_actual()
-            operador = token.valor
-            self._avanzar()
-            tipo_der = self._analizar_comparacion()
-            tipo_izq = self.tabla_simbolos.obtener_tipo_expresion_binaria(tipo_izq, operador, tipo_der, token.linea)
-        return tipo_izq
-
-    def _analizar_comparacion(self):
-        self._verificar_limite()
-        tipo_izq = self._analizar_termino()
-        tok = self._token_actual()
-        while tok and tok.tipo in (TipoToken.MENOR, TipoToken.MAYOR, TipoToken.MENOR_IGUAL, TipoToken.MAYOR_IGUAL):
-            self._verificar_limite()
-            operador = tok.valor
-            self._avanzar()
-            tipo_der = self._analizar_termino()
-            tipo_izq = self.tabla_simbolos.obtener_tipo_expresion_binaria(tipo_izq, operador, tipo_der, tok.linea)
-            tok = self._token_actual()
-        return tipo_izq
-
-    def _analizar_termino(self):
-        self._verificar_limite()
-        tipo_izq = self._analizar_factor()
-        while self._verificar(TipoToken.MAS) or self._verificar(TipoToken.MENOS):
-            self._verificar_limite()
-            token = self._token_actual()
-            operador = token.valor
-            self._avanzar()
-            tipo_der = self._analizar_factor()
-            tipo_izq = self.tabla_simbolos.obtener_tipo_expresion_binaria(tipo_izq, operador, tipo_der, token.linea)
-        return tipo_izq
-
-    def _analizar_factor(self):
-        self._verificar_limite()
-        tipo_izq = self._analizar_postfijo()
-        tok = self._token_actual()
-        while tok and tok.tipo in (TipoToken.MULTIPLICACION, TipoToken.DIVISION, TipoToken.MODULO):
-            self._verificar_limite()
-            operador = tok.valor
-            self._avanzar()
-            tipo_der = self._analizar_postfijo()
-            tipo_izq = self.tabla_simbolos.obtener_tipo_expresion_binaria(tipo_izq, operador, tipo_der, tok.linea)
-            tok = self._token_actual()
-        return tipo_izq
-
-    def _analizar_postfijo(self):
-        self._verificar_limite()
-        tipo = self._analizar_unario()
-        tok = self._token_actual()
-        while tok and tok.tipo in (TipoToken.INCREMENTO, TipoToken.DECREMENTO):
-            self._verificar_limite()
-            self._avanzar()
-            # Normalizar tipo para verificación
-            tipo_base = tipo[:-2] if tipo and tipo.endswith('[]') else tipo
-            if tipo_base not in ('int', 'float'):
-                self.tabla_simbolos.errores.append(f"Error semántico en línea {tok.linea}: Operador requiere operando numérico")
-            tok = self._token_actual()
-        return tipo
-
-    def _analizar_unario(self):
-        self._verificar_limite()
-        tok = self._token_actual()
-        if tok and tok.tipo in (TipoToken.NOT, TipoToken.MENOS, TipoToken.MAS, TipoToken.INCREMENTO, TipoToken.DECREMENTO):
-            operador = tok.valor
-            linea = tok.linea
-            self._avanzar()
-            tipo_operando = self._analizar_unario()
-            tipo_base = tipo_operando[:-2] if tipo_operando and tipo_operando.endswith('[]') else tipo_operando
-            if operador in ('++', '--'):
-                if tipo_base not in ('int', 'float'):
-                    self.tabla_simbolos.errores.append(f"Error semántico en línea {linea}: Operador requiere operando numérico")
-                return tipo_operando
-            if operador == '!':
-                if tipo_base != 'boolean':
-                    self.tabla_simbolos.errores.append(f"Error semántico en línea {linea}: Operador '!' requiere operando booleano")
-                return 'boolean'
-            if operador in ('+', '-'):
-                if tipo_base not in ('int', 'float'):
-                    self.tabla_simbolos.errores.append(f"Error semántico en línea {linea}: Operador requiere operando numérico")
-                return tipo_operando
-        return self._analizar_primario()
-
-    def _analizar_primario(self):
-        self._verificar_limite()
-        token = self._token_actual()
-        if not token:
-            return None
+    # ========== EXPRESIONES ==========
 
-        if token.tipo == TipoToken.NUMERO_ENTERO:
-            self._avanzar()
-            return 'int'
-        if token.tipo == TipoToken.NUMERO_FLOTANTE:
-            self._avanzar()
-            return 'float'
-        if token.tipo == TipoToken.CADENA:
+    def _analizar_expresion(self, nodo):
+        """Retorna el tipo de la expresión, o None si no se pudo determinar"""
+        if isinstance(nodo, Literal):
             # Las cadenas entre comillas dobles son tipo String
-            self._avanzar()
-            return 'String'
-        if token.tipo == TipoToken.CARACTER:
-            # Los caracteres entre comillas simples son tipo char
-            self._avanzar()
-            return 'char'
-        if token.tipo in (TipoToken.TRUE, TipoToken.FALSE):
-            self._avanzar()
-            return 'boolean'
-        if token.tipo == TipoToken.NULL:
-            self._avanzar()
-            return 'null'
-
-        if token.tipo == TipoToken.IDENTIFICADOR:
-            nombre = token.valor
-            linea_token = token.linea
-            self._avanzar()
-
-            # Acceso a miembros (System.out.println, etc.)
-            while self._verificar(TipoToken.PUNTO):
-                self._verificar_limite()
-                self._avanzar()
-                if self._verificar(TipoToken.IDENTIFICADOR):
-                    nombre = f"{nombre}.{self._token_actual().valor}"
-                    self._avanzar()
-                else:
-                    break
-
-            # Llamada a función
-            if self._verificar(TipoToken.PARENTESIS_IZQ):
-                self._avanzar()
-                while not self._verificar(TipoToken.PARENTESIS_DER) and not self._verificar(TipoToken.EOF):
-                    self._verificar_limite()
-                    self._analizar_expresion()
-                    if self._verificar(TipoToken.COMA):
-                        self._avanzar()
-                    else:
-                        break
-                if self._verificar(TipoToken.PARENTESIS_DER):
-                    self._avanzar()
-                if nombre == "System.out.println":
-                    return 'void'
-                return 'int'
-
-            # Acceso a índice de arreglo
-            if self._verificar(TipoToken.CORCHETE_IZQ):
-                self._avanzar()
-                tipo_idx = self._analizar_expresion()
-                if tipo_idx and tipo_idx != 'int':
-                    self.tabla_simbolos.errores.append(f"Error semántico en línea {linea_token}: índice de arreglo debe ser int, se encontró '{tipo_idx}'")
-                if self._verificar(TipoToken.CORCHETE_DER):
-                    self._avanzar()
-                # Retornar tipo BASE del arreglo, no int[]
-                tipo_elemento = self.tabla_simbolos.obtener_tipo_elemento_arreglo(nombre, linea_token)
-                return tipo_elemento if tipo_elemento else 'int'
-
-            # Variable simple
-            simbolo = self.tabla_simbolos.buscar_variable(nombre, linea_token)
+            return 'String' if nodo.tipo == 'string' else nodo.tipo
+
+        elif isinstance(nodo, Identificador):
+            simbolo = self.tabla_simbolos.buscar_variable(nodo.nombre, self._linea(nodo.token))
             if simbolo:
                 # Si es arreglo sin índice, retornar tipo completo (int[])
-                # Si tiene índice, ya se manejó arriba
                 return simbolo.tipo_completo if simbolo.es_arreglo else simbolo.tipo
             return None
 
-        if token.tipo == TipoToken.PARENTESIS_IZQ:
-            self._avanzar()
-            tipo = self._analizar_expresion()
-            if self._verificar(TipoToken.PARENTESIS_DER):
-                self._avanzar()
-            return tipo
+        elif isinstance(nodo, Asignacion):
+            linea = self._linea(nodo.token)
+            simbolo = self.tabla_simbolos.buscar_variable(nodo.nombre, linea)
+            tipo_valor = self._analizar_expresion(nodo.valor)
+            if simbolo and tipo_valor:
+                self.tabla_simbolos.verificar_compatibilidad_tipos(simbolo.tipo, tipo_valor, linea)
+            if simbolo:
+                self.tabla_simbolos.marcar_inicializada(nodo.nombre)
+                return simbolo.tipo
+            return tipo_valor
+
+        elif isinstance(nodo, AsignacionIndice):
+            nombre, raiz = _nombre_y_raiz(nodo.arreglo)
+            linea = self._linea(raiz.token if raiz else None)
+            tipo_idx = self._analizar_expresion(nodo.indice)
+            if tipo_idx and tipo_idx != 'int':
+                self.tabla_simbolos.errores.append(f"Error semántico en línea {linea}: índice de arreglo debe ser int")
+            tipo_valor = self._analizar_expresion(nodo.valor)
+            # Obtener tipo base del arreglo
+            tipo_elemento = self.tabla_simbolos.obtener_tipo_elemento_arreglo(nombre, linea) if nombre else None
+            if tipo_elemento and tipo_valor:
+                self.tabla_simbolos.verificar_compatibilidad_tipos(tipo_elemento, tipo_valor, linea)
+            return tipo_elemento
+
+        elif isinstance(nodo, ExpresionIndice):
+            nombre, raiz = _nombre_y_raiz(nodo.arreglo)
+            if nombre is None:
+                self._analizar_expresion(nodo.arreglo)
+            linea = self._linea(raiz.token if raiz else None)
+            tipo_idx = self._analizar_expresion(nodo.indice)
+            if tipo_idx and tipo_idx != 'int':
+                self.tabla_simbolos.errores.append(f"Error semántico en línea {linea}: índice de arreglo debe ser int, se encontró '{tipo_idx}'")
+            # Retornar tipo BASE del arreglo, no int[]
+            tipo_elemento = self.tabla_simbolos.obtener_tipo_elemento_arreglo(nombre, linea) if nombre else None
+            return tipo_elemento if tipo_elemento else 'int'
+
+        elif isinstance(nodo, ExpresionBinaria):
+            tipo_izq = self._analizar_expresion(nodo.izquierda)
+            tipo_der = self._analizar_expresion(nodo.derecha)
+            return self.tabla_simbolos.obtener_tipo_expresion_binaria(
+                tipo_izq, nodo.operador, tipo_der, self._linea(nodo.token))
+
+        elif isinstance(nodo, ExpresionUnaria):
+            tipo_operando = self._analizar_expresion(nodo.operando)
+            tipo_base = tipo_operando[:-2] if tipo_operando and tipo_operando.endswith('[]') else tipo_operando
+            if nodo.operador == '!':
+                if tipo_base != 'boolean':
+                    self.tabla_simbolos.errores.append(f"Error semántico en línea {self._linea(nodo.token)}: Operador '!' requiere operando booleano")
+                return 'boolean'
+            # '-', '++', '--' prefijos y '++_post', '--_post'
+            if tipo_base not in ('int', 'float'):
+                self.tabla_simbolos.errores.append(f"Error semántico en línea {self._linea(nodo.token)}: Operador requiere operando numérico")
+            return tipo_operando
+
+        elif isinstance(nodo, ExpresionLlamada):
+            for argumento in nodo.argumentos:
+                self._analizar_expresion(argumento)
+            if nodo.nombre == "System.out.println":
+                return 'void'
+            return 'int'
 
-        if token.tipo == TipoToken.CORCHETE_IZQ:
-            self._saltar_literal_arreglo()
+        elif isinstance(nodo, ExpresionAcceso):
+            # Acceso a miembros fuera de una llamada: se busca el nombre completo
+            nombre, raiz = _nombre_y_raiz(nodo)
+            if nombre is None:
+                return None
+            simbolo = self.tabla_simbolos.buscar_variable(nombre, self._linea(raiz.token))
+            if simbolo:
+                return simbolo.tipo_completo if simbolo.es_arreglo else simbolo.tipo
             return None
 
-        # Token no reconocido, avanzar
-        self._avanzar()
+        elif isinstance(nodo, ExpresionAgrupada):
+            return self._analizar_expresion(nodo.expresion)
+
         return None
 
-    def _saltar_literal_arreglo(self):
-        if not self._verificar(TipoToken.CORCHETE_IZQ):
-            return
-        profundidad = 0
-        while self.posicion < len(self.tokens):
-            self._verificar_limite()
-            t = self._token_actual()
-            if not t:
-                break
-            if t.tipo == TipoToken.CORCHETE_IZQ:
-                profundidad += 1
-            elif t.tipo == TipoToken.CORCHETE_DER:
-                profundidad -= 1
-            self._avanzar()
-            if profundidad == 0:
-                break
+    # ========== REPORTES ==========
 
     def obtener_reporte_ciclos_anidados(self):
         """Genera un reporte de los ciclos anidados encontrados"""
@@ -646,4 +327,16 @@ class AnalizadorSemantico:
         # Agregar reporte de ciclos anidados
         resultado += self.obtener_reporte_ciclos_anidados()
         
-        return resultado
\ No newline at end of file
+        return resultado
+
+
+def _nombre_y_raiz(expr):
+    """Nombre ('a' o 'a.b.c') e Identificador raíz de una cadena de accesos, o (None, None)"""
+    miembros = []
+    while isinstance(expr, ExpresionAcceso):
+        miembros.append(expr.miembro)
+        expr = expr.objeto
+    if not isinstance(expr, Identificador):
+        return None, None
+    miembros.append(expr.nombre)
+    return '.'.join(reversed(miembros)), expr
@@ -1,26 +1,246 @@
+import gc
+import os
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
 from ast_nodes import *
-from lexico import TipoToken
+from lexico import Token, TipoToken, TokenStream
+
+IZQUIERDA = 'izquierda'
+DERECHA = 'derecha'
+
+# Operadores binarios: tipo de token -> (operador, precedencia, asociatividad)
+OPERADORES_BINARIOS = {
+    TipoToken.MAS: ('+', 10, IZQUIERDA),
+    TipoToken.MENOS: ('-', 10, IZQUIERDA),
+    TipoToken.MULTIPLICACION: ('*', 20, IZQUIERDA),
+    TipoToken.DIVISION: ('/', 20, IZQUIERDA),
+    TipoToken.MODULO: ('%', 20, IZQUIERDA),
+    TipoToken.IGUAL_IGUAL: ('==', 5, IZQUIERDA),
+    TipoToken.DIFERENTE: ('!=', 5, IZQUIERDA),
+    TipoToken.MENOR: ('<', 5, IZQUIERDA),
+    TipoToken.MAYOR: ('>', 5, IZQUIERDA),
+    TipoToken.MENOR_IGUAL: ('<=', 5, IZQUIERDA),
+    TipoToken.MAYOR_IGUAL: ('>=', 5, IZQUIERDA),
+    TipoToken.AND: ('&&', 3, IZQUIERDA),
+    TipoToken.OR: ('||', 2, IZQUIERDA),
+}
+_NO_BINARIO = (None, -1, IZQUIERDA)
+
+# Operadores unarios prefijos: tipo de token -> operador de ExpresionUnaria
+# (None para el '+' unario, que no crea nodo)
+OPERADORES_UNARIOS = {
+    TipoToken.MAS: None,
+    TipoToken.MENOS: '-',
+    TipoToken.NOT: '!',
+    TipoToken.INCREMENTO: '++',
+    TipoToken.DECREMENTO: '--',
+}
+
+# Expresiones primarias de un solo token: tipo de token -> constructor
+# desde (crear, valor, token), con crear el _crear del analizador
+_PRIMARIAS = {
+    TipoToken.NUMERO_ENTERO: lambda crear, valor, token: crear(Literal, int(valor), 'int', token=token),
+    TipoToken.NUMERO_FLOTANTE: lambda crear, valor, token: crear(Literal, float(valor), 'float', token=token),
+    TipoToken.CADENA: lambda crear, valor, token: crear(Literal, valor, 'string', token=token),
+    TipoToken.CARACTER: lambda crear, valor, token: crear(Literal, valor, 'char', token=token),
+    TipoToken.TRUE: lambda crear, valor, token: crear(Literal, True, 'boolean', token=token),
+    TipoToken.FALSE: lambda crear, valor, token: crear(Literal, False, 'boolean', token=token),
+    TipoToken.NULL: lambda crear, valor, token: crear(Literal, None, 'null', token=token),
+    TipoToken.IDENTIFICADOR: lambda crear, valor, token: crear(Identificador, valor, token=token),
+}
+
+TIPOS_DATO = frozenset((TipoToken.INT, TipoToken.FLOAT, TipoToken.BOOLEAN,
+                        TipoToken.STRING, TipoToken.CHAR))
+
+# Recuperación en modo pánico: tokens donde puede reanudarse el análisis
+# (fin de sentencia, fin de bloque e inicio de una nueva sentencia)
+SINCRONIZACION = TIPOS_DATO | {
+    TipoToken.PUNTO_COMA, TipoToken.LLAVE_DER, TipoToken.LLAVE_IZQ,
+    TipoToken.IF, TipoToken.WHILE, TipoToken.DO, TipoToken.FOR,
+    TipoToken.RETURN, TipoToken.EOF,
+}
+_FIN_SENTENCIA = frozenset((TipoToken.PUNTO_COMA, TipoToken.LLAVE_DER))
+
+def _inicio_span(nodo):
+    return nodo.span[0]
+
+
+def _cuerpos(sentencia):
+    """Bloques que forman parte directa de una sentencia de control"""
+    if isinstance(sentencia, SentenciaIf):
+        return (sentencia.bloque_if, sentencia.bloque_else)
+    if isinstance(sentencia, (SentenciaWhile, SentenciaDoWhile, SentenciaFor)):
+        return (sentencia.cuerpo,)
+    return ()
+
+def _cuerpos_con_llaves(sentencia):
+    """Bloques con llaves de la estructura de una sentencia, atravesando los cuerpos sin llaves"""
+    pendientes = [sentencia]
+    while pendientes:
+        for cuerpo in _cuerpos(pendientes.pop()):
+            if cuerpo is None:
+                continue
+            if cuerpo.span is None:
+                pendientes.extend(cuerpo.sentencias)
+            else:
+                yield cuerpo
+
+def _nodos_sin_llaves(sentencia):
+    """Nodos de una sentencia fuera de sus bloques con llaves (que ubican los suyos aparte)"""
+    pendientes = [sentencia]
+    while pendientes:
+        nodo = pendientes.pop()
+        yield nodo
+        for _, hijo in nodo.campos():
+            if isinstance(hijo, list):
+                pendientes.extend(h for h in hijo if isinstance(h, NodoAST))
+            elif isinstance(hijo, NodoAST) and not (isinstance(hijo, Bloque) and hijo.span is not None):
+                pendientes.append(hijo)
+
+def _nombre_calificado(expr):
+    """Nombre de lo llamado: 'f' o 'a.b.c' para una cadena de accesos; '<anon>' si no"""
+    miembros = []
+    while isinstance(expr, ExpresionAcceso):
+        miembros.append(expr.miembro)
+        expr = expr.objeto
+    if not isinstance(expr, Identificador):
+        return "<anon>"
+    miembros.append(expr.nombre)
+    return '.'.join(reversed(miembros))
+
+def _construir(clase, *campos, token=None):
+    """Nodo de expresión en la posición 'token'; es _crear si no hay FabricaNodos"""
+    nodo = clase(*campos)
+    nodo.token = token
+    return nodo
+
+def _origen(sentencia):
+    """Posición, relativa al contenedor, desde la que se miden los spans de sus cuerpos"""
+    return 0 if isinstance(sentencia, Bloque) else sentencia.span[0]
+
+# Marcos de la pila del modo iterativo de expresiones
+_RAIZ, _GRUPO, _INDICE, _LLAMADA, _ASIGNACION, _UNARIO, _BINARIO = range(7)
 
 class AnalizadorSintactico:
-    MAX_ITERACIONES = 10000  # Límite para evitar bucles infinitos
+    """
+    Analizador sintáctico descendente recursivo.
+    Cada bucle consume al menos un token por iteración o termina, así que
+    el análisis es lineal en el número de tokens sin límite de iteraciones.
+    Tras un error entra en modo pánico: calla los errores en cascada y, al
+    terminar la sentencia, descarta tokens hasta un punto de SINCRONIZACION.
+    En modo 'iterativo' no usa recursión: la profundidad de anidamiento
+    solo está limitada por la memoria.
+    Con una FabricaNodos (opcional) las expresiones iguales del programa
+    comparten una sola instancia, sin posición: el AST ocupa menos, pero
+    los errores semánticos en esas expresiones no tienen línea.
+    """
+
+    MODOS = ('recursivo', 'iterativo')
 
-    def __init__(self, tokens):
+    def __init__(self, tokens, modo='recursivo', fabrica=None):
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de análisis sintáctico desconocido: '{modo}'")
+        self.modo = modo
+        self._iterativo = modo == 'iterativo'
         self.tokens = tokens
+        # Cursor: tipos de todos los tokens, terminados siempre en EOF
+        self._tipos = tokens.lista_tipos() if isinstance(tokens, TokenStream) else [t.tipo for t in tokens]
+        self._centinela = None
+        if not self._tipos or self._tipos[-1] != TipoToken.EOF:
+            ultimo = tokens[-1] if self._tipos else None
+            self._centinela = Token(TipoToken.EOF, '', ultimo.linea if ultimo else 1,
+                                    ultimo.columna if ultimo else 1)
+            self._tipos = self._tipos + [TipoToken.EOF]
+        self._ultimo_indice = len(self._tipos) - 1
         self.pos = 0
+        self.tipo_actual = self._tipos[0]
         self.errores = []
         self.ast = None
         self._errores_encontrados = False
-        self._iteraciones = 0
-
-    def _verificar_limite(self):
-        """Verifica que no se exceda el límite de iteraciones"""
-        self._iteraciones += 1
-        if self._iteraciones > self.MAX_ITERACIONES:
-            raise Exception("Límite de iteraciones excedido (posible bucle infinito)")
+        self._panico = False
+        self._base = 0  # Índice del '{' del bloque en curso (0 en el programa)
+        self._inicio_sentencia = 0  # Índice del primer token de la sentencia en curso
+        self._validando = False  # validar(): sin AST
+        self.fabrica = fabrica  # FabricaNodos para compartir las expresiones, o None
+        # Constructor de las expresiones: (clase, *campos, token=None) -> nodo
+        self._crear = _construir if fabrica is None else fabrica.crear
 
     def analizar(self):
         try:
-            self.ast = self.programa()
+            if self._iterativo:
+                self.ast = self._ejecutar_pila(self._programa_pasos())
+            else:
+                self.ast = self.programa()
+        except Exception as e:
+            self.errores.append(f"Error crítico: {str(e)}")
+            self._errores_encontrados = True
+        return not self._errores_encontrados
+
+    def validar(self):
+        """
+        Como analizar(), con la misma gramática y los mismos errores, pero
+        sin construir el AST: las expresiones (la mayoría de los nodos) se
+        reconocen sin crear nodos y cada sentencia se descarta al cerrarla.
+        Para cuando solo importan el veredicto y self.errores.
+        """
+        self._validando = True
+        try:
+            return self.analizar()
+        finally:
+            self._validando = False
+            self.ast = None
+
+    def analizar_paralelo(self, workers=None):
+        """
+        Como analizar(), pero repartiendo las declaraciones de nivel
+        superior en un pool de procesos. Los tokens se parten en tramos
+        tras un ';' fuera de llaves y paréntesis; cada tramo se analiza por
+        separado y sus declaraciones se unen en orden. Desde el primer
+        tramo con errores el análisis sigue en secuencia en este proceso
+        (la recuperación puede cruzar los cortes), así que el AST y los
+        errores son siempre los mismos que con analizar().
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        cortes = self._cortes_nivel_superior(workers * 4) if workers > 1 else []
+        if len(cortes) <= 2:
+            return self.analizar()
+
+        if isinstance(self.tokens, TokenStream):
+            tramos = [self.tokens.tramo(a, b) for a, b in zip(cortes, cortes[1:])]
+        else:
+            tramos = [self.tokens[a:b] for a, b in zip(cortes, cortes[1:])]
+        # Recibir los subárboles crea muchos objetos de golpe; el recolector
+        # cíclico no encontraría nada y multiplicaría el tiempo de carga
+        recolector = gc.isenabled()
+        gc.disable()
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                resultados = list(pool.map(_analizar_tramo, tramos, [self.modo] * len(tramos)))
+        finally:
+            if recolector:
+                gc.enable()
+
+        declaraciones = []
+        for inicio, (parciales, ok) in zip(cortes, resultados):
+            if not ok:
+                break
+            for decl in parciales:
+                decl.span = (decl.span[0] + inicio, decl.span[1] + inicio)
+                if self.fabrica is not None:
+                    self.fabrica.compartir(decl)
+            declaraciones.extend(parciales)
+        else:
+            inicio = self._ultimo_indice
+
+        self.pos = inicio
+        self.tipo_actual = self._tipos[inicio]
+        try:
+            while not self._en_fin():
+                inicio = self._abrir_sentencia()
+                self._cerrar_sentencia(declaraciones, self._una_declaracion(), inicio)
+            self.ast = Programa(declaraciones)
         except Exception as e:
             self.errores.append(f"Error crítico: {str(e)}")
             self._errores_encontrados = True
@@ -34,22 +254,12 @@ class AnalizadorSintactico:
     # ========== PROGRAMA Y DECLARACIONES ==========
     def programa(self):
         declaraciones = []
-        last_pos = -1
-        while not self._es(TipoToken.EOF):
-            self._verificar_limite()
-            # Guardia anti-bucle: si no avanzamos, forzar avance
-            if self.pos == last_pos:
-                self._avanzar()
-                continue
-            last_pos = self.pos
-            
-            decl = self.declaracion()
-            if decl:
-                declaraciones.append(decl)
+        while not self._en_fin():
+            inicio = self._abrir_sentencia()
+            self._cerrar_sentencia(declaraciones, self.declaracion(), inicio)
         return Programa(declaraciones)
 
     def declaracion(self):
-        self._verificar_limite()
         # Declaración de variable/arreglo con tipo
         if self._es_tipo():
             return self.declaracion_variable()
@@ -60,7 +270,6 @@ class AnalizadorSintactico:
         return self.sentencia()
 
     def declaracion_variable(self):
-        self._verificar_limite()
         if not self._actual():
             return None
 
@@ -83,6 +292,7 @@ class AnalizadorSintactico:
         if not self._es(TipoToken.IDENTIFICADOR):
             self._error("Se esperaba nombre de variable.")
             return None
+        token = self.pos - self._inicio_sentencia
         nombre = self._actual().valor
         self._avanzar()
 
@@ -111,7 +321,9 @@ class AnalizadorSintactico:
                 self._avanzar()
                 if self._es(TipoToken.CORCHETE_DER):
                     self._avanzar()
-                    inicializador = Literal(int(tam), 'int')
+                    inicializador = self._crear(Literal, int(tam), 'int')
+                    if not tipo.endswith("[]"):
+                        tipo = tipo + "[]"
                 else:
                     self._error("Falta corchete de cierre ']' en declaración de arreglo.")
                     return None
@@ -121,17 +333,15 @@ class AnalizadorSintactico:
 
         if self._es(TipoToken.PUNTO_COMA):
             self._avanzar()
-            return DeclaracionVariable(tipo, nombre, inicializador)
+            return self._ubicar(DeclaracionVariable(tipo, nombre, inicializador), token)
 
         self._error("Falta punto y coma en declaración.")
         return None
 
     def lista_expresiones_arreglo(self):
-        self._verificar_limite()
         self._avanzar()  # Consumir '['
         elementos = []
-        while not self._es(TipoToken.CORCHETE_DER) and not self._es(TipoToken.EOF):
-            self._verificar_limite()
+        while not self._es(TipoToken.CORCHETE_DER) and not self._en_fin():
             expr = self.expresion()
             elementos.append(expr)
             if self._es(TipoToken.COMA):
@@ -147,34 +357,27 @@ class AnalizadorSintactico:
 
     # =========== BLOQUES Y SENTENCIAS ============
     def bloque(self):
-        self._verificar_limite()
         if not self._es(TipoToken.LLAVE_IZQ):
             self._error("Se esperaba '{' para iniciar bloque.")
             return None
+        apertura = self.pos
+        base_exterior, self._base = self._base, apertura
+        sentencia_exterior = self._inicio_sentencia
         self._avanzar()
         sentencias = []
-        last_pos = -1
-        while not self._es(TipoToken.LLAVE_DER) and not self._es(TipoToken.EOF):
-            self._verificar_limite()
-            # Guardia anti-bucle
-            if self.pos == last_pos:
-                self._avanzar()
-                continue
-            last_pos = self.pos
-            
-            stmt = self.declaracion()
-            if stmt:
-                sentencias.append(stmt)
+        while not self._es(TipoToken.LLAVE_DER) and not self._en_fin():
+            inicio = self._abrir_sentencia()
+            self._cerrar_sentencia(sentencias, self.declaracion(), inicio)
+        self._base = base_exterior
+        self._inicio_sentencia = sentencia_exterior
         
         if self._es(TipoToken.LLAVE_DER):
             self._avanzar()
-            return Bloque(sentencias)
         else:
             self._error("Falta llave de cierre '}' en bloque.")
-            return Bloque(sentencias)  # Retornar lo que tenemos
+        return self._bloque_con_span(sentencias, apertura)
 
     def sentencia(self):
-        self._verificar_limite()
         if self._es(TipoToken.IF):
             return self.sentencia_if()
         if self._es(TipoToken.WHILE):
@@ -190,13 +393,14 @@ class AnalizadorSintactico:
         return self.sentencia_expresion()
 
     def sentencia_if(self):
-        self._verificar_limite()
+        token = self.pos - self._inicio_sentencia
         self._avanzar()  # Consumir 'if'
         if not self._es(TipoToken.PARENTESIS_IZQ):
             self._error("Falta paréntesis de apertura '(' en if.")
             return None
         self._avanzar()
         condicion = self.expresion()
+        token_condicion = self.pos - self._inicio_sentencia
         if not self._es(TipoToken.PARENTESIS_DER):
             self._error("Falta paréntesis de cierre ')' en if.")
         else:
@@ -207,43 +411,44 @@ class AnalizadorSintactico:
         if self._es(TipoToken.ELSE):
             self._avanzar()
             bloque_else = self.bloque() if self._es(TipoToken.LLAVE_IZQ) else self._sentencia_simple()
-        return SentenciaIf(condicion, bloque_if, bloque_else)
+        return self._ubicar(SentenciaIf(condicion, bloque_if, bloque_else), token, token_condicion)
 
     def _sentencia_simple(self):
         """Para sentencias sin llaves (if sin bloque)"""
-        self._verificar_limite()
         stmt = self.sentencia()
         return Bloque([stmt]) if stmt else Bloque([])
 
     def sentencia_while(self):
-        self._verificar_limite()
+        token = self.pos - self._inicio_sentencia
         self._avanzar()  # Consumir 'while'
         if not self._es(TipoToken.PARENTESIS_IZQ):
             self._error("Falta paréntesis de apertura '(' en while.")
             return None
         self._avanzar()
         cond = self.expresion()
+        token_condicion = self.pos - self._inicio_sentencia
         if not self._es(TipoToken.PARENTESIS_DER):
             self._error("Falta paréntesis de cierre ')' en while.")
         else:
             self._avanzar()
         
         cuerpo = self.bloque() if self._es(TipoToken.LLAVE_IZQ) else self._sentencia_simple()
-        return SentenciaWhile(cond, cuerpo)
+        return self._ubicar(SentenciaWhile(cond, cuerpo), token, token_condicion)
 
     def sentencia_do_while(self):
-        self._verificar_limite()
+        token = self.pos - self._inicio_sentencia
         self._avanzar()  # Consumir 'do'
         cuerpo = self.bloque() if self._es(TipoToken.LLAVE_IZQ) else self._sentencia_simple()
         if not self._es(TipoToken.WHILE):
             self._error("Se esperaba 'while' después de 'do' {...}")
-            return SentenciaDoWhile(cuerpo, Literal(True, 'boolean'))
+            return self._ubicar(SentenciaDoWhile(cuerpo, self._crear(Literal, True, 'boolean')), token)
         self._avanzar()
         if not self._es(TipoToken.PARENTESIS_IZQ):
             self._error("Falta paréntesis de apertura '(' en do-while.")
         else:
             self._avanzar()
         cond = self.expresion()
+        token_condicion = self.pos - self._inicio_sentencia
         if not self._es(TipoToken.PARENTESIS_DER):
             self._error("Falta paréntesis de cierre ')' en do-while.")
         else:
@@ -252,10 +457,10 @@ class AnalizadorSintactico:
             self._avanzar()
         else:
             self._error("Falta punto y coma ';' después de do-while.")
-        return SentenciaDoWhile(cuerpo, cond)
+        return self._ubicar(SentenciaDoWhile(cuerpo, cond), token, token_condicion)
 
     def sentencia_for(self):
-        self._verificar_limite()
+        token = self.pos - self._inicio_sentencia
         self._avanzar()  # Consumir 'for'
         if not self._es(TipoToken.PARENTESIS_IZQ):
             self._error("Falta paréntesis de apertura '(' en for.")
@@ -275,8 +480,10 @@ class AnalizadorSintactico:
 
         # Condición
         cond = None
+        token_condicion = None
         if not self._es(TipoToken.PUNTO_COMA):
             cond = self.expresion()
+            token_condicion = self.pos - self._inicio_sentencia
         if self._es(TipoToken.PUNTO_COMA):
             self._avanzar()
 
@@ -290,10 +497,9 @@ class AnalizadorSintactico:
             self._avanzar()
 
         cuerpo = self.bloque() if self._es(TipoToken.LLAVE_IZQ) else self._sentencia_simple()
-        return SentenciaFor(inicial, cond, inc, cuerpo)
+        return self._ubicar(SentenciaFor(inicial, cond, inc, cuerpo), token, token_condicion)
 
     def sentencia_return(self):
-        self._verificar_limite()
         self._avanzar()  # Consumir 'return'
         expr = None
         if not self._es(TipoToken.PUNTO_COMA):
@@ -305,7 +511,6 @@ class AnalizadorSintactico:
         return SentenciaReturn(expr)
 
     def sentencia_expresion(self):
-        self._verificar_limite()
         expr = self.expresion()
         if self._es(TipoToken.PUNTO_COMA):
             self._avanzar()
@@ -316,101 +521,68 @@ class AnalizadorSintactico:
 
     # =========== EXPRESIONES ============
     def expresion(self):
-        self._verificar_limite()
+        if self._validando:
+            return self._validar_expresion()
+        if self._iterativo:
+            return self._expresion_iterativa()
         return self.expresion_asignacion()
 
     def expresion_asignacion(self):
-        self._verificar_limite()
         expr = self.expresion_binaria()
         if self._es(TipoToken.ASIGNACION):
             if isinstance(expr, Identificador) or isinstance(expr, ExpresionIndice):
+                # Un identificador destino es el token anterior al '='
+                token = self.pos - 1 - self._inicio_sentencia
                 self._avanzar()
                 valor = self.expresion_asignacion()
                 if isinstance(expr, ExpresionIndice):
-                    return AsignacionIndice(expr.arreglo, expr.indice, valor)
-                return Asignacion(expr.nombre, valor)
+                    return self._crear(AsignacionIndice, expr.arreglo, expr.indice, valor)
+                return self._crear(Asignacion, expr.nombre, valor, token=token)
             else:
                 self._error("El lado izquierdo de una asignación debe ser identificador o índice de arreglo.")
         return expr
 
     def expresion_binaria(self, min_prec=0):
-        self._verificar_limite()
         izquierda = self.expresion_unaria()
         while True:
-            self._verificar_limite()
-            actual = self._actual()
-            if not actual:
-                break
-            op, prec = self._op_binario(actual.tipo)
+            op, prec, asociatividad = OPERADORES_BINARIOS.get(self.tipo_actual, _NO_BINARIO)
             if prec < min_prec:
                 break
+            token = self.pos - self._inicio_sentencia
             self._avanzar()
-            derecha = self.expresion_binaria(prec + 1)
-            izquierda = ExpresionBinaria(izquierda, op, derecha)
+            derecha = self.expresion_binaria(prec + 1 if asociatividad == IZQUIERDA else prec)
+            izquierda = self._crear(ExpresionBinaria, izquierda, op, derecha, token=token)
         return izquierda
 
-    def _op_binario(self, tipo):
-        tabla = {
-            TipoToken.MAS: ('+', 10),
-            TipoToken.MENOS: ('-', 10),
-            TipoToken.MULTIPLICACION: ('*', 20),
-            TipoToken.DIVISION: ('/', 20),
-            TipoToken.MODULO: ('%', 20),
-            TipoToken.IGUAL_IGUAL: ('==', 5),
-            TipoToken.DIFERENTE: ('!=', 5),
-            TipoToken.MENOR: ('<', 5),
-            TipoToken.MAYOR: ('>', 5),
-            TipoToken.MENOR_IGUAL: ('<=', 5),
-            TipoToken.MAYOR_IGUAL: ('>=', 5),
-            TipoToken.AND: ('&&', 3),
-            TipoToken.OR: ('||', 2),
-        }
-        return tabla.get(tipo, (None, -1))
-
     def expresion_unaria(self):
-        self._verificar_limite()
-        if self._es(TipoToken.MAS):
-            self._avanzar()
-            return self.expresion_unaria()
-        if self._es(TipoToken.MENOS):
-            self._avanzar()
-            expr = self.expresion_unaria()
-            return ExpresionUnaria('-', expr)
-        if self._es(TipoToken.NOT):
-            self._avanzar()
-            expr = self.expresion_unaria()
-            return ExpresionUnaria('!', expr)
-        if self._es(TipoToken.INCREMENTO):
-            self._avanzar()
-            expr = self.expresion_unaria()
-            return ExpresionUnaria('++', expr)
-        if self._es(TipoToken.DECREMENTO):
-            self._avanzar()
-            expr = self.expresion_unaria()
-            return ExpresionUnaria('--', expr)
-        return self.expresion_postfija()
+        if self.tipo_actual not in OPERADORES_UNARIOS:
+            return self.expresion_postfija()
+        operador = OPERADORES_UNARIOS[self.tipo_actual]
+        token = self.pos - self._inicio_sentencia
+        self._avanzar()
+        operando = self.expresion_unaria()
+        if operador is None:  # El '+' unario no crea nodo
+            return operando
+        return self._crear(ExpresionUnaria, operador, operando, token=token)
 
     def expresion_postfija(self):
-        self._verificar_limite()
         expr = self.expresion_primaria()
         while True:
-            self._verificar_limite()
             if self._es(TipoToken.INCREMENTO):
+                expr = self._crear(ExpresionUnaria, '++_post', expr, token=self.pos - self._inicio_sentencia)
                 self._avanzar()
-                expr = ExpresionUnaria('++_post', expr)
             elif self._es(TipoToken.DECREMENTO):
+                expr = self._crear(ExpresionUnaria, '--_post', expr, token=self.pos - self._inicio_sentencia)
                 self._avanzar()
-                expr = ExpresionUnaria('--_post', expr)
             elif self._es(TipoToken.PARENTESIS_IZQ):
                 args = self._argumentos_llamada()
-                nombre = expr.nombre if isinstance(expr, Identificador) else "<anon>"
-                expr = ExpresionLlamada(nombre, args)
+                expr = self._crear(ExpresionLlamada, _nombre_calificado(expr), args)
             elif self._es(TipoToken.PUNTO):
                 self._avanzar()
                 if self._es(TipoToken.IDENTIFICADOR):
                     miembro = self._actual().valor
                     self._avanzar()
-                    expr = ExpresionAcceso(expr, miembro)
+                    expr = self._crear(ExpresionAcceso, expr, miembro)
                 else:
                     self._error("Falta identificador después de '.'")
                     break
@@ -419,7 +591,7 @@ class AnalizadorSintactico:
                 idx = self.expresion()
                 if self._es(TipoToken.CORCHETE_DER):
                     self._avanzar()
-                    expr = ExpresionIndice(expr, idx)
+                    expr = self._crear(ExpresionIndice, expr, idx)
                 else:
                     self._error("Falta ']' después de índice de arreglo.")
                     break
@@ -428,11 +600,9 @@ class AnalizadorSintactico:
         return expr
 
     def _argumentos_llamada(self):
-        self._verificar_limite()
         self._avanzar()  # Consumir '('
         args = []
-        while not self._es(TipoToken.PARENTESIS_DER) and not self._es(TipoToken.EOF):
-            self._verificar_limite()
+        while not self._es(TipoToken.PARENTESIS_DER) and not self._en_fin():
             args.append(self.expresion())
             if self._es(TipoToken.COMA):
                 self._avanzar()
@@ -445,36 +615,11 @@ class AnalizadorSintactico:
         return args
 
     def expresion_primaria(self):
-        self._verificar_limite()
-        if self._es(TipoToken.NUMERO_ENTERO):
-            valor = int(self._actual().valor)
-            self._avanzar()
-            return Literal(valor, 'int')
-        if self._es(TipoToken.NUMERO_FLOTANTE):
-            valor = float(self._actual().valor)
-            self._avanzar()
-            return Literal(valor, 'float')
-        if self._es(TipoToken.CADENA):
-            valor = self._actual().valor
-            self._avanzar()
-            return Literal(valor, 'string')
-        if self._es(TipoToken.CARACTER):
-            valor = self._actual().valor
-            self._avanzar()
-            return Literal(valor, 'char')
-        if self._es(TipoToken.TRUE):
+        constructor = _PRIMARIAS.get(self.tipo_actual)
+        if constructor is not None:
+            expr = constructor(self._crear, self._actual().valor, self.pos - self._inicio_sentencia)
             self._avanzar()
-            return Literal(True, 'boolean')
-        if self._es(TipoToken.FALSE):
-            self._avanzar()
-            return Literal(False, 'boolean')
-        if self._es(TipoToken.NULL):
-            self._avanzar()
-            return Literal(None, 'null')
-        if self._es(TipoToken.IDENTIFICADOR):
-            nombre = self._actual().valor
-            self._avanzar()
-            return Identificador(nombre)
+            return expr
         if self._es(TipoToken.PARENTESIS_IZQ):
             self._avanzar()
             expr = self.expresion()
@@ -482,40 +627,744 @@ class AnalizadorSintactico:
                 self._avanzar()
             else:
                 self._error("Falta ')' de agrupación.")
-            return ExpresionAgrupada(expr)
+            return self._crear(ExpresionAgrupada, expr)
         
         # Si no es nada reconocido, avanzar para no quedarnos atascados
         tok = self._actual()
         if tok and tok.tipo != TipoToken.EOF:
             self._error(f"Expresión inesperada: '{tok.valor}'")
             self._avanzar()
-        return Literal(0, 'int')
+        return self._crear(Literal, 0, 'int')
+
+    # =========== MODO ITERATIVO ============
+    # Las sentencias compuestas son generadores que ceden el generador de
+    # cada sentencia anidada; _ejecutar_pila los apila y les devuelve el
+    # resultado. Las declaraciones de variables, return y sentencias de
+    # expresión no anidan sentencias y se reutilizan tal cual.
+    def _ejecutar_pila(self, raiz):
+        pila = [raiz]
+        valor = None
+        while pila:
+            try:
+                anidado = pila[-1].send(valor)
+            except StopIteration as fin:
+                pila.pop()
+                valor = fin.value
+            else:
+                pila.append(anidado)
+                valor = None
+        return valor
+
+    def _programa_pasos(self):
+        declaraciones = []
+        while not self._en_fin():
+            inicio = self._abrir_sentencia()
+            decl = yield self._declaracion_pasos()
+            self._cerrar_sentencia(declaraciones, decl, inicio)
+        return Programa(declaraciones)
+
+    def _declaracion_pasos(self):
+        if self._es_tipo():
+            return self.declaracion_variable()
+        return (yield self._sentencia_pasos())
+
+    def _bloque_pasos(self):
+        if not self._es(TipoToken.LLAVE_IZQ):
+            self._error("Se esperaba '{' para iniciar bloque.")
+            return None
+        apertura = self.pos
+        base_exterior, self._base = self._base, apertura
+        sentencia_exterior = self._inicio_sentencia
+        self._avanzar()
+        sentencias = []
+        while not self._es(TipoToken.LLAVE_DER) and not self._en_fin():
+            inicio = self._abrir_sentencia()
+            stmt = yield self._declaracion_pasos()
+            self._cerrar_sentencia(sentencias, stmt, inicio)
+        self._base = base_exterior
+        self._inicio_sentencia = sentencia_exterior
+
+        if self._es(TipoToken.LLAVE_DER):
+            self._avanzar()
+        else:
+            self._error("Falta llave de cierre '}' en bloque.")
+        return self._bloque_con_span(sentencias, apertura)
+
+    def _sentencia_pasos(self):
+        if self._es(TipoToken.IF):
+            return (yield self._if_pasos())
+        if self._es(TipoToken.WHILE):
+            return (yield self._while_pasos())
+        if self._es(TipoToken.DO):
+            return (yield self._do_while_pasos())
+        if self._es(TipoToken.FOR):
+            return (yield self._for_pasos())
+        if self._es(TipoToken.RETURN):
+            return self.sentencia_return()
+        if self._es(TipoToken.LLAVE_IZQ):
+            return (yield self._bloque_pasos())
+        return self.sentencia_expresion()
+
+    def _cuerpo_pasos(self):
+        """Bloque o sentencia simple (envuelta en un Bloque) como cuerpo de control"""
+        if self._es(TipoToken.LLAVE_IZQ):
+            return (yield self._bloque_pasos())
+        stmt = yield self._sentencia_pasos()
+        return Bloque([stmt]) if stmt else Bloque([])
+
+    def _if_pasos(self):
+        token = self.pos - self._inicio_sentencia
+        self._avanzar()  # Consumir 'if'
+        if not self._es(TipoToken.PARENTESIS_IZQ):
+            self._error("Falta paréntesis de apertura '(' en if.")
+            return None
+        self._avanzar()
+        condicion = self.expresion()
+        token_condicion = self.pos - self._inicio_sentencia
+        if not self._es(TipoToken.PARENTESIS_DER):
+            self._error("Falta paréntesis de cierre ')' en if.")
+        else:
+            self._avanzar()
+
+        bloque_if = yield self._cuerpo_pasos()
+        bloque_else = None
+        if self._es(TipoToken.ELSE):
+            self._avanzar()
+            bloque_else = yield self._cuerpo_pasos()
+        return self._ubicar(SentenciaIf(condicion, bloque_if, bloque_else), token, token_condicion)
+
+    def _while_pasos(self):
+        token = self.pos - self._inicio_sentencia
+        self._avanzar()  # Consumir 'while'
+        if not self._es(TipoToken.PARENTESIS_IZQ):
+            self._error("Falta paréntesis de apertura '(' en while.")
+            return None
+        self._avanzar()
+        cond = self.expresion()
+        token_condicion = self.pos - self._inicio_sentencia
+        if not self._es(TipoToken.PARENTESIS_DER):
+            self._error("Falta paréntesis de cierre ')' en while.")
+        else:
+            self._avanzar()
+
+        cuerpo = yield self._cuerpo_pasos()
+        return self._ubicar(SentenciaWhile(cond, cuerpo), token, token_condicion)
+
+    def _do_while_pasos(self):
+        token = self.pos - self._inicio_sentencia
+        self._avanzar()  # Consumir 'do'
+        cuerpo = yield self._cuerpo_pasos()
+        if not self._es(TipoToken.WHILE):
+            self._error("Se esperaba 'while' después de 'do' {...}")
+            return self._ubicar(SentenciaDoWhile(cuerpo, self._crear(Literal, True, 'boolean')), token)
+        self._avanzar()
+        if not self._es(TipoToken.PARENTESIS_IZQ):
+            self._error("Falta paréntesis de apertura '(' en do-while.")
+        else:
+            self._avanzar()
+        cond = self.expresion()
+        token_condicion = self.pos - self._inicio_sentencia
+        if not self._es(TipoToken.PARENTESIS_DER):
+            self._error("Falta paréntesis de cierre ')' en do-while.")
+        else:
+            self._avanzar()
+        if self._es(TipoToken.PUNTO_COMA):
+            self._avanzar()
+        else:
+            self._error("Falta punto y coma ';' después de do-while.")
+        return self._ubicar(SentenciaDoWhile(cuerpo, cond), token, token_condicion)
+
+    def _for_pasos(self):
+        token = self.pos - self._inicio_sentencia
+        self._avanzar()  # Consumir 'for'
+        if not self._es(TipoToken.PARENTESIS_IZQ):
+            self._error("Falta paréntesis de apertura '(' en for.")
+            return None
+        self._avanzar()
+
+        # Inicialización
+        inicial = None
+        if self._es_tipo():
+            inicial = self.declaracion_variable()
+        elif not self._es(TipoToken.PUNTO_COMA):
+            inicial = self.expresion()
+            if self._es(TipoToken.PUNTO_COMA):
+                self._avanzar()
+        else:
+            self._avanzar()  # Saltar ';'
+
+        # Condición
+        cond = None
+        token_condicion = None
+        if not self._es(TipoToken.PUNTO_COMA):
+            cond = self.expresion()
+            token_condicion = self.pos - self._inicio_sentencia
+        if self._es(TipoToken.PUNTO_COMA):
+            self._avanzar()
+
+        # Incremento
+        inc = None
+        if not self._es(TipoToken.PARENTESIS_DER):
+            inc = self.expresion()
+        if not self._es(TipoToken.PARENTESIS_DER):
+            self._error("Falta paréntesis de cierre ')' en for.")
+        else:
+            self._avanzar()
+
+        cuerpo = yield self._cuerpo_pasos()
+        return self._ubicar(SentenciaFor(inicial, cond, inc, cuerpo), token, token_condicion)
+
+    def _expresion_iterativa(self):
+        """
+        Shunting-yard sobre una pila de marcos: operadores binarios y
+        prefijos pendientes (con su operando izquierdo), más un marco por
+        cada contexto que espera una expresión completa (agrupación,
+        índice, argumento de llamada, lado derecho de asignación).
+        Produce el mismo AST y los mismos errores que expresion_asignacion.
+        """
+        pila = [(_RAIZ,)]
+        while True:
+            # ----- Posición de operando: prefijos y expresión primaria -----
+            tipo = self.tipo_actual
+            while tipo in OPERADORES_UNARIOS:
+                pila.append((_UNARIO, OPERADORES_UNARIOS[tipo], self.pos - self._inicio_sentencia))
+                self._avanzar()
+                tipo = self.tipo_actual
+            if tipo == TipoToken.PARENTESIS_IZQ:
+                self._avanzar()
+                pila.append((_GRUPO,))
+                continue
+            constructor = _PRIMARIAS.get(tipo)
+            if constructor is not None:
+                expr = constructor(self._crear, self._actual().valor, self.pos - self._inicio_sentencia)
+                self._avanzar()
+            else:
+                if tipo != TipoToken.EOF:
+                    self._error(f"Expresión inesperada: '{self._actual().valor}'")
+                    self._avanzar()
+                expr = self._crear(Literal, 0, 'int')
+
+            # ----- Posición de operador, hasta volver a esperar un operando -----
+            postfijos = True
+            operando = False
+            while not operando:
+                while postfijos:
+                    tipo = self.tipo_actual
+                    if tipo == TipoToken.INCREMENTO:
+                        expr = self._crear(ExpresionUnaria, '++_post', expr, token=self.pos - self._inicio_sentencia)
+                        self._avanzar()
+                    elif tipo == TipoToken.DECREMENTO:
+                        expr = self._crear(ExpresionUnaria, '--_post', expr, token=self.pos - self._inicio_sentencia)
+                        self._avanzar()
+                    elif tipo == TipoToken.PARENTESIS_IZQ:
+                        nombre = _nombre_calificado(expr)
+                        self._avanzar()
+                        if not self._es(TipoToken.PARENTESIS_DER) and not self._en_fin():
+                            pila.append((_LLAMADA, nombre, []))
+                            operando = True
+                            break
+                        if self._es(TipoToken.PARENTESIS_DER):
+                            self._avanzar()
+                        else:
+                            self._error("Falta ')' en llamada.")
+                        expr = self._crear(ExpresionLlamada, nombre, [])
+                    elif tipo == TipoToken.PUNTO:
+                        self._avanzar()
+                        if self._es(TipoToken.IDENTIFICADOR):
+                            expr = self._crear(ExpresionAcceso, expr, self._actual().valor)
+                            self._avanzar()
+                        else:
+                            self._error("Falta identificador después de '.'")
+                            postfijos = False
+                    elif tipo == TipoToken.CORCHETE_IZQ:
+                        self._avanzar()
+                        pila.append((_INDICE, expr))
+                        operando = True
+                        break
+                    else:
+                        postfijos = False
+                if operando:
+                    break
+
+                # Prefijos pendientes sobre el operando completo
+                while pila[-1][0] == _UNARIO:
+                    _, operador, token = pila.pop()
+                    if operador is not None:
+                        expr = self._crear(ExpresionUnaria, operador, expr, token=token)
+
+                # Operador binario: reducir los de mayor precedencia y apilarlo
+                op, prec, asociatividad = OPERADORES_BINARIOS.get(self.tipo_actual, _NO_BINARIO)
+                if op is not None:
+                    while pila[-1][0] == _BINARIO and pila[-1][2] > prec:
+                        _, op_pendiente, _, izquierda, token = pila.pop()
+                        expr = self._crear(ExpresionBinaria, izquierda, op_pendiente, expr, token=token)
+                    minimo = prec + 1 if asociatividad == IZQUIERDA else prec
+                    pila.append((_BINARIO, op, minimo, expr, self.pos - self._inicio_sentencia))
+                    self._avanzar()
+                    operando = True
+                    break
+                while pila[-1][0] == _BINARIO:
+                    _, op_pendiente, _, izquierda, token = pila.pop()
+                    expr = self._crear(ExpresionBinaria, izquierda, op_pendiente, expr, token=token)
+
+                # Asignación (asociativa a la derecha)
+                if self._es(TipoToken.ASIGNACION):
+                    if isinstance(expr, Identificador) or isinstance(expr, ExpresionIndice):
+                        # Un identificador destino es el token anterior al '='
+                        pila.append((_ASIGNACION, expr, self.pos - 1 - self._inicio_sentencia))
+                        self._avanzar()
+                        operando = True
+                        break
+                    self._error("El lado izquierdo de una asignación debe ser identificador o índice de arreglo.")
+                while pila[-1][0] == _ASIGNACION:
+                    _, destino, token = pila.pop()
+                    if isinstance(destino, ExpresionIndice):
+                        expr = self._crear(AsignacionIndice, destino.arreglo, destino.indice, expr)
+                    else:
+                        expr = self._crear(Asignacion, destino.nombre, expr, token=token)
+
+                # Expresión completa: cerrar el contexto que la esperaba
+                marco = pila.pop()
+                if marco[0] == _RAIZ:
+                    return expr
+                postfijos = True
+                if marco[0] == _GRUPO:
+                    if self._es(TipoToken.PARENTESIS_DER):
+                        self._avanzar()
+                    else:
+                        self._error("Falta ')' de agrupación.")
+                    expr = self._crear(ExpresionAgrupada, expr)
+                elif marco[0] == _INDICE:
+                    if self._es(TipoToken.CORCHETE_DER):
+                        self._avanzar()
+                        expr = self._crear(ExpresionIndice, marco[1], expr)
+                    else:
+                        self._error("Falta ']' después de índice de arreglo.")
+                        expr = marco[1]
+                        postfijos = False
+                else:  # _LLAMADA
+                    _, nombre, args = marco
+                    args.append(expr)
+                    if self._es(TipoToken.COMA):
+                        self._avanzar()
+                        if not self._es(TipoToken.PARENTESIS_DER) and not self._en_fin():
+                            pila.append(marco)
+                            operando = True
+                            break
+                    if self._es(TipoToken.PARENTESIS_DER):
+                        self._avanzar()
+                    else:
+                        self._error("Falta ')' en llamada.")
+                    expr = self._crear(ExpresionLlamada, nombre, args)
+
+    def _validar_expresion(self):
+        """
+        _expresion_iterativa sin nodos, para validar(): consume los mismos
+        tokens y reporta los mismos errores. Del operando solo importa si
+        puede ser destino de una asignación (identificador o índice).
+        Retorna True, como el nodo que produciría.
+        """
+        pila = [(_RAIZ,)]
+        while True:
+            # ----- Posición de operando -----
+            tipo = self.tipo_actual
+            while tipo in OPERADORES_UNARIOS:
+                # El '+' unario no crea nodo: conserva el operando
+                pila.append((_UNARIO, tipo is TipoToken.MAS))
+                self._avanzar()
+                tipo = self.tipo_actual
+            if tipo == TipoToken.PARENTESIS_IZQ:
+                self._avanzar()
+                pila.append((_GRUPO,))
+                continue
+            if tipo in _PRIMARIAS:
+                asignable = tipo is TipoToken.IDENTIFICADOR
+                self._avanzar()
+            else:
+                if tipo != TipoToken.EOF:
+                    self._error(f"Expresión inesperada: '{self._actual().valor}'")
+                    self._avanzar()
+                asignable = False
+
+            # ----- Posición de operador -----
+            postfijos = True
+            operando = False
+            while not operando:
+                while postfijos:
+                    tipo = self.tipo_actual
+                    if tipo == TipoToken.INCREMENTO or tipo == TipoToken.DECREMENTO:
+                        self._avanzar()
+                        asignable = False
+                    elif tipo == TipoToken.PARENTESIS_IZQ:
+                        self._avanzar()
+                        if not self._es(TipoToken.PARENTESIS_DER) and not self._en_fin():
+                            pila.append((_LLAMADA,))
+                            operando = True
+                            break
+                        if self._es(TipoToken.PARENTESIS_DER):
+                            self._avanzar()
+                        else:
+                            self._error("Falta ')' en llamada.")
+                        asignable = False
+                    elif tipo == TipoToken.PUNTO:
+                        self._avanzar()
+                        if self._es(TipoToken.IDENTIFICADOR):
+                            self._avanzar()
+                            asignable = False
+                        else:
+                            self._error("Falta identificador después de '.'")
+                            postfijos = False
+                    elif tipo == TipoToken.CORCHETE_IZQ:
+                        self._avanzar()
+                        pila.append((_INDICE, asignable))
+                        operando = True
+                        break
+                    else:
+                        postfijos = False
+                if operando:
+                    break
+
+                while pila[-1][0] == _UNARIO:
+                    conserva = pila.pop()[1]
+                    asignable = asignable and conserva
+
+                op, prec, asociatividad = OPERADORES_BINARIOS.get(self.tipo_actual, _NO_BINARIO)
+                if op is not None:
+                    while pila[-1][0] == _BINARIO and pila[-1][1] > prec:
+                        pila.pop()
+                    pila.append((_BINARIO, prec + 1 if asociatividad == IZQUIERDA else prec))
+                    self._avanzar()
+                    operando = True
+                    break
+                if pila[-1][0] == _BINARIO:
+                    asignable = False
+                    while pila[-1][0] == _BINARIO:
+                        pila.pop()
+
+                if self._es(TipoToken.ASIGNACION):
+                    if asignable:
+                        self._avanzar()
+                        pila.append((_ASIGNACION,))
+                        operando = True
+                        break
+                    self._error("El lado izquierdo de una asignación debe ser identificador o índice de arreglo.")
+                if pila[-1][0] == _ASIGNACION:
+                    asignable = False
+                    while pila[-1][0] == _ASIGNACION:
+                        pila.pop()
+
+                marco = pila.pop()
+                if marco[0] == _RAIZ:
+                    return True
+                postfijos = True
+                if marco[0] == _GRUPO:
+                    if self._es(TipoToken.PARENTESIS_DER):
+                        self._avanzar()
+                    else:
+                        self._error("Falta ')' de agrupación.")
+                    asignable = False
+                elif marco[0] == _INDICE:
+                    if self._es(TipoToken.CORCHETE_DER):
+                        self._avanzar()
+                        asignable = True
+                    else:
+                        self._error("Falta ']' después de índice de arreglo.")
+                        asignable = marco[1]
+                        postfijos = False
+                else:  # _LLAMADA
+                    if self._es(TipoToken.COMA):
+                        self._avanzar()
+                        if not self._es(TipoToken.PARENTESIS_DER) and not self._en_fin():
+                            pila.append(marco)
+                            operando = True
+                            break
+                    if self._es(TipoToken.PARENTESIS_DER):
+                        self._avanzar()
+                    else:
+                        self._error("Falta ')' en llamada.")
+                    asignable = False
+
+    # ======= Spans e incremental =======
+    # Cada sentencia de un contenedor (Programa o Bloque con llaves) guarda
+    # en span su rango [inicio, fin) de tokens relativo a la base del
+    # contenedor: 0 en el programa, el índice del '{' en un bloque. Los
+    # bloques con llaves que son cuerpo de una sentencia de control guardan
+    # su span relativo al inicio de esa sentencia. Así una edición solo
+    # cambia el span de cada sentencia hermana posterior en los
+    # contenedores del camino, no los de sus descendientes.
+    # Por lo mismo, el token que ubica un nodo en el código (operador,
+    # identificador o palabra clave) se guarda relativo al inicio de la
+    # sentencia de contenedor que lo incluye.
+    def _abrir_sentencia(self):
+        """Marca el inicio de una sentencia de contenedor y lo retorna"""
+        self._inicio_sentencia = self.pos
+        return self.pos
+
+    @staticmethod
+    def _ubicar(nodo, token, token_condicion=None):
+        nodo.token = token
+        if token_condicion is not None:
+            nodo.token_condicion = token_condicion
+        return nodo
+
+    def _cerrar_sentencia(self, sentencias, nodo, inicio):
+        """Recupera tras la sentencia que empezó en 'inicio' y la agrega con su span"""
+        self._recuperar(inicio)
+        if nodo and not self._validando:
+            nodo.span = (inicio - self._base, self.pos - self._base)
+            origen = inicio - self._base
+            for cuerpo in _cuerpos_con_llaves(nodo):
+                cuerpo.span = (cuerpo.span[0] - origen, cuerpo.span[1] - origen)
+            sentencias.append(nodo)
+
+    def _bloque_con_span(self, sentencias, apertura):
+        bloque = Bloque(sentencias)
+        bloque.span = (apertura - self._base, self.pos - self._base)
+        return bloque
+
+    def reanalizar(self, anterior, edicion):
+        """
+        Re-analiza tras una edición reutilizando el AST de 'anterior', el
+        AnalizadorSintactico de la versión previa de los tokens. 'edicion'
+        es (primero, fin_anterior, fin_nuevo): los tokens [primero,
+        fin_anterior) del flujo previo son ahora [primero, fin_nuevo) en
+        self.tokens (ver AnalizadorLexico.edicion_tokens).
+        Solo se re-analiza la sentencia o bloque más pequeño que contiene
+        la edición y se empalma en el AST anterior, que se modifica en el
+        lugar; los subárboles no tocados se conservan por identidad. Si el
+        análisis anterior tuvo errores se hace un análisis completo.
+        """
+        primero, fin_anterior, fin_nuevo = edicion
+        delta = fin_nuevo - fin_anterior
+        if (anterior.ast is None or anterior._errores_encontrados or
+                len(self._tipos) - len(anterior._tipos) != delta):
+            return self.analizar()
+
+        # Camino de contenedores que encierran la edición: (contenedor,
+        # base, hijo del contenedor padre que lo contiene)
+        camino = [(anterior.ast, 0, None)]
+        while True:
+            contenedor, base, _ = camino[-1]
+            hijos = self._sentencias_de(contenedor)
+            i = bisect_right(hijos, primero - base, key=_inicio_span) - 1
+            if i < 0:
+                break
+            origen = base + _origen(hijos[i])
+            bloque = self._bloque_que_encierra(hijos[i], primero - origen, fin_anterior - origen)
+            if bloque is None:
+                break
+            camino.append((bloque, origen + bloque.span[0], hijos[i]))
+
+        # Del contenedor más interno hacia afuera, hasta que uno sincronice
+        # (el programa siempre lo hace al llegar a EOF)
+        try:
+            while not self._reanalizar_contenedor(*camino[-1][:2], edicion):
+                camino.pop()
+        except Exception:
+            return self.analizar()
+
+        # Corregir los spans de los contenedores exteriores: la sentencia
+        # del camino y sus hermanas posteriores
+        for nivel in range(len(camino) - 1, 0, -1):
+            contenedor, base, _ = camino[nivel - 1]
+            hijos = self._sentencias_de(contenedor)
+            for hijo in hijos[hijos.index(camino[nivel][2]):]:
+                self._desplazar(hijo, primero - base, delta)
+
+        self.ast = anterior.ast
+        return not self._errores_encontrados
+
+    def _reanalizar_contenedor(self, contenedor, base, edicion):
+        """
+        Re-analiza las sentencias de 'contenedor' afectadas por la edición
+        y las empalma. Retorna False (sin modificar nada) si la edición
+        cambió los límites del contenedor.
+        """
+        primero, fin_anterior, fin_nuevo = edicion
+        delta = fin_nuevo - fin_anterior
+        es_programa = isinstance(contenedor, Programa)
+        hijos = self._sentencias_de(contenedor)
+        # Fin anterior de la lista de sentencias, relativo a la base: el EOF
+        # del programa o el '}' del bloque
+        cierre = len(self._tipos) - 1 - delta if es_programa else contenedor.span[1] - contenedor.span[0] - 1
+
+        # Desde la sentencia que contiene el primer token editado, o desde
+        # la anterior si la edición empieza justo en su límite (p. ej. un
+        # 'else' agregado tras un if)
+        i = max(bisect_right(hijos, primero - base, key=_inicio_span) - 1, 0)
+        if i > 0 and hijos[i].span[0] >= primero - base:
+            i -= 1
+        if hijos:
+            inicio = base + hijos[i].span[0]
+        else:
+            inicio = base if es_programa else base + 1
+
+        del self.errores[:]
+        self._errores_encontrados = False
+        self._panico = False
+        self._base = base
+        self.pos = inicio
+        self.tipo_actual = self._tipos[inicio]
+
+        nuevas = []
+        while True:
+            relativa = self.pos - delta - base  # Posición equivalente en el árbol anterior
+            if self._en_fin() or (not es_programa and self._es(TipoToken.LLAVE_DER)):
+                if relativa != cierre:
+                    return False
+                j = len(hijos)
+                break
+            if relativa > cierre:
+                return False
+            if self.pos >= fin_nuevo:
+                j = bisect_left(hijos, relativa, key=_inicio_span)
+                if j < len(hijos) and hijos[j].span[0] == relativa:
+                    break
+            inicio = self._abrir_sentencia()
+            self._cerrar_sentencia(nuevas, self._una_declaracion(), inicio)
+
+        for posterior in hijos[j:]:
+            self._desplazar(posterior, primero - base, delta)
+        hijos[i:j] = nuevas
+        return True
+
+    @staticmethod
+    def _desplazar(sentencia, desde, delta):
+        """
+        Corrige el span de una sentencia por una edición en 'desde'
+        (relativa al contenedor). Si la edición cae dentro de la sentencia,
+        también los de sus cuerpos con llaves, que son relativos a ella, y
+        los tokens que quedan después de la edición.
+        """
+        inicio, fin = sentencia.span
+        if fin <= desde:
+            return
+        if inicio >= desde:
+            sentencia.span = (inicio + delta, fin + delta)
+            return
+        sentencia.span = (inicio, fin + delta)
+        desde -= _origen(sentencia)
+        for cuerpo in _cuerpos_con_llaves(sentencia):
+            inicio, fin = cuerpo.span
+            if fin > desde:
+                cuerpo.span = (inicio + delta if inicio >= desde else inicio, fin + delta)
+        if isinstance(sentencia, Bloque):
+            return
+        # Lo que sigue a un cuerpo editado (la condición de un do-while, un
+        # else sin llaves) se corre con él
+        for nodo in _nodos_sin_llaves(sentencia):
+            if nodo.token is not None and nodo.token >= desde:
+                nodo.token += delta
+            if nodo.token_condicion is not None and nodo.token_condicion >= desde:
+                nodo.token_condicion += delta
+
+    # ======= Análisis paralelo =======
+    def _cortes_nivel_superior(self, trozos):
+        """
+        Índices donde partir el programa en unos 'trozos' tramos: tras un
+        ';' fuera de llaves y paréntesis que no precede a un 'else' (ahí
+        la sentencia continúa). Incluye 0 y el índice del EOF.
+        La profundidad solo sirve para elegir buenos cortes: un corte que
+        parte una sentencia deja un tramo con errores, y desde ahí
+        analizar_paralelo sigue en secuencia.
+        """
+        tipos = self._tipos
+        ultimo = self._ultimo_indice
+        paso = max(1, ultimo // trozos)
+        cortes = [0]
+        siguiente = paso
+        # Variación de profundidad por tipo; los miembros del Enum se leen
+        # una sola vez fuera del bucle
+        profundidad = {TipoToken.LLAVE_IZQ: 1, TipoToken.LLAVE_DER: -1,
+                       TipoToken.PARENTESIS_IZQ: 1, TipoToken.PARENTESIS_DER: -1}
+        punto_coma, sino = TipoToken.PUNTO_COMA, TipoToken.ELSE
+        nivel = 0
+        for i in range(ultimo):
+            tipo = tipos[i]
+            if tipo is punto_coma:
+                if (not nivel and i + 1 >= siguiente and i + 1 < ultimo and
+                        tipos[i + 1] is not sino):
+                    cortes.append(i + 1)
+                    siguiente = i + 1 + paso
+            else:
+                nivel += profundidad.get(tipo, 0)
+        cortes.append(ultimo)
+        return cortes
+
+    def _una_declaracion(self):
+        if self._iterativo:
+            return self._ejecutar_pila(self._declaracion_pasos())
+        return self.declaracion()
+
+    @staticmethod
+    def _sentencias_de(contenedor):
+        return contenedor.declaraciones if isinstance(contenedor, Programa) else contenedor.sentencias
+
+    @staticmethod
+    def _bloque_que_encierra(sentencia, inicio, fin):
+        """
+        Bloque con llaves de 'sentencia' (o ella misma) cuyo interior
+        contiene los tokens [inicio, fin), relativos a _origen(sentencia),
+        sin tocar sus llaves, o None
+        """
+        candidatos = (sentencia,) if isinstance(sentencia, Bloque) else _cuerpos_con_llaves(sentencia)
+        for bloque in candidatos:
+            if bloque.span[0] < inicio and bloque.span[1] - 1 >= fin:
+                return bloque
+        return None
 
     # ======= Helpers =======
+    # tipo_actual es siempre el tipo del token en self.pos; la lista de
+    # tipos termina en EOF y el cursor nunca pasa de ahí.
     def _es(self, tipo):
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos].tipo == tipo
-        return False
+        return self.tipo_actual is tipo
 
     def _actual(self):
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
-        return None
+        if self._centinela is not None and self.pos == self._ultimo_indice:
+            return self._centinela
+        return self.tokens[self.pos]
+
+    def _en_fin(self):
+        """True en el token EOF"""
+        return self.tipo_actual is TipoToken.EOF
+
+    def _recuperar(self, inicio):
+        """
+        Cierre de cada declaración en los bucles de sentencias. En modo
+        pánico, si la sentencia no terminó en ';' o '}', descarta tokens
+        hasta un punto de sincronización (consumiendo el ';'). Además, si
+        ninguna regla consumió el token en 'inicio', lo descarta.
+        """
+        if self._panico:
+            self._panico = False
+            if self.pos == 0 or self._tipos[self.pos - 1] not in _FIN_SENTENCIA:
+                while self.tipo_actual not in SINCRONIZACION:
+                    self._avanzar()
+                if self.tipo_actual is TipoToken.PUNTO_COMA:
+                    self._avanzar()
+        if self.pos == inicio and self.tipo_actual is not TipoToken.EOF:
+            self._avanzar()
 
     def _avanzar(self):
-        if self.pos < len(self.tokens) - 1:
+        if self.pos < self._ultimo_indice:
             self.pos += 1
-        else:
-            self.pos = len(self.tokens)
+            self.tipo_actual = self._tipos[self.pos]
 
     def _es_tipo(self):
-        return self._es(TipoToken.INT) or self._es(TipoToken.FLOAT) or \
-               self._es(TipoToken.BOOLEAN) or self._es(TipoToken.STRING) or \
-               self._es(TipoToken.CHAR)
+        return self.tipo_actual in TIPOS_DATO
 
     def _error(self, mensaje):
+        self._errores_encontrados = True
+        if self._panico:
+            return  # Error en cascada del anterior: no se reporta
+        self._panico = True
         tok = self._actual()
         linea = tok.linea if tok else '?'
         self.errores.append(f"L{linea}: {mensaje}")
-        self._errores_encontrados = True
 
+
+def _analizar_tramo(tokens, modo):
+    """Tarea de analizar_paralelo: analiza un tramo de declaraciones en un proceso trabajador"""
+    parser = AnalizadorSintactico(tokens, modo)
+    ok = parser.analizar()
+    return (parser.ast.declaraciones if parser.ast else []), ok
@@ -31,10 +31,14 @@ class Alcance:
 
     def buscar(self, nombre):
         """Busca un símbolo en este alcance y sus padres"""
-        if nombre in self.simbolos:
-            return self.simbolos[nombre]
-        if self.padre:
-            return self.padre.buscar(nombre)
+        # Los nombres vienen internados por el léxico: la búsqueda en cada
+        # diccionario se resuelve por identidad
+        alcance = self
+        while alcance:
+            simbolo = alcance.simbolos.get(nombre)
+            if simbolo is not None:
+                return simbolo
+            alcance = alcance.padre
         return None
 
 
@@ -0,0 +1,99 @@
+"""
+Programas generados al azar (con semilla) para las pruebas que comparan
+dos caminos del compilador, y volcado de un AST con sus posiciones
+"""
+import random
+
+from ast_nodes import NodoAST
+
+# Trozos que se insertan en un programa para provocar errores
+FRAGMENTOS = ['{', '}', ';', '(', ')', ' ', '\n', 'int ', 'else ', 'if (a) ', 'x = 1;', 'while (q) {',
+              '} else {', '5', '@', '=', '[', 'return 3;', 'do ', '"sin cerrar', '/* sin cerrar']
+
+
+def expresion(azar, profundidad=0):
+    """Expresión al azar con todos los operadores, llamadas, accesos e índices"""
+    x = azar.random()
+    if profundidad > 3 or x < 0.3:
+        return azar.choice(['a', 'b', 'x', 'v1', str(azar.randint(0, 99)), '2.5', 'true', 'false',
+                            '"hola"', "'c'", 'null', '2147483647'])
+    if x < 0.55:
+        operador = azar.choice(['+', '-', '*', '/', '%', '<', '>', '<=', '>=', '==', '!=', '&&', '||'])
+        return f"{expresion(azar, profundidad + 1)} {operador} {expresion(azar, profundidad + 1)}"
+    if x < 0.65:
+        return f"({expresion(azar, profundidad + 1)})"
+    if x < 0.75:
+        return azar.choice(['-', '!', '+', '++', '--']) + expresion(azar, profundidad + 1)
+    if x < 0.8:
+        return azar.choice(['i++', 'j--'])
+    if x < 0.9:
+        argumentos = ', '.join(expresion(azar, profundidad + 1) for _ in range(azar.randint(0, 3)))
+        return f"{azar.choice(['f', 'g', 'o.m'])}({argumentos})"
+    return f"arr[{expresion(azar, profundidad + 1)}]"
+
+
+def sentencia(azar, profundidad=0, declaracion=True):
+    """
+    Sentencia al azar de cualquier clase, con anidamiento acotado; sin
+    declaraciones si es el cuerpo sin llaves de un if o un for
+    """
+    x = azar.random()
+    cuerpo = lambda: ' '.join(sentencia(azar, profundidad + 1) for _ in range(azar.randint(0, 3)))
+    if profundidad < 3:
+        if x < 0.1:
+            return f"if ({expresion(azar)}) {{ {cuerpo()} }} else {{ {cuerpo()} }}"
+        if x < 0.15:
+            return f"if ({expresion(azar)}) {sentencia(azar, profundidad + 1, False)}"
+        if x < 0.22:
+            return f"while ({expresion(azar)}) {{ {cuerpo()} }}"
+        if x < 0.27:
+            return f"do {{ {cuerpo()} }} while ({expresion(azar)});"
+        if x < 0.33:
+            return f"for (int i = 0; i < {expresion(azar)}; i++) {{ {cuerpo()} }}"
+        if x < 0.36:
+            return f"for (j = 1; ; j--) {sentencia(azar, profundidad + 1, False)}"
+        if x < 0.4:
+            return f"{{ {cuerpo()} }}"
+    if x < 0.55 and declaracion:
+        tipo = azar.choice(['int', 'float', 'boolean', 'String', 'char'])
+        return f"{tipo} v{azar.randint(0, 9)} = {expresion(azar)};"
+    if x < 0.6 and declaracion:
+        return f"int arr[{azar.randint(1, 9)}];"
+    if x < 0.65:
+        return f"arr[{expresion(azar)}] = {expresion(azar)};"
+    if x < 0.68:
+        return f"return {expresion(azar)};"
+    if x < 0.85:
+        return f"{azar.choice(['a', 'b', 'x', 'v1'])} = {expresion(azar)};"
+    return f"{expresion(azar)};"
+
+
+def programa(azar, sentencias=25):
+    """Programa al azar de hasta 'sentencias' sentencias de nivel superior, una por línea"""
+    return '\n'.join(sentencia(azar) for _ in range(azar.randint(1, sentencias))) + '\n'
+
+
+def programas_generados(cantidad, semilla=1, errores=0.3):
+    """
+    'cantidad' programas al azar; una fracción 'errores' de ellos lleva
+    fragmentos insertados en lugares al azar, con errores léxicos o
+    sintácticos
+    """
+    azar = random.Random(semilla)
+    for _ in range(cantidad):
+        codigo = programa(azar)
+        if azar.random() < errores:
+            for _ in range(azar.randint(1, 3)):
+                i = azar.randint(0, len(codigo))
+                codigo = codigo[:i] + azar.choice(FRAGMENTOS) + codigo[i + azar.randint(0, 2):]
+        yield codigo
+
+
+def volcar(nodo):
+    """Estructura del AST como tuplas, con los campos y las posiciones de cada nodo"""
+    if isinstance(nodo, list):
+        return [volcar(x) for x in nodo]
+    if not isinstance(nodo, NodoAST):
+        return repr(nodo)  # Distingue 1, 1.0 y True
+    return (type(nodo).__name__, [(campo, volcar(valor)) for campo, valor in nodo.campos()],
+            nodo.token, nodo.span, nodo.token_condicion)
@@ -0,0 +1,16 @@
+"""Salidas esperadas de los ejemplos de main.EJEMPLOS, guardadas en tests/esperado"""
+import os
+
+ESPERADO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'esperado')
+
+
+def salidas_esperadas(archivo):
+    """Salida esperada de cada ejemplo: nombre -> líneas, desde las secciones '### nombre'"""
+    salidas = {}
+    with open(os.path.join(ESPERADO, archivo), encoding='utf-8') as entrada:
+        for linea in entrada.read().splitlines():
+            if linea.startswith('### '):
+                lineas = salidas[linea[4:]] = []
+            else:
+                lineas.append(linea)
+    return salidas
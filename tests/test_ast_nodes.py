@@ -0,0 +1,102 @@
+import io
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ast_nodes import (ExpresionAgrupada, ExpresionBinaria, FabricaNodos, Identificador, Literal,
+                       escribir_ast, imprimir_ast, lineas_ast)
+from lexico import AnalizadorLexico
+from main import EJEMPLOS
+from sintactico import AnalizadorSintactico
+from salidas import salidas_esperadas
+
+
+class TestImprimirAST(unittest.TestCase):
+
+    def test_ejemplos_como_antes(self):
+        """imprimir_ast da, en los ejemplos, la salida del impresor recursivo con isinstance"""
+        esperado = salidas_esperadas('ejemplos_ast.txt')
+        for nombre, codigo in EJEMPLOS.items():
+            sintactico = AnalizadorSintactico(AnalizadorLexico().analizar(codigo))
+            sintactico.analizar()
+            if sintactico.ast is None:
+                continue
+            with self.subTest(nombre):
+                self.assertEqual(imprimir_ast(sintactico.ast).splitlines(), esperado[nombre])
+                salida = io.StringIO()
+                escribir_ast(sintactico.ast, salida, 1, "└─ ")
+                self.assertEqual(salida.getvalue(), imprimir_ast(sintactico.ast, 1, "└─ "))
+
+    def test_arbol_profundo(self):
+        """Un árbol mucho más profundo que el límite de recursión se imprime completo"""
+        profundidad = 50000
+        self.assertGreater(profundidad, sys.getrecursionlimit())
+        nodo = Literal(1, 'int')
+        for _ in range(profundidad):
+            nodo = ExpresionAgrupada(nodo)
+        cantidad = 0
+        # Línea por línea: la salida completa ocupa unos 2.5 GB de sangría
+        for nivel, linea in enumerate(lineas_ast(nodo)):
+            prefijo = "  " * nivel + ("└─ " if nivel else "")
+            clase = "Literal (int: 1)" if nivel == profundidad else "ExpresionAgrupada"
+            self.assertEqual(linea, prefijo + clase)
+            cantidad += 1
+        self.assertEqual(cantidad, profundidad + 1)
+
+
+# Hashes de las expresiones de un ejemplo, analizado con una FabricaNodos
+HASHES_DE_EJEMPLO = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from ast_nodes import Expresion, FabricaNodos, NodoAST
+from lexico import AnalizadorLexico
+from main import EJEMPLOS
+from sintactico import AnalizadorSintactico
+sintactico = AnalizadorSintactico(AnalizadorLexico().analizar(EJEMPLOS[sys.argv[2]]), fabrica=FabricaNodos())
+sintactico.analizar()
+pendientes = [sintactico.ast]
+while pendientes:
+    nodo = pendientes.pop()
+    if isinstance(nodo, list):
+        pendientes.extend(nodo)
+    elif isinstance(nodo, NodoAST):
+        if isinstance(nodo, Expresion):
+            print(nodo.hash_estructural)
+        pendientes.extend(valor for _, valor in nodo.campos())
+"""
+
+
+class TestHashEstructural(unittest.TestCase):
+
+    def test_igual_entre_procesos(self):
+        """El hash no depende de PYTHONHASHSEED: vale lo mismo en cualquier proceso"""
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        nombre = next(nombre for nombre in EJEMPLOS if 'BubbleSort' in nombre)
+        salidas = []
+        for semilla in ('1', '2'):
+            entorno = dict(os.environ, PYTHONHASHSEED=semilla)
+            salidas.append(subprocess.run([sys.executable, '-c', HASHES_DE_EJEMPLO, raiz, nombre], env=entorno,
+                                          capture_output=True, text=True, check=True).stdout)
+        self.assertTrue(salidas[0])
+        self.assertEqual(salidas[0], salidas[1])
+
+    def test_hijos_sin_fabrica(self):
+        """Los hijos construidos sin la fábrica cuentan por su estructura"""
+        fabrica = FabricaNodos()
+        crear = fabrica.crear
+        de_fabrica = crear(ExpresionBinaria, crear(Identificador, 'a'), '+', crear(Literal, 1, 'int'))
+        a_mano = crear(ExpresionBinaria, Identificador('a'), '+', Literal(1, 'int'))
+        self.assertEqual(a_mano.hash_estructural, de_fabrica.hash_estructural)
+        distintos = [crear(ExpresionBinaria, Identificador('b'), '+', Literal(1, 'int')),
+                     crear(ExpresionBinaria, Identificador('a'), '+', Literal(1.0, 'int')),
+                     crear(ExpresionBinaria, Identificador('a'), '-', Literal(1, 'int')),
+                     crear(ExpresionBinaria, Literal(1, 'int'), '+', Identificador('a'))]
+        hashes = {expr.hash_estructural for expr in distintos + [de_fabrica]}
+        self.assertEqual(len(hashes), len(distintos) + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ast_nodes import ExpresionBinaria, Literal
+from ast_plano import ASTPlano
+from generador_codigo import GeneradorCodigoIntermedio
+from lexico import AnalizadorLexico
+from main import EJEMPLOS
+from sintactico import AnalizadorSintactico
+from programas import programas_generados, volcar
+
+
+def arboles():
+    """AST de los ejemplos y de programas generados (con y sin errores), en ambos modos"""
+    fuentes = list(EJEMPLOS.values()) + list(programas_generados(300))
+    for codigo in fuentes:
+        tokens = AnalizadorLexico().analizar(codigo)
+        for modo in AnalizadorSintactico.MODOS:
+            sintactico = AnalizadorSintactico(tokens, modo)
+            sintactico.analizar()
+            if sintactico.ast is not None:
+                yield codigo, sintactico.ast
+
+
+def plegado(expresion):
+    """Inicializador de 'int x = expresion;' tras plegar las constantes del AST plano"""
+    sintactico = AnalizadorSintactico(AnalizadorLexico().analizar(f"int x = {expresion};"))
+    sintactico.analizar()
+    plano = ASTPlano.desde_arbol(sintactico.ast)
+    plano.plegar_constantes()
+    return plano.a_arbol().declaraciones[0].inicializador
+
+
+class TestConversion(unittest.TestCase):
+
+    def test_ida_y_vuelta(self):
+        """a_arbol(desde_arbol(ast)) reconstruye la estructura, los valores y las posiciones"""
+        for codigo, ast in arboles():
+            plano = ASTPlano.desde_arbol(ast)
+            self.assertEqual(volcar(plano.a_arbol()), volcar(ast), codigo)
+            self.assertEqual(list(plano.preorden()), list(range(len(plano))))
+
+    def test_codigo_intermedio(self):
+        """El TAC generado desde el AST plano es el mismo que desde el árbol"""
+        for codigo, ast in arboles():
+            self.assertEqual(GeneradorCodigoIntermedio(ASTPlano.desde_arbol(ast)).generar(),
+                             GeneradorCodigoIntermedio(ast).generar(), codigo)
+
+
+class TestPlegarConstantes(unittest.TestCase):
+
+    def assertPlegado(self, expresion, valor, tipo):
+        literal = plegado(expresion)
+        self.assertIsInstance(literal, Literal, expresion)
+        self.assertEqual((repr(literal.valor), literal.tipo), (repr(valor), tipo), expresion)
+
+    def test_int_de_32_bits(self):
+        self.assertPlegado('2147483647 + 1', -2147483648, 'int')
+        self.assertPlegado('0 - 2147483647 - 2', 2147483647, 'int')
+        self.assertPlegado('65536 * 65536', 0, 'int')
+        self.assertPlegado('-(0 - 2147483647 - 1)', -2147483648, 'int')
+
+    def test_division_truncada(self):
+        self.assertPlegado('-7 / 2', -3, 'int')
+        self.assertPlegado('7 / -2', -3, 'int')
+        self.assertPlegado('-7 / -2', 3, 'int')
+        self.assertPlegado('-7 % 2', -1, 'int')
+        self.assertPlegado('7 % -2', 1, 'int')
+        self.assertPlegado('-7.5 % 2', -1.5, 'float')
+
+    def test_division_por_cero_no_se_pliega(self):
+        for expresion in ('1 / 0', '1 % 0', '1.5 / 0', '1 / (2 - 2)'):
+            with self.subTest(expresion):
+                self.assertIsInstance(plegado(expresion), ExpresionBinaria)
+
+    def test_int_con_float(self):
+        self.assertPlegado('1 + 2.5', 3.5, 'float')
+        self.assertPlegado('7 / 2.0', 3.5, 'float')
+        self.assertPlegado('2 * 1.5', 3.0, 'float')
+        self.assertPlegado('1 < 2.5', True, 'boolean')
+        self.assertPlegado('(3) == 3.0', True, 'boolean')
+
+    def test_sin_plegar(self):
+        """Los operandos que no son literales numéricos (o de int) se dejan como están"""
+        for expresion in ('x + 1', '"a" + 1', '2147483648 + 1', 'true + 1'):
+            with self.subTest(expresion):
+                self.assertIsInstance(plegado(expresion), ExpresionBinaria)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_tokens import CacheTokens
+from lexico import AnalizadorLexico, _tokenizar_archivo
+from main import EJEMPLOS
+
+# Comentarios, errores léxicos, fines de línea CRLF y texto no ASCII
+ENTRADAS = list(EJEMPLOS.values()) + [
+    '',
+    '// solo un comentario',
+    'int x = 1; // fin\r\n/* bloque\r\n */ x = x @ 2;\r\n',
+    'String s = "sin cerrar\nchar c = \'ab\';\n# $ int y;',
+    'String ñandú = "año"; /* ½ */ int z = 3.14.15;\n/* sin cerrar',
+]
+
+
+def canal(flujo):
+    return (list(flujo.tipos), list(flujo.inicios), list(flujo.fines), list(flujo.lineas),
+            list(flujo.columnas), list(flujo.ids), flujo.errores)
+
+
+def contenido(flujo):
+    """Todo lo que guarda la caché de un TokenStream"""
+    return (canal(flujo), canal(flujo.comentarios), list(flujo.anclas), list(flujo.identificadores.nombres))
+
+
+class TestCacheTokens(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.cache = CacheTokens(self.directorio.name)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_ida_y_vuelta(self):
+        """Un acierto da los mismos tokens, comentarios y errores que analizar_compacto"""
+        for codigo in ENTRADAS:
+            with self.subTest(codigo[:40]):
+                esperado = AnalizadorLexico()
+                flujo = esperado.analizar_compacto(codigo)
+                self.cache.analizar(codigo)
+                lexico = AnalizadorLexico()
+                aciertos = self.cache.aciertos
+                cargado = self.cache.analizar(codigo, lexico)
+                self.assertEqual(self.cache.aciertos, aciertos + 1)
+                self.assertEqual(contenido(cargado), contenido(flujo))
+                self.assertEqual(cargado.codigo, codigo)
+                self.assertEqual(lexico.errores, esperado.errores)
+                self.assertEqual([(t.tipo, t.valor) for t in cargado], [(t.tipo, t.valor) for t in flujo])
+
+    def test_entrada_corrupta(self):
+        codigo = 'int x = 1;'
+        self.cache.analizar(codigo)
+        with open(self.cache._ruta(self.cache.clave(codigo)), 'r+b') as archivo:
+            archivo.truncate(20)
+        self.assertEqual(contenido(self.cache.analizar(codigo)),
+                         contenido(AnalizadorLexico().analizar_compacto(codigo)))
+        self.assertEqual(self.cache.aciertos, 0)
+
+    def test_escritura_fallida(self):
+        """Si la escritura falla no queda el temporal en el directorio"""
+        with mock.patch.object(CacheTokens, '_serializar', side_effect=OSError('disco lleno')):
+            self.cache.analizar('int x = 1;')
+        self.assertEqual(os.listdir(self.directorio.name), [])
+
+    def test_archivo_crlf(self):
+        """Con caché, un archivo se lee sin traducir los fines de línea, como analizar_archivo"""
+        for codigo in ('int x = 1;\r\nx = x + 2;\r\n', 'String s = "ñ";\r\n\r\nint y = 2;\r\n'):
+            ruta = os.path.join(self.directorio.name, 'fuente.java')
+            with open(ruta, 'wb') as archivo:
+                archivo.write(codigo.encode('utf-8'))
+            esperado = AnalizadorLexico().analizar_archivo(ruta)
+            for _ in range(2):  # Fallo y acierto
+                flujo, errores = _tokenizar_archivo(ruta, self.cache)
+                self.assertEqual(canal(flujo), canal(esperado))
+                self.assertEqual(errores, esperado.mensajes_error())
+                self.assertEqual(flujo.codigo, codigo)
+
+
+if __name__ == '__main__':
+    unittest.main()
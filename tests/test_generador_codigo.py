@@ -0,0 +1,45 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ast_plano import ASTPlano
+from generador_codigo import GeneradorCodigoIntermedio
+from lexico import AnalizadorLexico
+from main import EJEMPLOS
+from sintactico import AnalizadorSintactico
+from salidas import salidas_esperadas
+
+
+def ast_de(codigo):
+    sintactico = AnalizadorSintactico(AnalizadorLexico().analizar(codigo))
+    sintactico.analizar()
+    return sintactico.ast
+
+
+class TestCodigoIntermedio(unittest.TestCase):
+
+    def test_ejemplos_como_antes(self):
+        """El TAC de los ejemplos es el que daban las cadenas de isinstance"""
+        esperado = salidas_esperadas('ejemplos_tac.txt')
+        for nombre, codigo in EJEMPLOS.items():
+            ast = ast_de(codigo)
+            if ast is None:
+                continue
+            with self.subTest(nombre):
+                self.assertEqual(GeneradorCodigoIntermedio(ast).generar(), esperado[nombre])
+
+    def test_ast_plano(self):
+        """El recorrido del AST plano emite el mismo TAC que los visitantes"""
+        for nombre, codigo in EJEMPLOS.items():
+            ast = ast_de(codigo)
+            if ast is None:
+                continue
+            with self.subTest(nombre):
+                self.assertEqual(GeneradorCodigoIntermedio(ASTPlano.desde_arbol(ast)).generar(),
+                                 GeneradorCodigoIntermedio(ast).generar())
+
+
+if __name__ == '__main__':
+    unittest.main()
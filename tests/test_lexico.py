@@ -0,0 +1,199 @@
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexico import AnalizadorLexico, TipoToken, calcular_edicion
+from main import EJEMPLOS
+
+# Fragmentos con que se generan las entradas: incluyen comentarios y
+# cadenas sin cerrar, escapes, saltos de línea y caracteres no ASCII
+ALFABETO = list(' \t\n\r/*"\'\\abcxyz019._+-=<>!&|%(){}[];,ñé²١½\x0b@#') + [
+    'int', 'while', 'String', '//', '/*', '*/', '++', '&&', '3.14', '\n    ']
+
+
+def analizar(modo, codigo):
+    """Tokens como (tipo, valor, línea, columna) y errores del modo dado"""
+    lexico = AnalizadorLexico(modo)
+    tokens = [(t.tipo, t.valor, t.linea, t.columna) for t in lexico.analizar(codigo)]
+    return tokens, lexico.errores
+
+
+def entradas_generadas(cantidad=3000, semilla=1):
+    azar = random.Random(semilla)
+    for _ in range(cantidad):
+        yield ''.join(azar.choice(ALFABETO) for _ in range(azar.randint(0, 40)))
+
+
+class TestParidadModos(unittest.TestCase):
+    """El modo 'regex' (por defecto) debe dar lo mismo que el modo 'caracter'"""
+
+    def comparar(self, codigo):
+        self.assertEqual(analizar('regex', codigo), analizar('caracter', codigo), repr(codigo))
+
+    def test_ejemplos(self):
+        for nombre, codigo in EJEMPLOS.items():
+            with self.subTest(nombre):
+                self.comparar(codigo)
+
+    def test_entradas_generadas(self):
+        for codigo in entradas_generadas():
+            self.comparar(codigo)
+
+    def test_modo_por_defecto(self):
+        self.assertEqual(AnalizadorLexico().modo, 'regex')
+
+
+def tokens_de(tokens):
+    return [(t.tipo, t.valor, t.linea, t.columna) for t in tokens]
+
+
+class TestIterTokens(unittest.TestCase):
+    """iter_tokens sobre un archivo leído por fragmentos da lo mismo que analizar"""
+
+    # Lexemas que quedan partidos entre fragmentos de 1, 2, 3 y 7 caracteres
+    LARGOS = ['int contador = 123456789 + 3.14159;', 'if (a <= b && c != d || !e) x++;',
+              'String s = "cadena \\" con escape"; char c = \'\\n\';',
+              '/* comentario\n de bloque */ // de línea\r\nint y;',
+              'int ñandú = 1; float π = 2.5; String t = "año";', 'x = "sin cerrar\ny = 1;', 'z = 1; /* sin cerrar']
+
+    def comparar(self, codigo, tamanio):
+        referencia = AnalizadorLexico()
+        esperado = tokens_de(referencia.analizar(codigo))
+        lexico = AnalizadorLexico()
+        self.assertEqual(tokens_de(lexico.iter_tokens(io.StringIO(codigo, newline=''), tamanio)), esperado,
+                         repr(codigo))
+        self.assertEqual(lexico.errores, referencia.errores, repr(codigo))
+
+    def test_fragmentos_pequenios(self):
+        for tamanio in (1, 2, 3, 7):
+            for codigo in self.LARGOS + list(EJEMPLOS.values()):
+                with self.subTest(codigo[:30], tamanio=tamanio):
+                    self.comparar(codigo, tamanio)
+
+    def test_entradas_generadas(self):
+        for n, codigo in enumerate(entradas_generadas(1000)):
+            self.comparar(codigo, (1, 2, 3, 7)[n % 4])
+
+    def test_cadena(self):
+        for codigo in self.LARGOS:
+            self.assertEqual(tokens_de(AnalizadorLexico().iter_tokens(codigo)),
+                             tokens_de(AnalizadorLexico().analizar(codigo)))
+
+
+class TestCanalComentarios(unittest.TestCase):
+    """En un TokenStream los comentarios van aparte, anclados al token que les sigue"""
+
+    def test_intercalados_como_en_analizar(self):
+        """comentarios_antes(i) + [token i], en orden, reproduce la lista de analizar()"""
+        entradas = list(EJEMPLOS.values()) + list(entradas_generadas(1000)) + [
+            '// a\n/* b */ /* c */ int x; // d', '/* sin cerrar', 'x; // al final']
+        for codigo in entradas:
+            flujo = AnalizadorLexico().analizar_compacto(codigo)
+            self.assertNotIn(TipoToken.COMENTARIO, [t.tipo for t in flujo])
+            self.assertEqual(len(flujo.anclas), len(flujo.comentarios))
+            self.assertEqual(list(flujo.anclas), sorted(flujo.anclas))
+            intercalados = []
+            for i in range(len(flujo)):
+                intercalados += flujo.comentarios_antes(i) + [flujo[i]]
+            self.assertEqual(tokens_de(intercalados), tokens_de(AnalizadorLexico().analizar(codigo)), repr(codigo))
+
+    def test_anclas(self):
+        codigo = 'int x = 1; // uno\n/* dos */ /* tres */ y = 2; // cuatro'
+        flujo = AnalizadorLexico().analizar_compacto(codigo)
+        valores = lambda tokens: [t.valor for t in tokens]
+        self.assertEqual(valores(flujo), ['int', 'x', '=', '1', ';', 'y', '=', '2', ';', ''])
+        # Los comentarios tras el último token se anclan al EOF
+        self.assertEqual(list(flujo.anclas), [5, 5, 5, 9])
+        self.assertEqual(valores(flujo.comentarios_antes(5)), ['// uno', ' dos */', ' tres */'])
+        self.assertEqual(valores(flujo.comentarios_antes(9)), ['// cuatro'])
+        self.assertEqual(flujo.comentarios_antes(0), [])
+        self.assertEqual(flujo.comentarios_antes(6), [])
+        self.assertEqual(valores(flujo.comentarios_en(0, codigo.index('/* tres'))), ['// uno', ' dos */'])
+
+    def test_errores_de_comentarios(self):
+        """Un comentario sin cerrar se informa en su posición, entre los errores de los tokens"""
+        codigo = 'int @ x;\n/* sin cerrar'
+        referencia = AnalizadorLexico()
+        referencia.analizar(codigo)
+        lexico = AnalizadorLexico()
+        flujo = lexico.analizar_compacto(codigo)
+        self.assertEqual(len(lexico.errores), 2)
+        self.assertEqual(lexico.errores, referencia.errores)
+        self.assertEqual(flujo.mensajes_error(), referencia.errores)
+
+
+class TestAnalizarArchivo(unittest.TestCase):
+    """analizar_archivo (mapeado en memoria) da el mismo flujo que analizar_compacto del texto"""
+
+    def comparar(self, codigo):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'fuente.java')
+            with open(ruta, 'wb') as archivo:
+                archivo.write(codigo.encode('utf-8'))
+            lexico = AnalizadorLexico()
+            flujo = lexico.analizar_archivo(ruta)
+            referencia = AnalizadorLexico()
+            esperado = referencia.analizar_compacto(codigo)
+            for canal, canal_esperado in ((flujo, esperado), (flujo.comentarios, esperado.comentarios)):
+                self.assertEqual(tokens_de(canal), tokens_de(canal_esperado), repr(codigo))
+                self.assertEqual((canal.inicios, canal.fines, canal.ids),
+                                 (canal_esperado.inicios, canal_esperado.fines, canal_esperado.ids))
+            self.assertEqual(flujo.anclas, esperado.anclas)
+            self.assertEqual(flujo.identificadores.nombres, esperado.identificadores.nombres)
+            self.assertEqual(lexico.errores, referencia.errores)
+            del lexico, flujo, canal  # Liberar el mapa antes de borrar el archivo
+
+    def test_ascii(self):
+        for codigo in list(EJEMPLOS.values()) + ['', 'int x = 1;\r\n/* a */ x = x @ 2; // b\r\n',
+                                                  'String s = "sin cerrar\nint y;', '/* sin cerrar']:
+            with self.subTest(codigo[:30]):
+                self.assertTrue(codigo.isascii())
+                self.comparar(codigo)
+
+    def test_no_ascii(self):
+        for codigo in ['String ñandú = "año"; // ½\r\nint π = 3;', 'int x = 1; /* é */', 'x = "²" + \'١\';']:
+            with self.subTest(codigo):
+                self.comparar(codigo)
+
+    def test_entradas_generadas(self):
+        for codigo in entradas_generadas(300):
+            self.comparar(codigo)
+
+
+class TestReanalizar(unittest.TestCase):
+
+    def comparar(self, lexico, flujo, codigo, nuevo):
+        """reanalizar debe dar lo mismo que analizar el código nuevo desde cero"""
+        resultado = lexico.reanalizar(flujo, *calcular_edicion(codigo, nuevo))
+        referencia = AnalizadorLexico()
+        esperado = referencia.analizar_compacto(nuevo)
+        self.assertEqual([(t.tipo, t.valor, t.linea, t.columna) for t in resultado],
+                         [(t.tipo, t.valor, t.linea, t.columna) for t in esperado])
+        self.assertEqual(lexico.errores, referencia.errores)
+
+    def test_no_ascii_en_la_misma_instancia(self):
+        # Tras analizar_compacto, self.tokens es un TokenStream: el
+        # reconocedor carácter a carácter (no ASCII) no debe usarlo
+        codigo = 'int x = 1;\nint y = 2;\n'
+        for insertado in ('ñ', '¤', 'año2'):
+            with self.subTest(insertado):
+                lexico = AnalizadorLexico()
+                flujo = lexico.analizar_compacto(codigo)
+                self.comparar(lexico, flujo, codigo, codigo[:8] + insertado + codigo[17:])
+
+    def test_ediciones_encadenadas(self):
+        lexico = AnalizadorLexico()
+        codigo = 'int x = 1;\nint y = 2;\n'
+        flujo = lexico.analizar_compacto(codigo)
+        for nuevo in ('int x = ñ;\nint y = 2;\n', 'int x = ñ;\nint y = "é\n', 'int x = 1;\nint y = 2;\n'):
+            self.comparar(lexico, flujo, codigo, nuevo)
+            codigo, flujo = nuevo, lexico.tokens
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador_codigo import GeneradorCodigoIntermedio
+from lexico import AnalizadorLexico
+from main import EJEMPLOS
+from semantico import AnalizadorSemantico
+from sintactico import AnalizadorSintactico
+from salidas import salidas_esperadas
+
+
+def semantico(codigo):
+    """AnalizadorSemantico ya ejecutado sobre el AST del sintáctico, como en main"""
+    tokens = AnalizadorLexico().analizar_compacto(codigo)
+    sintactico = AnalizadorSintactico(tokens)
+    sintactico.analizar()
+    analizador = AnalizadorSemantico(tokens, sintactico.ast)
+    analizador.analizar()
+    return analizador
+
+
+class TestEjemplos(unittest.TestCase):
+
+    def test_errores_y_ciclos_anidados(self):
+        """
+        Errores y reporte de ciclos anidados de los ejemplos; son los del
+        analizador que re-analizaba los tokens, salvo en '❌ FOR - Sin
+        llaves en IF' (ver TestDiferencias.test_recuperacion_del_sintactico)
+        """
+        esperado = salidas_esperadas('ejemplos_semantico.txt')
+        for nombre, codigo in EJEMPLOS.items():
+            with self.subTest(nombre):
+                analizador = semantico(codigo)
+                salida = analizador.tabla_simbolos.errores + analizador.obtener_reporte_ciclos_anidados().splitlines()
+                self.assertEqual(salida, esperado[nombre])
+
+    def test_sin_ast(self):
+        """Sin el AST, el analizador analiza los tokens él mismo y da lo mismo"""
+        for nombre, codigo in EJEMPLOS.items():
+            with self.subTest(nombre):
+                analizador = AnalizadorSemantico(AnalizadorLexico().analizar(codigo))
+                analizador.analizar()
+                self.assertEqual(analizador.tabla_simbolos.errores, semantico(codigo).tabla_simbolos.errores)
+
+
+class TestDiferencias(unittest.TestCase):
+    """Lo que cambió respecto del analizador que re-analizaba los tokens: ahora sigue al sintáctico"""
+
+    def assertErrores(self, codigo, *errores):
+        self.assertEqual(semantico(codigo).tabla_simbolos.errores,
+                         [f"Error semántico en línea 1: {error}" for error in errores])
+
+    def test_postfijo_antes_que_prefijo(self):
+        # Antes (!i)--: además del error de '!', '--' sobre un boolean
+        self.assertErrores('int i = 0; boolean b = !i--;', "Operador '!' requiere operando booleano")
+        self.assertErrores('boolean t = true; int x = -t++;',
+                           'Operador requiere operando numérico', 'Operador requiere operando numérico')
+
+    def test_mas_unario(self):
+        # El sintáctico descarta el '+' unario; antes se exigía un operando numérico
+        self.assertErrores('String s = +"a" + 1;')
+        self.assertErrores('boolean b = +true;')
+
+    def test_indices_una_vez(self):
+        # Antes el índice de una lectura a[i] se analizaba dos veces
+        self.assertErrores('int a[3]; int x = a[z];', "Variable 'z' no declarada")
+        self.assertErrores('int a[3]; int x = a[a[z]];', "Variable 'z' no declarada")
+        self.assertErrores('int a[3]; a[0] = a[z + y] + 1;', "Variable 'z' no declarada", "Variable 'y' no declarada")
+
+    def test_recuperacion_del_sintactico(self):
+        # La sentencia rota 'int cout = x;' (sin llaves, cuerpo de un if) no
+        # llega al AST; antes se analizaba igual y daba "'cout' no declarada"
+        analizador = semantico(EJEMPLOS['❌ FOR - Sin llaves en IF'])
+        self.assertEqual(analizador.tabla_simbolos.errores, [])
+
+    def test_ast_del_sintactico(self):
+        """Cambios en el AST que comparten el semántico y el generador de código"""
+        analizador = semantico('int a[10]; int r = o.m(1) + System.out.println(2);')
+        self.assertEqual(analizador.ast.declaraciones[0].tipo, 'int[]')  # Antes 'int', como 'int a = 10'
+        # Antes 'call <anon>' en las dos llamadas
+        self.assertEqual(GeneradorCodigoIntermedio(analizador.ast).generar(),
+                         ['a = 10', 'param 1', 't0 = call o.m', 'param 2', 't1 = call System.out.println',
+                          't2 = t0 + t1', 'r = t2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
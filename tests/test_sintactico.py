@@ -0,0 +1,291 @@
+import os
+import random
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ast_nodes import Expresion, FabricaNodos, NodoAST, imprimir_ast
+from lexico import AnalizadorLexico, calcular_edicion
+from main import EJEMPLOS
+from sintactico import AnalizadorSintactico
+from programas import FRAGMENTOS, programas_generados, sentencia, volcar
+
+# Piezas de las sopas de tokens: secuencias al azar, casi siempre erróneas
+PIEZAS = ['int', 'float', 'x', 'y', 'f', '1', '2.5', '"s"', "'c'", '(', '(', ')', ')', '{', '{', '}', '}',
+          '[', ']', ';', ';', ',', '=', '=', '+', '-', '*', '/', '%', '==', '<', '&&', '||', '!', '++', '--',
+          '.', 'if', 'else', 'while', 'do', 'for', 'return', 'true', 'null', '@', 'void']
+
+
+def sopas_de_tokens(cantidad, semilla=1):
+    azar = random.Random(semilla)
+    for _ in range(cantidad):
+        yield ' '.join(azar.choice(PIEZAS) for _ in range(azar.randint(0, 30)))
+
+
+def nodos(raiz):
+    """Todos los nodos del árbol, sin recursión"""
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        if isinstance(nodo, list):
+            pendientes.extend(nodo)
+        elif isinstance(nodo, NodoAST):
+            yield nodo
+            pendientes.extend(valor for _, valor in nodo.campos())
+
+
+class TestValidar(unittest.TestCase):
+    """validar() debe dar el mismo veredicto y los mismos errores que analizar()"""
+
+    def comparar(self, tokens, modo):
+        completo = AnalizadorSintactico(tokens, modo)
+        veredicto = completo.analizar()
+        validador = AnalizadorSintactico(tokens, modo)
+        self.assertEqual(validador.validar(), veredicto)
+        self.assertEqual(validador.errores, completo.errores)
+        self.assertIsNone(validador.ast)
+
+    def test_ejemplos(self):
+        for nombre, codigo in EJEMPLOS.items():
+            for modo in AnalizadorSintactico.MODOS:
+                with self.subTest(nombre, modo=modo):
+                    self.comparar(AnalizadorLexico().analizar(codigo), modo)
+                    self.comparar(AnalizadorLexico().analizar_compacto(codigo), modo)
+
+
+# Expresiones que la fábrica no comparte (en la salida de imprimir_ast)
+CON_EFECTOS = re.compile(r'Asignacion|ExpresionLlamada|ExpresionUnaria \((\+\+|--)')
+
+
+class TestRecuperacion(unittest.TestCase):
+    """Modo pánico: un error por sentencia rota, sin cascadas, y el análisis sigue"""
+
+    # Código -> (errores, clases de las sentencias de nivel superior del AST)
+    CASOS = {
+        "int x = 1 2 3 4;\nint y = 2;\n": (
+            ['L1: Falta punto y coma en declaración.'],
+            ['DeclaracionVariable']),
+        "int a = ;\nint b = * 2;\nc = 3 3;\nint d = 4;\n": (
+            ["L1: Expresión inesperada: ';'", "L2: Expresión inesperada: '*'",
+             "L3: Falta punto y coma ';' en sentencia."],
+            ['SentenciaExpresion', 'DeclaracionVariable']),
+        "int x = ;\nint y = 2\nint z = 3;\n": (
+            ["L1: Expresión inesperada: ';'", 'L3: Falta punto y coma en declaración.'],
+            ['DeclaracionVariable']),
+        "x = 1 + * 2 ) ) );\nwhile (a) { b = 1 c d e; }\nint k = 0;\n": (
+            ["L1: Expresión inesperada: '*'", "L2: Falta punto y coma ';' en sentencia."],
+            ['SentenciaExpresion', 'SentenciaWhile', 'DeclaracionVariable']),
+        "while (a) { x = 1 2; y = ) ; }\nz = 1;\n": (
+            ["L1: Falta punto y coma ';' en sentencia.", "L1: Expresión inesperada: ')'"],
+            ['SentenciaWhile', 'SentenciaExpresion']),
+        "{ int x = 1 }\nint y = 2;\n}\nint z = 3;\n": (
+            ['L1: Falta punto y coma en declaración.', "L3: Expresión inesperada: '}'"],
+            ['Bloque', 'DeclaracionVariable', 'SentenciaExpresion', 'DeclaracionVariable']),
+        "do { x = 1; } while (x < 5)\nint y = 2;\nreturn 1 1;\n": (
+            ["L2: Falta punto y coma ';' después de do-while.", "L3: Falta punto y coma ';' en return."],
+            ['SentenciaDoWhile', 'DeclaracionVariable', 'SentenciaReturn']),
+    }
+
+    def test_listas_de_errores(self):
+        for codigo, (errores, sentencias) in self.CASOS.items():
+            for modo in AnalizadorSintactico.MODOS:
+                with self.subTest(codigo, modo=modo):
+                    sintactico = AnalizadorSintactico(AnalizadorLexico().analizar(codigo), modo)
+                    self.assertFalse(sintactico.analizar())
+                    self.assertEqual(sintactico.errores, errores)
+                    self.assertEqual([type(d).__name__ for d in sintactico.ast.declaraciones], sentencias)
+
+
+class TestModoIterativo(unittest.TestCase):
+    """El modo iterativo da el mismo AST, errores y posición final que el recursivo"""
+
+    def comparar(self, codigo):
+        tokens = AnalizadorLexico().analizar(codigo)
+        recursivo = AnalizadorSintactico(tokens, 'recursivo')
+        iterativo = AnalizadorSintactico(tokens, 'iterativo')
+        self.assertEqual(iterativo.analizar(), recursivo.analizar(), codigo)
+        self.assertEqual(iterativo.errores, recursivo.errores, codigo)
+        self.assertEqual(iterativo.pos, recursivo.pos, codigo)
+        self.assertEqual(volcar(iterativo.ast), volcar(recursivo.ast), codigo)
+
+    def test_ejemplos(self):
+        for nombre, codigo in EJEMPLOS.items():
+            with self.subTest(nombre):
+                self.comparar(codigo)
+
+    def test_programas_generados(self):
+        for codigo in programas_generados(400):
+            self.comparar(codigo)
+
+    def test_sopas_de_tokens(self):
+        for codigo in sopas_de_tokens(3000):
+            self.comparar(codigo)
+
+    def test_anidamiento_profundo(self):
+        """Anidamientos mucho más profundos que el límite de recursión"""
+        n = 20000
+        casos = {
+            'x = ' + '(' * n + '1' + ')' * n + ';': 'ExpresionAgrupada',
+            'x = ' + '- ' * n + 'a;': 'ExpresionUnaria',
+            '{' * n + 'x = 1;' + '}' * n: 'Bloque',
+            'if (a) ' * n + 'x = 1;': 'SentenciaIf',
+            'x = ' + 'f(' * n + '1' + ')' * n + ';': 'ExpresionLlamada',
+            'x = ' + 'a[' * n + '1' + ']' * n + ';': 'ExpresionIndice',
+            'a = ' * n + '1;': 'Asignacion',
+            'while (a) {' * n + '}' * n: 'SentenciaWhile',
+        }
+        for codigo, clase in casos.items():
+            with self.subTest(clase):
+                sintactico = AnalizadorSintactico(AnalizadorLexico().analizar_compacto(codigo), 'iterativo')
+                self.assertTrue(sintactico.analizar(), sintactico.errores[:3])
+                self.assertGreaterEqual(sum(type(nodo).__name__ == clase for nodo in nodos(sintactico.ast)), n)
+
+    def test_modo_desconocido(self):
+        with self.assertRaises(ValueError):
+            AnalizadorSintactico([], 'otro')
+
+
+def editar(codigo, azar, valida):
+    """
+    Una edición al azar de 'codigo': si 'valida', una sentencia insertada en
+    un límite de sentencia o un número cambiado; si no, un fragmento
+    cualquiera insertado o unos caracteres borrados
+    """
+    if valida and azar.random() < 0.5:
+        i = azar.choice([0] + [k + 1 for k, c in enumerate(codigo) if c in ';{}'])
+        return codigo[:i] + ' ' + sentencia(azar) + ' ' + codigo[i:]
+    if valida:
+        i = azar.choice([k for k, c in enumerate(codigo) if c.isdigit()] or [0])
+        return codigo[:i] + str(azar.randint(0, 99)) + codigo[i + codigo[i:i + 1].isdigit():]
+    i = azar.randint(0, len(codigo))
+    insertado = azar.choice(FRAGMENTOS) if azar.random() < 0.7 else ''
+    return codigo[:i] + insertado + codigo[i + azar.randint(0, 4):]
+
+
+class TestReanalizar(unittest.TestCase):
+    """Tras cada edición, reanalizar() da lo mismo que analizar() sobre el código nuevo"""
+
+    def test_ediciones_al_azar(self):
+        azar = random.Random(1)
+        incrementales = 0
+        for n, codigo in enumerate(programas_generados(60, errores=0)):
+            modo = AnalizadorSintactico.MODOS[n % 2]
+            fabrica = FabricaNodos if n % 4 >= 2 else lambda: None
+            flujo = AnalizadorLexico().analizar_compacto(codigo)
+            anterior = AnalizadorSintactico(flujo, modo, fabrica())
+            anterior.analizar()
+            limpio = codigo
+            for _ in range(15):
+                # Tras una edición con errores, a veces se deshace (vuelve al último código sin errores)
+                if anterior.errores and azar.random() < 0.5:
+                    nuevo = limpio
+                else:
+                    nuevo = editar(codigo, azar, azar.random() < 0.7)
+                lexico = AnalizadorLexico()
+                flujo = lexico.reanalizar(flujo, *calcular_edicion(codigo, nuevo))
+                sintactico = AnalizadorSintactico(flujo, modo, fabrica())
+                incrementales += bool(anterior.ast and not anterior.errores)
+                veredicto = sintactico.reanalizar(anterior, lexico.edicion_tokens)
+
+                completo = AnalizadorSintactico(AnalizadorLexico().analizar_compacto(nuevo), modo, fabrica())
+                self.assertEqual(veredicto, completo.analizar(), nuevo)
+                self.assertEqual(sintactico.errores, completo.errores, nuevo)
+                self.assertEqual(imprimir_ast(sintactico.ast), imprimir_ast(completo.ast), nuevo)
+                self.assertEqual(volcar(sintactico.ast), volcar(completo.ast), nuevo)
+                codigo, anterior = nuevo, sintactico
+                if veredicto:
+                    limpio = codigo
+        # La mayoría de las ediciones toman el camino incremental
+        self.assertGreater(incrementales, 500)
+
+
+class TestAnalizarParalelo(unittest.TestCase):
+    """analizar_paralelo() da el mismo veredicto, errores y AST (con spans) que analizar()"""
+
+    # Programa de unas 200 sentencias de nivel superior, una por línea
+    LINEAS = ''.join(programas_generados(20, errores=0)).splitlines()
+
+    def comparar(self, codigo, compacto, modo, fabrica=None):
+        lexico = AnalizadorLexico()
+        tokens = lexico.analizar_compacto(codigo) if compacto else lexico.analizar(codigo)
+        secuencial = AnalizadorSintactico(tokens, modo, fabrica and fabrica())
+        paralelo = AnalizadorSintactico(tokens, modo, fabrica and fabrica())
+        self.assertEqual(paralelo.analizar_paralelo(workers=3), secuencial.analizar())
+        self.assertEqual(paralelo.errores, secuencial.errores)
+        self.assertEqual(imprimir_ast(paralelo.ast), imprimir_ast(secuencial.ast))
+        self.assertEqual(volcar(paralelo.ast), volcar(secuencial.ast))
+        return secuencial
+
+    def test_sin_errores(self):
+        codigo = '\n'.join(self.LINEAS) + '\n'
+        # Con 3 procesos el programa se parte en 12 tramos (si no, no se usaría el pool)
+        tokens = AnalizadorLexico().analizar_compacto(codigo)
+        self.assertEqual(len(AnalizadorSintactico(tokens)._cortes_nivel_superior(12)), 13)
+        for modo in AnalizadorSintactico.MODOS:
+            for compacto in (True, False):
+                with self.subTest(modo=modo, compacto=compacto):
+                    self.assertFalse(self.comparar(codigo, compacto, modo).errores)
+        with self.subTest(fabrica=True):
+            self.comparar(codigo, True, 'recursivo', FabricaNodos)
+
+    def test_desde_el_primer_tramo_con_errores(self):
+        """
+        Los tramos anteriores al error se toman del pool y desde el primero
+        con errores se sigue en secuencia, también si la recuperación cruza
+        los cortes (una llave sin cerrar se come el resto del programa)
+        """
+        for roto in ('x = ;', 'int = 1 2;', 'while (a) {', '}', '@'):
+            for fraccion in (0, 0.5, 0.9):
+                k = int(len(self.LINEAS) * fraccion)
+                codigo = '\n'.join(self.LINEAS[:k] + [roto] + self.LINEAS[k:]) + '\n'
+                for modo in AnalizadorSintactico.MODOS:
+                    with self.subTest(roto, fraccion=fraccion, modo=modo):
+                        self.assertTrue(self.comparar(codigo, True, modo).errores)
+
+
+class TestFabricaNodos(unittest.TestCase):
+    """Con una FabricaNodos el AST es el mismo, con las expresiones iguales compartidas"""
+
+    def expresiones(self, raiz):
+        pendientes = [raiz]
+        while pendientes:
+            nodo = pendientes.pop()
+            if isinstance(nodo, list):
+                pendientes.extend(nodo)
+            elif isinstance(nodo, NodoAST):
+                if isinstance(nodo, Expresion):
+                    yield nodo
+                pendientes.extend(valor for _, valor in nodo.campos())
+
+    def test_ejemplos(self):
+        for nombre, codigo in EJEMPLOS.items():
+            for modo in AnalizadorSintactico.MODOS:
+                with self.subTest(nombre, modo=modo):
+                    tokens = AnalizadorLexico().analizar(codigo)
+                    sin_fabrica = AnalizadorSintactico(tokens, modo)
+                    sin_fabrica.analizar()
+                    fabrica = FabricaNodos()
+                    con_fabrica = AnalizadorSintactico(tokens, modo, fabrica)
+                    con_fabrica.analizar()
+                    self.assertEqual(con_fabrica.errores, sin_fabrica.errores)
+                    if sin_fabrica.ast is None:
+                        continue
+                    impresion = imprimir_ast(sin_fabrica.ast)
+                    self.assertEqual(imprimir_ast(con_fabrica.ast), impresion)
+                    # Cada expresión distinta sin efectos es una sola instancia, sin posición
+                    por_impresion = {}
+                    for expr in self.expresiones(con_fabrica.ast):
+                        self.assertIsNotNone(expr.hash_estructural)
+                        clave = imprimir_ast(expr)
+                        otra = por_impresion.setdefault(clave, expr)
+                        self.assertEqual(otra.hash_estructural, expr.hash_estructural)
+                        if not CON_EFECTOS.search(clave):
+                            self.assertIs(otra, expr)
+                            self.assertIsNone(expr.token)
+                    self.assertLessEqual(len(fabrica), len(por_impresion))
+
+
+if __name__ == '__main__':
+    unittest.main()